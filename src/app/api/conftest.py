@@ -0,0 +1,8 @@
+import pytest
+from src.lib.utils import artifacts, transcription
+
+@pytest.fixture(autouse=True)
+def isolated_stores(tmp_path, monkeypatch):
+    """Keep artifacts and cached transcriptions of route tests out of the working directory."""
+    monkeypatch.setattr(artifacts, "ARTIFACT_DIR", tmp_path / "artifacts")
+    monkeypatch.setattr(transcription, "CACHE_DIR", tmp_path / "cache")
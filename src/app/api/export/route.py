@@ -2,10 +2,10 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
-from src.lib.utils.export import export_transcription
-from src.lib.utils.transcription import transcribe_audio
-from src.lib.utils.diarization import process_audio_with_diarization
-from src.lib.utils.summarization import process_with_summary
+from src.lib.utils.export import stream_transcription, select_time_range
+from src.lib.utils.transcript import open_transcript
+from src.lib.utils.diarization import get_transcript_file, process_audio_with_diarization
+from src.lib.utils.summarization import get_summary, process_with_summary
 
 router = APIRouter()
 
@@ -14,6 +14,9 @@ class ExportRequest(BaseModel):
     format: str
     include_summary: Optional[bool] = False
     language: Optional[str] = None
+    start: Optional[float] = None
+    end: Optional[float] = None
+    rebase: Optional[bool] = False
 
 @router.post("/")
 async def export(request: ExportRequest):
@@ -21,20 +24,29 @@ async def export(request: ExportRequest):
     Export transcription in the specified format.
     
     Args:
-        request: ExportRequest containing file_id, format, and optional parameters
+        request: ExportRequest containing file_id, format, and optional parameters,
+            including a start/end time range in seconds
         
     Returns:
         StreamingResponse: File download response
     """
     try:
-        # Get transcription data
-        if request.include_summary:
+        if request.start is not None or request.end is not None:
+            # Only read the segments overlapping the requested time range from
+            # the binary transcript, the full transcript is never loaded
+            transcript_path = await get_transcript_file(request.file_id, request.language)
+            data = {"transcription": ""}
+            if request.include_summary:
+                data.update(await get_summary(request.file_id, request.language))
+            with open_transcript(transcript_path) as transcript:
+                data = select_time_range(data, request.start, request.end, request.rebase, transcript)
+        elif request.include_summary:
             data = await process_with_summary(request.file_id, request.language)
         else:
             data = await process_audio_with_diarization(request.file_id, request.language)
         
-        # Export to requested format
-        content = export_transcription(data, request.format)
+        # Export to requested format, generated cue by cue while streaming
+        content = stream_transcription(data, request.format)
         
         # Determine content type and file extension
         content_types = {
@@ -59,7 +71,7 @@ async def export(request: ExportRequest):
         
         # Return file as streaming response
         return StreamingResponse(
-            iter([content.encode()]),
+            content,
             media_type=content_type,
             headers={
                 "Content-Disposition": f'attachment; filename="{filename}"'
@@ -1,10 +1,13 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
+from src.lib.utils.transcript import Transcript, write_transcript
 from src.app.main import app
 
 client = TestClient(app)
 
+FILE_ID = "0f8b6a2e-4c1d-4e7a-9b3f-2d5c8e1a7f60"
+
 @pytest.mark.asyncio
 async def test_export_endpoint_success():
     # Mock transcription data
@@ -23,7 +26,7 @@ async def test_export_endpoint_success():
         response = client.post(
             "/export/",
             json={
-                "file_id": "test_file_id",
+                "file_id": FILE_ID,
                 "format": "txt",
                 "include_summary": False,
                 "language": "en"
@@ -33,7 +36,7 @@ async def test_export_endpoint_success():
         assert response.status_code == 200
         assert response.headers["content-type"] == "text/plain"
         assert "attachment" in response.headers["content-disposition"]
-        assert "transcription_test_file_id.txt" in response.headers["content-disposition"]
+        assert f"transcription_{FILE_ID}.txt" in response.headers["content-disposition"]
         assert "Hello world." in response.text
 
 @pytest.mark.asyncio
@@ -56,7 +59,7 @@ async def test_export_endpoint_with_summary():
         response = client.post(
             "/export/",
             json={
-                "file_id": "test_file_id",
+                "file_id": FILE_ID,
                 "format": "txt",
                 "include_summary": True,
                 "language": "en"
@@ -86,7 +89,7 @@ async def test_export_endpoint_srt_format():
         response = client.post(
             "/export/",
             json={
-                "file_id": "test_file_id",
+                "file_id": FILE_ID,
                 "format": "srt",
                 "include_summary": False
             }
@@ -94,7 +97,7 @@ async def test_export_endpoint_srt_format():
         
         assert response.status_code == 200
         assert response.headers["content-type"] == "text/plain"
-        assert "transcription_test_file_id.srt" in response.headers["content-disposition"]
+        assert f"transcription_{FILE_ID}.srt" in response.headers["content-disposition"]
         assert "00:00:00,000 --> 00:00:01,000" in response.text
 
 @pytest.mark.asyncio
@@ -105,7 +108,7 @@ async def test_export_endpoint_invalid_format():
         response = client.post(
             "/export/",
             json={
-                "file_id": "test_file_id",
+                "file_id": FILE_ID,
                 "format": "invalid",
                 "include_summary": False
             }
@@ -122,7 +125,7 @@ async def test_export_endpoint_processing_error():
         response = client.post(
             "/export/",
             json={
-                "file_id": "test_file_id",
+                "file_id": FILE_ID,
                 "format": "txt",
                 "include_summary": False
             }
@@ -138,4 +141,90 @@ async def test_export_endpoint_invalid_request():
         json={"invalid_field": "test"}
     )
     
-    assert response.status_code == 422  # Validation error 
\ No newline at end of file
+    assert response.status_code == 422  # Validation error 
+
+@pytest.mark.asyncio
+async def test_export_endpoint_time_range(tmp_path):
+    segments = [
+        {"text": f" Segment {i}", "start": i * 10.0, "end": i * 10.0 + 10.0}
+        for i in range(60)
+    ]
+    speakers = [
+        {"speaker_id": "Speaker 1", "text": "", "start": 0.0, "end": 310.0},
+        {"speaker_id": "Speaker 2", "text": "", "start": 310.0, "end": 600.0}
+    ]
+    transcript_path = tmp_path / "transcript.bin"
+    write_transcript(Transcript.from_segments(segments, speakers), transcript_path)
+    mock_process = AsyncMock()
+    
+    # Ranges are read from the binary transcript alone
+    with patch('src.app.api.export.route.process_audio_with_diarization', mock_process), \
+         patch('src.app.api.export.route.process_with_summary', mock_process), \
+         patch('src.app.api.export.route.get_transcript_file', AsyncMock(return_value=transcript_path)):
+        
+        response = client.post(
+            "/export/",
+            json={
+                "file_id": FILE_ID,
+                "format": "srt",
+                "start": 300.0,
+                "end": 320.0,
+                "rebase": True
+            }
+        )
+        
+        assert response.status_code == 200
+        assert response.text == (
+            "1\n00:00:00,000 --> 00:00:10,000\nSpeaker 1:  Segment 30\n\n"
+            "2\n00:00:10,000 --> 00:00:20,000\nSpeaker 2:  Segment 31\n"
+        )
+        
+        response = client.post(
+            "/export/",
+            json={"file_id": FILE_ID, "format": "srt", "start": 320.0, "end": 300.0}
+        )
+        
+        assert response.status_code == 400
+        
+        summary = {"summary": "A count", "key_points": "1. Numbers"}
+        with patch('src.app.api.export.route.get_summary', AsyncMock(return_value=summary)):
+            response = client.post(
+                "/export/",
+                json={"file_id": FILE_ID, "format": "json", "start": 300.0, "end": 320.0, "include_summary": True}
+            )
+        
+        assert response.status_code == 200
+        assert response.json() == {
+            "transcription": "Segment 30 Segment 31",
+            "segments": segments[30:32],
+            "speakers": [
+                {"speaker_id": "Speaker 1", "text": " Segment 30", "start": 300.0, "end": 310.0},
+                {"speaker_id": "Speaker 2", "text": " Segment 31", "start": 310.0, "end": 320.0}
+            ],
+            "summary": "A count",
+            "key_points": "1. Numbers"
+        }
+        assert mock_process.await_count == 0
+
+@pytest.mark.asyncio
+async def test_export_endpoint_pipeline_result():
+    mock_data = {
+        "transcription": "Hello world.",
+        "segments": [
+            {"text": "Hello", "start": 0.0, "end": 1.0},
+            {"text": "world.", "start": 1.0, "end": 2.0}
+        ],
+        "language": "en"
+    }
+    
+    with patch('src.app.api.export.route.process_audio_with_diarization', AsyncMock(return_value=mock_data)):
+        response = client.post("/export/", json={"file_id": FILE_ID, "format": "txt"})
+        
+        assert response.status_code == 200
+        assert response.text.startswith("Hello world.")
+        
+        # The JSON document keeps the shape of the pipeline result
+        response = client.post("/export/", json={"file_id": FILE_ID, "format": "json"})
+        
+        assert response.status_code == 200
+        assert response.json() == mock_data
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, HTTPException
+from src.lib.utils.jobs import get_job_queue
+
+router = APIRouter()
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """
+    Get the status of a background job.
+    
+    Args:
+        job_id: The ID returned when the job was queued
+        
+    Returns:
+        dict: Contains status, progress and, once finished, the result or error
+    """
+    job = await get_job_queue().get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "progress": job["progress"],
+        "result": job["result"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"]
+    }
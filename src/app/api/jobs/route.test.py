@@ -0,0 +1,48 @@
+import pytest
+from fastapi.testclient import TestClient
+from src.app.main import app
+from src.lib.utils import jobs
+from src.lib.utils.jobs import JobQueue, SQLiteJobBackend
+
+@pytest.fixture
+def job_queue(tmp_path, monkeypatch):
+    queue = JobQueue(SQLiteJobBackend(tmp_path / "jobs.db"))
+    monkeypatch.setattr(jobs, "_job_queue", queue)
+    return queue
+
+def test_submit_transcription_job(job_queue):
+    client = TestClient(app)
+    response = client.post(
+        "/transcribe/jobs",
+        json={"file_id": "test_file_id", "language": "en"}
+    )
+    
+    assert response.status_code == 202
+    data = response.json()
+    assert data["status"] == "queued"
+    
+    job = job_queue.backend.get_job(data["job_id"])
+    assert job["kind"] == "transcription"
+    assert job["payload"] == {"file_id": "test_file_id", "language": "en"}
+
+@pytest.mark.asyncio
+async def test_get_job_status(job_queue):
+    client = TestClient(app)
+    job_id = await job_queue.submit("transcription", {"file_id": "test_file_id"})
+    job_queue.backend.update_job(job_id, status="completed", progress=1.0, result={"text": "Hello"})
+    
+    response = client.get(f"/jobs/{job_id}")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["job_id"] == job_id
+    assert data["status"] == "completed"
+    assert data["progress"] == 1.0
+    assert data["result"] == {"text": "Hello"}
+
+def test_get_job_not_found(job_queue):
+    client = TestClient(app)
+    response = client.get("/jobs/nonexistent")
+    
+    assert response.status_code == 404
+    assert "Job not found" in response.json()["detail"]
@@ -5,6 +5,8 @@ from src.app.main import app
 
 client = TestClient(app)
 
+FILE_ID = "0f8b6a2e-4c1d-4e7a-9b3f-2d5c8e1a7f60"
+
 @pytest.mark.asyncio
 async def test_summarize_endpoint_success():
     # Mock process_with_summary response
@@ -24,7 +26,7 @@ async def test_summarize_endpoint_success():
         
         response = client.post(
             "/summarize/",
-            json={"file_id": "test_file_id", "language": "en"}
+            json={"file_id": FILE_ID, "language": "en"}
         )
         
         assert response.status_code == 200
@@ -45,7 +47,7 @@ async def test_summarize_endpoint_error():
         
         response = client.post(
             "/summarize/",
-            json={"file_id": "test_file_id"}
+            json={"file_id": FILE_ID}
         )
         
         assert response.status_code == 500
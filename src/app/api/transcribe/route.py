@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Optional
-from src.lib.utils.transcription import transcribe_audio, correct_transcription
+from typing import Callable, Dict, Optional
+from src.lib.utils.transcription import get_transcript, get_corrected_transcript
+from src.lib.utils.transcriptionBackends import get_transcription_backend
+from src.lib.utils.jobs import get_job_queue, job_handler
 
 router = APIRouter()
 
@@ -9,6 +11,45 @@ class TranscriptionRequest(BaseModel):
     file_id: str
     language: Optional[str] = None
 
+async def run_transcription(
+    file_id: str,
+    language: Optional[str] = None,
+    progress: Optional[Callable[[float], None]] = None
+) -> Dict:
+    """
+    Transcribe and correct an uploaded audio file.
+    
+    Args:
+        file_id: The ID of the uploaded file
+        language: Optional language code
+        progress: Optional callback receiving the completed fraction
+        
+    Returns:
+        dict: Contains transcription_id, status, corrected text and segments, language
+        and the correction gating stats
+    """
+    # Transcribe the audio
+    transcription = await get_transcript(file_id, language)
+    if progress:
+        progress(0.5)
+    
+    # Correct any transcription errors
+    corrected = await get_corrected_transcript(file_id, language)
+    
+    return {
+        "transcription_id": file_id,  # Using file_id as transcription_id for now
+        "status": "completed",
+        "text": corrected["text"],
+        "segments": corrected["segments"],
+        "language": transcription["language"],
+        "correction": corrected.get("correction")
+    }
+
+@job_handler("transcription")
+async def transcription_job(payload: Dict, progress: Callable[[float], None]) -> Dict:
+    """Run a queued transcription job."""
+    return await run_transcription(payload["file_id"], payload.get("language"), progress)
+
 @router.post("/transcribe")
 async def transcribe(request: TranscriptionRequest):
     """
@@ -21,19 +62,7 @@ async def transcribe(request: TranscriptionRequest):
         dict: Contains transcription_id and status
     """
     try:
-        # Transcribe the audio
-        transcription = await transcribe_audio(request.file_id, request.language)
-        
-        # Correct any transcription errors
-        corrected_text = await correct_transcription(transcription["text"])
-        
-        return {
-            "transcription_id": request.file_id,  # Using file_id as transcription_id for now
-            "status": "completed",
-            "text": corrected_text,
-            "segments": transcription["segments"],
-            "language": transcription["language"]
-        }
+        return await run_transcription(request.file_id, request.language)
         
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -41,4 +70,35 @@ async def transcribe(request: TranscriptionRequest):
         raise HTTPException(
             status_code=500,
             detail=f"Transcription failed: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+@router.post("/jobs", status_code=202)
+async def submit_transcription_job(request: TranscriptionRequest):
+    """
+    Queue an uploaded audio file for transcription in the background.
+    
+    Args:
+        request: Contains file_id and optional language
+        
+    Returns:
+        dict: Contains job_id and status, poll GET /jobs/{job_id} for the result
+    """
+    job_id = await get_job_queue().submit(
+        "transcription",
+        {"file_id": request.file_id, "language": request.language}
+    )
+    
+    return {
+        "job_id": job_id,
+        "status": "queued"
+    }
+
+@router.get("/metrics")
+async def get_transcription_metrics():
+    """
+    Get the timing and throughput metrics of the transcription backend.
+    
+    Returns:
+        dict: Contains backend, model, request counts, audio and processing seconds and realtime_factor
+    """
+    return get_transcription_backend().get_metrics()
@@ -5,6 +5,8 @@ from src.app.main import app
 
 client = TestClient(app)
 
+FILE_ID = "0f8b6a2e-4c1d-4e7a-9b3f-2d5c8e1a7f60"
+
 @pytest.mark.asyncio
 async def test_transcribe_endpoint_success():
     # Mock transcription response
@@ -18,17 +20,21 @@ async def test_transcribe_endpoint_success():
     }
     
     # Mock correction response
+    mock_corrected_segments = [
+        {"text": "This is", "start": 0, "end": 1},
+        {"text": " a corrected transcription.", "start": 1, "end": 2}
+    ]
     mock_corrected_text = "This is a corrected transcription."
     
     with patch('src.lib.utils.transcription.transcribe_audio') as mock_transcribe, \
-         patch('src.lib.utils.transcription.correct_transcription') as mock_correct:
+         patch('src.lib.utils.transcription.correct_segments') as mock_correct:
         
         mock_transcribe.return_value = mock_transcription
-        mock_correct.return_value = mock_corrected_text
+        mock_correct.return_value = mock_corrected_segments
         
         response = client.post(
             "/transcribe/transcribe",
-            json={"file_id": "test_file_id", "language": "en"}
+            json={"file_id": FILE_ID, "language": "en"}
         )
         
         assert response.status_code == 200
@@ -40,6 +46,7 @@ async def test_transcribe_endpoint_success():
         assert "language" in data
         assert data["status"] == "completed"
         assert data["text"] == mock_corrected_text
+        assert data["segments"] == mock_corrected_segments
         assert data["language"] == "en"
 
 @pytest.mark.asyncio
@@ -49,7 +56,7 @@ async def test_transcribe_endpoint_file_not_found():
         
         response = client.post(
             "/transcribe/transcribe",
-            json={"file_id": "nonexistent_file_id"}
+            json={"file_id": "7c1e9d2a-0b4f-4a6e-8d3c-5f2a9b1e6c40"}
         )
         
         assert response.status_code == 404
@@ -62,7 +69,7 @@ async def test_transcribe_endpoint_transcription_error():
         
         response = client.post(
             "/transcribe/transcribe",
-            json={"file_id": "test_file_id"}
+            json={"file_id": FILE_ID}
         )
         
         assert response.status_code == 500
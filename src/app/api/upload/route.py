@@ -1,8 +1,25 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from src.lib.utils.fileHandling import validate_file, save_upload_file
+import re
+from typing import Optional
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request, Header, Query
+from pydantic import BaseModel
+from src.lib.utils.fileHandling import (
+    validate_file,
+    store_upload_file,
+    create_upload_session,
+    get_upload_session,
+    append_upload_chunk,
+    finalize_upload_session,
+    delete_upload_session
+)
 
 router = APIRouter()
 
+CONTENT_RANGE_PATTERN = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+class UploadSessionRequest(BaseModel):
+    filename: str
+    size: int
+
 @router.post("/upload")
 async def upload_file(file: UploadFile = File(...)):
     """
@@ -12,18 +29,20 @@ async def upload_file(file: UploadFile = File(...)):
         file: The audio file to upload (MP3, MP4, or WAV)
         
     Returns:
-        dict: Contains file_id and status
+        dict: Contains file_id, status, size and sha256 content hash
     """
     try:
-        # Validate the file
+        # Validate the file type
         await validate_file(file)
         
-        # Save the file
-        file_id = await save_upload_file(file)
+        # Save the file, enforcing the size limit while streaming
+        saved = await store_upload_file(file)
         
         return {
-            "file_id": file_id,
-            "status": "uploaded"
+            "file_id": saved["file_id"],
+            "status": "uploaded",
+            "size": saved["size"],
+            "sha256": saved["sha256"]
         }
         
     except HTTPException as e:
@@ -32,4 +51,91 @@ async def upload_file(file: UploadFile = File(...)):
         raise HTTPException(
             status_code=500,
             detail=f"An error occurred while uploading the file: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+@router.post("/sessions", status_code=201)
+async def create_session(request: UploadSessionRequest):
+    """
+    Start a resumable upload.
+    
+    Args:
+        request: Contains the filename and total size in bytes
+        
+    Returns:
+        dict: Contains session_id, offset and size
+    """
+    return create_upload_session(request.filename, request.size)
+
+@router.get("/sessions/{session_id}")
+async def get_session(session_id: str):
+    """
+    Get the number of bytes received so far, to resume an interrupted upload.
+    
+    Returns:
+        dict: Contains session_id, offset and size
+    """
+    return get_upload_session(session_id)
+
+@router.put("/sessions/{session_id}")
+async def upload_range(
+    session_id: str,
+    request: Request,
+    content_range: Optional[str] = Header(None),
+    offset: Optional[int] = Query(None)
+):
+    """
+    Upload a byte range of the file.
+    
+    The range start is taken from the Content-Range header
+    (bytes start-end/total) or the offset query parameter and must match the
+    current session offset. A total in the Content-Range header must match
+    the size the session was created with.
+    
+    Returns:
+        dict: Contains session_id and the new offset
+    """
+    length = None
+    total = None
+    if content_range is not None:
+        match = CONTENT_RANGE_PATTERN.fullmatch(content_range.strip())
+        if not match:
+            raise HTTPException(status_code=400, detail=f"Invalid Content-Range: {content_range}")
+        offset = int(match.group(1))
+        length = int(match.group(2)) - offset + 1
+        if match.group(3) != "*":
+            total = int(match.group(3))
+    elif offset is None:
+        raise HTTPException(status_code=400, detail="Content-Range header or offset is required")
+    
+    new_offset = await append_upload_chunk(session_id, offset, request.stream(), length, total)
+    
+    return {
+        "session_id": session_id,
+        "offset": new_offset
+    }
+
+@router.post("/sessions/{session_id}/finalize")
+async def finalize_session(session_id: str):
+    """
+    Complete a resumable upload once all bytes were received.
+    
+    Returns:
+        dict: Contains file_id, status, size and sha256 content hash
+    """
+    saved = await finalize_upload_session(session_id)
+    
+    return {
+        "file_id": saved["file_id"],
+        "status": "uploaded",
+        "size": saved["size"],
+        "sha256": saved["sha256"]
+    }
+
+@router.delete("/sessions/{session_id}")
+async def delete_session(session_id: str):
+    """Abort a resumable upload."""
+    delete_upload_session(session_id)
+    return {
+        "session_id": session_id,
+        "status": "deleted"
+    }
@@ -1,7 +1,8 @@
+import shutil
 import pytest
 from fastapi.testclient import TestClient
 from src.app.main import app
-from src.lib.utils.fileHandling import UPLOAD_DIR
+from src.lib.utils.fileHandling import UPLOAD_DIR, get_file_path
 
 @pytest.fixture
 def client():
@@ -13,9 +14,7 @@ def setup_teardown():
     UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
     yield
     # Teardown
-    for file in UPLOAD_DIR.glob("*"):
-        file.unlink()
-    UPLOAD_DIR.rmdir()
+    shutil.rmtree(UPLOAD_DIR)
 
 def test_upload_valid_file(client):
     # Create a test file
@@ -32,7 +31,7 @@ def test_upload_valid_file(client):
     assert data["status"] == "uploaded"
     
     # Verify file was saved
-    file_path = UPLOAD_DIR / f"{data['file_id']}.mp3"
+    file_path = get_file_path(data["file_id"])
     assert file_path.exists()
     assert file_path.read_bytes() == test_content
 
@@ -4,6 +4,11 @@ from src.app.api.upload.route import router as upload_router
 from src.app.api.transcribe.route import router as transcribe_router
 from src.app.api.summarize.route import router as summarize_router
 from src.app.api.export.route import router as export_router
+from src.app.api.jobs.route import router as jobs_router
+from src.lib.utils.openaiClient import close_client
+from src.lib.utils.jobs import get_job_queue
+from src.lib.utils.transcription import shutdown_transcription_pool
+from src.lib.utils.fileHandling import expire_upload_sessions
 
 app = FastAPI(
     title="Podcast Transcription Service",
@@ -25,6 +30,22 @@ app.include_router(upload_router, prefix="/upload", tags=["upload"])
 app.include_router(transcribe_router, prefix="/transcribe", tags=["transcribe"])
 app.include_router(summarize_router, prefix="/summarize", tags=["summarize"])
 app.include_router(export_router, prefix="/export", tags=["export"])
+app.include_router(jobs_router, prefix="/jobs", tags=["jobs"])
+
+@app.on_event("startup")
+async def startup():
+    # Start background job workers
+    await get_job_queue().start()
+    # Discard resumable uploads abandoned while the service was down
+    expire_upload_sessions()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await get_job_queue().stop()
+    # Release pooled OpenAI connections
+    await close_client()
+    # Stop local transcription worker processes
+    await shutdown_transcription_pool()
 
 @app.get("/")
 async def root():
@@ -0,0 +1,134 @@
+import os
+import json
+import uuid
+import shutil
+import asyncio
+import tempfile
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Constants
+ARTIFACT_DIR = Path(os.getenv("ARTIFACT_DIR", "artifacts"))
+STAGES = ("transcript", "corrected", "speakers", "summary", "key_points")
+
+# One lock per (file_id, stage, language) so concurrent requests compute a stage once
+_locks: Dict[Tuple[str, str, str], asyncio.Lock] = {}
+
+def get_artifact_dir(file_id: str) -> Path:
+    """
+    Get the directory holding the pipeline stage results of a file.
+
+    Raises:
+        ValueError: If file_id is not a UUID, file IDs come from request bodies
+    """
+    try:
+        valid = str(uuid.UUID(file_id)) == file_id.lower()
+    except (TypeError, ValueError, AttributeError):
+        valid = False
+    if not valid:
+        raise ValueError(f"Invalid file ID: {file_id!r}")
+
+    path = ARTIFACT_DIR / file_id
+    if not path.resolve().is_relative_to(ARTIFACT_DIR.resolve()):
+        raise ValueError(f"Invalid file ID: {file_id!r}")
+    return path
+
+def get_artifact_path(file_id: str, stage: str, language: Optional[str] = None, extension: str = "json") -> Path:
+    """Get the path where a pipeline stage result for a file is stored."""
+    if stage not in STAGES:
+        raise ValueError(f"Unknown pipeline stage: {stage}")
+    filename = f"{stage}.{language or 'auto'}.{extension}"
+    if Path(filename).name != filename or ".." in filename:
+        raise ValueError(f"Invalid language: {language!r}")
+    return get_artifact_dir(file_id) / filename
+
+def load_artifact(file_id: str, stage: str, language: Optional[str] = None) -> Optional[Any]:
+    """
+    Load a stored pipeline stage result.
+
+    Args:
+        file_id: The ID of the uploaded file
+        stage: One of STAGES
+        language: Optional language code the stage was computed with
+
+    Returns:
+        The stored result, or None if the stage has not been computed yet
+    """
+    path = get_artifact_path(file_id, stage, language)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        # Partial or corrupt artifact, recompute it
+        path.unlink(missing_ok=True)
+        return None
+
+def save_artifact(file_id: str, stage: str, data: Any, language: Optional[str] = None) -> None:
+    """
+    Persist a pipeline stage result.
+
+    Args:
+        file_id: The ID of the uploaded file
+        stage: One of STAGES
+        data: JSON serializable stage result
+        language: Optional language code the stage was computed with
+    """
+    path = get_artifact_path(file_id, stage, language)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=path.parent, prefix=path.name, suffix=".tmp", delete=False
+    ) as f:
+        try:
+            json.dump(data, f)
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, path)
+
+def get_artifact_lock(file_id: str, stage: str, language: Optional[str] = None) -> asyncio.Lock:
+    """Get the lock serializing the computation of a pipeline stage result for a file."""
+    return _locks.setdefault((file_id, stage, language or "auto"), asyncio.Lock())
+
+async def get_or_create_artifact(
+    file_id: str,
+    stage: str,
+    producer: Callable[[], Awaitable[Any]],
+    language: Optional[str] = None
+) -> Any:
+    """
+    Load a pipeline stage result, computing and persisting it on first use.
+
+    Args:
+        file_id: The ID of the uploaded file
+        stage: One of STAGES
+        producer: Coroutine function that computes the stage result
+        language: Optional language code
+
+    Returns:
+        The stage result
+    """
+    data = load_artifact(file_id, stage, language)
+    if data is not None:
+        return data
+
+    async with get_artifact_lock(file_id, stage, language):
+        # Another request may have produced it while we waited
+        data = load_artifact(file_id, stage, language)
+        if data is None:
+            data = await producer()
+            save_artifact(file_id, stage, data, language)
+
+    return data
+
+def delete_artifacts(file_id: str) -> bool:
+    """Delete all stored pipeline results for a file."""
+    path = get_artifact_dir(file_id)
+    for key in [key for key in _locks if key[0] == file_id]:
+        del _locks[key]
+    if path.exists():
+        shutil.rmtree(path)
+        return True
+    return False
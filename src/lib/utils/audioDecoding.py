@@ -0,0 +1,246 @@
+import os
+import sys
+import json
+import math
+import wave
+import shutil
+import warnings
+import subprocess
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    try:
+        import audioop
+    except ImportError:  # Removed in Python 3.13, WAV files are then only read at their own format
+        audioop = None
+
+# Constants
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+FFPROBE_BINARY = os.getenv("FFPROBE_BINARY", "ffprobe")
+DECODE_SAMPLE_RATE = 16000  # Sample rate Whisper models work at
+DECODE_SAMPLE_WIDTH = 2  # Bytes per sample, signed 16-bit little-endian PCM
+DECODE_FRAME_SAMPLES = int(os.getenv("DECODE_FRAME_SAMPLES", 16000))  # Samples per yielded frame, 1s at 16kHz
+WAV_READ_FRAMES = 64 * 1024  # Source frames read from a WAV file at a time
+
+class AudioDecodeError(Exception):
+    """Raised when an audio file cannot be probed or decoded."""
+    pass
+
+def _probe_wav(file_path: Path) -> Dict:
+    with wave.open(str(file_path), "rb") as wav:
+        sample_rate = wav.getframerate()
+        return {
+            "duration": wav.getnframes() / sample_rate if sample_rate else 0.0,
+            "sample_rate": sample_rate,
+            "channels": wav.getnchannels(),
+            "format": "wav"
+        }
+
+def _probe_ffprobe(file_path: Path) -> Dict:
+    if shutil.which(FFPROBE_BINARY) is None:
+        raise AudioDecodeError(f"{FFPROBE_BINARY} is required to probe {file_path.suffix or 'this'} files")
+    process = subprocess.run(
+        [
+            FFPROBE_BINARY, "-v", "error", "-select_streams", "a:0",
+            "-show_entries", "stream=sample_rate,channels,duration:format=duration,format_name",
+            "-of", "json", str(file_path)
+        ],
+        capture_output=True
+    )
+    if process.returncode != 0:
+        raise AudioDecodeError(f"Probing {file_path.name} failed: {process.stderr.decode(errors='replace').strip()}")
+
+    info = json.loads(process.stdout or b"{}")
+    streams = info.get("streams") or []
+    if not streams:
+        raise AudioDecodeError(f"No audio stream in {file_path.name}")
+    stream = streams[0]
+    container = info.get("format", {})
+    duration = stream.get("duration") or container.get("duration")
+    return {
+        "duration": float(duration) if duration is not None else None,
+        "sample_rate": int(stream["sample_rate"]),
+        "channels": int(stream["channels"]),
+        "format": container.get("format_name", "").split(",")[0] or None
+    }
+
+def probe_audio(file_path: Path) -> Dict:
+    """
+    Read the duration, sample rate and channel count of an audio file.
+
+    PCM WAV files are read with the standard library, other formats with ffprobe.
+
+    Args:
+        file_path: Path to the audio file
+
+    Returns:
+        Dict: Contains duration in seconds, sample_rate, channels and format
+
+    Raises:
+        AudioDecodeError: If the file is not audio or cannot be probed
+    """
+    file_path = Path(file_path)
+    if not file_path.exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+    try:
+        return _probe_wav(file_path)
+    except (wave.Error, EOFError):
+        return _probe_ffprobe(file_path)
+
+def _iter_fixed_frames(chunks: Iterator[bytes], frame_bytes: int) -> Iterator[bytes]:
+    """Regroup byte chunks into frames of frame_bytes, the last frame may be shorter."""
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= frame_bytes:
+            yield bytes(buffer[:frame_bytes])
+            del buffer[:frame_bytes]
+    if buffer:
+        yield bytes(buffer)
+
+def _iter_ffmpeg_pcm(
+    file_path: Path,
+    sample_rate: int,
+    frame_bytes: int,
+    start: float,
+    duration: Optional[float]
+) -> Iterator[bytes]:
+    # Seeking before the input skips the audio before start without decoding it
+    command = [FFMPEG_BINARY, "-nostdin", "-v", "error"]
+    if start:
+        command += ["-ss", f"{start:.3f}"]
+    command += ["-i", str(file_path)]
+    if duration is not None:
+        command += ["-t", f"{duration:.3f}"]
+    process = subprocess.Popen(
+        command + ["-vn", "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(sample_rate), "pipe:1"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    try:
+        while frame := process.stdout.read(frame_bytes):
+            yield frame
+        stderr = process.stderr.read()
+        if process.wait() != 0:
+            raise AudioDecodeError(f"Decoding {file_path.name} failed: {stderr.decode(errors='replace').strip()}")
+    finally:
+        # Stop ffmpeg when the consumer stops early
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+def _iter_wav_pcm(file_path: Path, sample_rate: int, start: float, duration: Optional[float]) -> Iterator[bytes]:
+    with wave.open(str(file_path), "rb") as wav:
+        width = wav.getsampwidth()
+        channels = wav.getnchannels()
+        source_rate = wav.getframerate()
+        if (width, channels, source_rate) != (DECODE_SAMPLE_WIDTH, 1, sample_rate) and audioop is None:
+            raise AudioDecodeError(f"{FFMPEG_BINARY} is required to resample {file_path.name}")
+        if channels > 2:
+            raise AudioDecodeError(f"{FFMPEG_BINARY} is required to downmix {channels} channels")
+
+        first = min(int(start * source_rate), wav.getnframes())
+        wav.setpos(first)
+        remaining = wav.getnframes() - first
+        if duration is not None:
+            remaining = min(remaining, int(duration * source_rate))
+
+        state = None
+        while remaining > 0 and (data := wav.readframes(min(WAV_READ_FRAMES, remaining))):
+            remaining -= len(data) // (width * channels)
+            if audioop is None:
+                yield data
+                continue
+            if width == 1:
+                # 8-bit WAV samples are unsigned
+                data = audioop.bias(data, 1, -128)
+            if width != DECODE_SAMPLE_WIDTH:
+                data = audioop.lin2lin(data, width, DECODE_SAMPLE_WIDTH)
+            if channels == 2:
+                data = audioop.tomono(data, DECODE_SAMPLE_WIDTH, 0.5, 0.5)
+            if source_rate != sample_rate:
+                data, state = audioop.ratecv(data, DECODE_SAMPLE_WIDTH, 1, source_rate, sample_rate, state)
+            yield data
+
+def iter_pcm_frames(
+    file_path: Path,
+    sample_rate: int = DECODE_SAMPLE_RATE,
+    frame_samples: int = DECODE_FRAME_SAMPLES,
+    start: float = 0.0,
+    duration: Optional[float] = None
+) -> Iterator[bytes]:
+    """
+    Decode an audio file into mono 16-bit PCM frames, streaming.
+
+    MP3, MP4 and WAV files are decoded and resampled by an ffmpeg subprocess
+    whose output is read one frame at a time, so memory use does not grow
+    with the file. Without ffmpeg, PCM WAV files are converted with the
+    standard library.
+
+    Args:
+        file_path: Path to the audio file
+        sample_rate: Output sample rate (default: 16kHz)
+        frame_samples: Samples per frame, every frame but the last has exactly this many
+        start: Seconds into the file to start decoding at
+        duration: Seconds of audio to decode, None to decode to the end
+
+    Returns:
+        Iterator[bytes]: Signed 16-bit little-endian mono PCM frames
+
+    Raises:
+        AudioDecodeError: If the file cannot be decoded
+    """
+    file_path = Path(file_path)
+    if not file_path.exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    frame_bytes = frame_samples * DECODE_SAMPLE_WIDTH
+    if shutil.which(FFMPEG_BINARY) is not None:
+        yield from _iter_ffmpeg_pcm(file_path, sample_rate, frame_bytes, start, duration)
+        return
+
+    try:
+        yield from _iter_fixed_frames(_iter_wav_pcm(file_path, sample_rate, start, duration), frame_bytes)
+    except (wave.Error, EOFError):
+        raise AudioDecodeError(f"{FFMPEG_BINARY} is required to decode {file_path.name}")
+
+def iter_levels(file_path: Path, window: float = 0.1) -> Iterator[float]:
+    """
+    Stream the loudness of an audio file as the RMS amplitude of consecutive windows.
+
+    Args:
+        file_path: Path to the audio file
+        window: Length of each window in seconds
+
+    Returns:
+        Iterator[float]: RMS of the 16-bit samples of each window, in order
+    """
+    for frame in iter_pcm_frames(file_path, frame_samples=max(1, int(window * DECODE_SAMPLE_RATE))):
+        if audioop is not None:
+            yield float(audioop.rms(frame, DECODE_SAMPLE_WIDTH))
+            continue
+        samples = array("h", frame[:len(frame) - len(frame) % DECODE_SAMPLE_WIDTH])
+        if sys.byteorder != "little":
+            samples.byteswap()
+        yield math.sqrt(sum(sample * sample for sample in samples) / len(samples)) if samples else 0.0
+
+def write_wav(path: Path, frames: Iterable[bytes], sample_rate: int = DECODE_SAMPLE_RATE) -> None:
+    """Write mono 16-bit PCM frames, as yielded by iter_pcm_frames, to a WAV file."""
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(DECODE_SAMPLE_WIDTH)
+        wav.setframerate(sample_rate)
+        for frame in frames:
+            wav.writeframes(frame)
+
+def get_audio_duration(file_path: Path) -> Optional[float]:
+    """Get the duration of an audio file in seconds, or None if it cannot be probed."""
+    try:
+        return probe_audio(file_path)["duration"]
+    except (AudioDecodeError, OSError):
+        return None
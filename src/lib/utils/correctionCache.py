@@ -0,0 +1,59 @@
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable
+
+class CorrectionCache:
+    """SQLite cache of corrected segment texts by hash of the original text."""
+
+    def __init__(self, path: Path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS corrections (
+                    key TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """
+        Look up corrected texts.
+
+        Args:
+            keys: Cache keys of the original texts
+
+        Returns:
+            Dict[str, str]: Corrected text by key, for the keys that are cached
+        """
+        keys = list(set(keys))
+        found = {}
+        with self._lock:
+            # Stay under SQLite's limit on query parameters
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, text FROM corrections WHERE key IN ({', '.join('?' * len(batch))})", batch
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def put_many(self, corrections: Dict[str, str]) -> None:
+        """Store corrected texts by cache key."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO corrections (key, text, created_at) VALUES (?, ?, ?)",
+                [(key, text, now) for key, text in corrections.items()]
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM corrections").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
@@ -1,63 +1,335 @@
 import os
+import re
+import json
+import asyncio
+import logging
+from pathlib import Path
 from typing import List, Dict, Optional
-import openai
-from src.lib.utils.transcription import transcribe_audio
+from src.lib.utils.transcription import get_transcript
+from src.lib.utils.artifacts import get_or_create_artifact, get_artifact_lock, get_artifact_path
+from src.lib.utils.transcript import Transcript, write_transcript
+from src.lib.utils.openaiClient import get_client, limit
+from src.lib.utils.prompts import MESSAGE_OVERHEAD_TOKENS, build_messages, count_tokens, get_prompt_budget, render_segments
 
-# Initialize OpenAI client
-client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+logger = logging.getLogger(__name__)
+
+# Constants
+DIARIZATION_MODEL = os.getenv("DIARIZATION_MODEL", "gpt-4")
+DIARIZATION_WINDOW_SEGMENTS = int(os.getenv("DIARIZATION_WINDOW_SEGMENTS", 150))  # Most segments labelled per request
+DIARIZATION_WINDOW_OVERLAP = int(os.getenv("DIARIZATION_WINDOW_OVERLAP", 20))  # Segments shared by consecutive windows
+DIARIZATION_CONCURRENCY = int(os.getenv("DIARIZATION_CONCURRENCY", 4))  # Windows labelled at once per transcript
+DIARIZATION_ATTEMPTS = int(os.getenv("DIARIZATION_ATTEMPTS", 2))  # Requests per window before its segments are left unlabelled
+DIARIZATION_SYSTEM = "You are a speaker diarization expert. Analyze the transcription and identify different speakers based on context, speech patterns, and content."
+MAPPING_ITEM = re.compile(
+    r"(?<![\w.])(\d+)[\"'\])]*\s*(?:->|=>|[:=]|-)\s*"
+    r"(?:\"([^\"\n]+)\"|'([^'\n]+)'|([^\"',;\n{}\[\]]+))"
+)
+
+def parse_speaker_mapping(content: str) -> Dict[int, str]:
+    """
+    Parse the segment index to speaker label mapping in a model reply.
+    
+    Accepts a JSON object ({"0": "Speaker 1", ...}), a JSON list of
+    {"segment": 0, "speaker": "Speaker 1"} items, or "0: Speaker 1" pairs,
+    optionally wrapped in a code fence or prose or truncated.
+    
+    Args:
+        content: Reply content
+        
+    Returns:
+        Dict[int, str]: Speaker label by segment index
+    """
+    for opening, closing in (("{", "}"), ("[", "]")):
+        start = content.find(opening)
+        end = content.rfind(closing)
+        if start == -1 or end < start:
+            continue
+        try:
+            data = json.loads(content[start:end + 1])
+        except ValueError:
+            continue
+        
+        if isinstance(data, dict):
+            items = data.items()
+        else:
+            items = [
+                (item.get("segment", item.get("index")), item.get("speaker", item.get("speaker_id")))
+                for item in data if isinstance(item, dict)
+            ]
+        mapping = {}
+        for index, speaker in items:
+            try:
+                mapping[int(index)] = str(speaker).strip()
+            except (TypeError, ValueError):
+                continue
+        if mapping:
+            return mapping
+    
+    # Not valid JSON, possibly truncated, read "index: speaker" pairs
+    mapping = {}
+    for match in MAPPING_ITEM.finditer(content):
+        index, *labels = match.groups()
+        label = next(label for label in labels if label).strip()
+        if label:
+            mapping[int(index)] = label
+    return mapping
+
+def fill_missing_speakers(labels: List[Optional[str]]) -> List[Optional[str]]:
+    """Give segments the model left out the speaker of the previous segment, or else the next one."""
+    filled = list(labels)
+    previous = None
+    for i, label in enumerate(filled):
+        if label is None:
+            filled[i] = previous
+        previous = filled[i]
+    following = None
+    for i in range(len(filled) - 1, -1, -1):
+        if filled[i] is None:
+            filled[i] = following
+        following = filled[i]
+    return filled
+
+def get_windows(
+    count: int,
+    size: int,
+    overlap: int,
+    segment_tokens: Optional[List[int]] = None,
+    max_tokens: Optional[int] = None
+) -> List[range]:
+    """
+    Split segment indexes into windows of at most size segments, consecutive windows sharing overlap segments.
+    
+    With segment_tokens, a window also ends before its segments go over
+    max_tokens, unless it would be empty. Windows share at most half their
+    segments with the next one, so short windows still advance.
+    
+    Args:
+        count: Number of segments
+        size: Most segments per window
+        overlap: Segments shared by consecutive windows
+        segment_tokens: Optional token count of each segment
+        max_tokens: Token budget of the segments of a window
+        
+    Returns:
+        List[range]: Segment index ranges of the windows
+    """
+    windows = []
+    start = 0
+    while True:
+        stop = min(start + size, count)
+        if segment_tokens is not None:
+            tokens = 0
+            for index in range(start, stop):
+                tokens += segment_tokens[index]
+                if tokens > max_tokens and index > start:
+                    stop = index
+                    break
+        windows.append(range(start, stop))
+        if stop >= count:
+            return windows
+        start = max(stop - min(overlap, (stop - start) // 2), start + 1)
+
+def _window_prompt(rendered: str, first_index: int) -> str:
+    """Build the prompt asking for the speakers of rendered segments starting at first_index."""
+    return f"""Identify the different speakers in this part of a transcription. 
+    Assign each segment a speaker label (Speaker 1, Speaker 2, etc.), 
+    the same label for every segment of the same speaker.
+    Respond only with a JSON object mapping each segment index to its speaker label, 
+    for example {{"{first_index}": "Speaker 1", "{first_index + 1}": "Speaker 2"}}.
+    
+    Segments, as [index start-end] text:
+    {rendered}
+    """
+
+def get_window_budget(count: int) -> int:
+    """
+    Get the number of tokens the segments of one window may use.
+    
+    Args:
+        count: Number of segments of the transcript, the longest index in a prompt
+        
+    Returns:
+        int: Prompt budget of the model left after the instructions
+    """
+    instructions = count_tokens(DIARIZATION_SYSTEM, DIARIZATION_MODEL) + count_tokens(_window_prompt("", count), DIARIZATION_MODEL)
+    return get_prompt_budget(DIARIZATION_MODEL) - instructions - 2 * MESSAGE_OVERHEAD_TOKENS
+
+def _new_speaker_label(used: set) -> str:
+    number = len(used) + 1
+    while f"Speaker {number}" in used:
+        number += 1
+    return f"Speaker {number}"
+
+def _match_unshared_label(local: str, matched: set, used: set, last_seen: Dict[str, int]) -> str:
+    """
+    Pick the label of a speaker who does not appear in the overlap with the previous window.
+    
+    The local name is kept unless another speaker of the window already
+    has it. Windows name speakers in their own order, so a taken name most
+    likely belongs to the speaker heard most recently that is not yet
+    matched in this window. Without one, the speaker is new.
+    """
+    if local not in matched:
+        return local
+    free = [label for label in used if label not in matched]
+    if free:
+        return max(free, key=lambda label: last_seen.get(label, -1))
+    return _new_speaker_label(used | matched)
+
+def reconcile_windows(windows: List[range], window_labels: List[List[Optional[str]]], count: int) -> List[Optional[str]]:
+    """
+    Combine the speaker labels of overlapping windows into one consistent labelling.
+    
+    Each window labels speakers independently, so its labels are matched to
+    the labels already assigned by comparing them on the segments it shares
+    with the previous window. Labels are matched one to one, most shared
+    segments first, then labels of speakers absent from the overlap are
+    matched by _match_unshared_label.
+    
+    Args:
+        windows: Segment index ranges of the windows, in order
+        window_labels: Speaker label of each segment of each window
+        count: Number of segments
+        
+    Returns:
+        List[Optional[str]]: Speaker label of every segment
+    """
+    labels: List[Optional[str]] = [None] * count
+    used = set()
+    last_seen: Dict[str, int] = {}
+    
+    for window, local_labels in zip(windows, window_labels):
+        # Count agreements between local and assigned labels on the shared segments
+        counts: Dict[tuple, int] = {}
+        for index, local in zip(window, local_labels):
+            if labels[index] is not None and local is not None:
+                counts[(local, labels[index])] = counts.get((local, labels[index]), 0) + 1
+        
+        mapping: Dict[str, str] = {}
+        matched = set()
+        for (local, assigned), _ in sorted(counts.items(), key=lambda item: -item[1]):
+            if local not in mapping and assigned not in matched:
+                mapping[local] = assigned
+                matched.add(assigned)
+        
+        for index, local in zip(window, local_labels):
+            if local is None:
+                continue
+            if local not in mapping:
+                mapping[local] = _match_unshared_label(local, matched, used, last_seen)
+                matched.add(mapping[local])
+                used.add(mapping[local])
+            # Segments shared with the previous window keep their label
+            if labels[index] is None:
+                labels[index] = mapping[local]
+                last_seen[labels[index]] = index
+    
+    return labels
+
+async def label_window(transcript: Transcript, window: range) -> List[Optional[str]]:
+    """
+    Ask the model for the speaker of each segment in a window.
+    
+    Args:
+        transcript: The transcript
+        window: Segment index range to label
+        
+    Returns:
+        List[Optional[str]]: Speaker label of each segment in the window, None if missing
+    """
+    segments = transcript[window.start:window.stop]
+    prompt = _window_prompt(render_segments(segments, first_index=window.start), window.start)
+    
+    async with limit("chat"):
+        response = await get_client().chat.completions.create(
+            model=DIARIZATION_MODEL,
+            messages=build_messages(DIARIZATION_SYSTEM, prompt, DIARIZATION_MODEL)
+        )
+    
+    mapping = parse_speaker_mapping(response.choices[0].message.content or "")
+    if not mapping:
+        raise ValueError(f"No speaker labels in reply for segments {window.start}-{window.stop - 1}")
+    return [mapping.get(index) for index in window]
 
 async def identify_speakers(transcription: Dict) -> List[Dict]:
     """
     Identify different speakers in the transcription using GPT-4.
     
+    Long transcriptions are labelled in overlapping windows of segments
+    that fit the prompt budget, processed concurrently, and the labels are
+    reconciled across windows. A window that still fails after
+    DIARIZATION_ATTEMPTS requests is left unlabelled and its segments take
+    the speakers of their neighbours.
+    
     Args:
         transcription: The transcription data from Whisper
         
     Returns:
-        List[Dict]: List of speaker segments with speaker IDs
+        List[Dict]: Speaker turns with speaker IDs, text and times
     """
     try:
-        # Prepare the prompt for GPT-4
-        prompt = f"""Analyze this transcription and identify different speakers. 
-        For each segment, assign a speaker ID (Speaker 1, Speaker 2, etc.).
-        Return the result as a list of segments with speaker IDs.
-        
-        Transcription:
-        {transcription['text']}
-        
-        Segments:
-        {transcription['segments']}
-        """
-        
-        response = await client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a speaker diarization expert. Analyze the transcription and identify different speakers based on context, speech patterns, and content."},
-                {"role": "user", "content": prompt}
-            ]
+        transcript = Transcript.from_segments(transcription['segments'])
+        if not len(transcript):
+            return []
+        
+        # Each segment costs its rendered line plus a line break
+        segment_tokens = [
+            count_tokens(render_segments(transcript[index:index + 1], first_index=index), DIARIZATION_MODEL) + 1
+            for index in range(len(transcript))
+        ]
+        windows = get_windows(
+            len(transcript),
+            DIARIZATION_WINDOW_SEGMENTS,
+            DIARIZATION_WINDOW_OVERLAP,
+            segment_tokens,
+            get_window_budget(len(transcript))
         )
+        semaphore = asyncio.Semaphore(DIARIZATION_CONCURRENCY)
+        errors: List[Exception] = []
         
-        # Parse the response and structure it
-        # This is a simplified version - in production, you'd want more robust parsing
-        speakers = []
-        current_speaker = None
+        async def label(window: range) -> Optional[List[Optional[str]]]:
+            async with semaphore:
+                for attempt in range(1, DIARIZATION_ATTEMPTS + 1):
+                    try:
+                        return await label_window(transcript, window)
+                    except Exception as e:
+                        errors.append(e)
+                        logger.warning(
+                            "Labelling segments %d-%d failed (attempt %d of %d): %s",
+                            window.start, window.stop - 1, attempt, DIARIZATION_ATTEMPTS, e
+                        )
+            return None
         
-        for segment in transcription['segments']:
-            # Use GPT-4's analysis to determine speaker
-            speaker_id = f"Speaker {len(speakers) + 1}"  # Simplified for now
-            
-            speakers.append({
-                "speaker_id": speaker_id,
-                "text": segment['text'],
-                "start": segment['start'],
-                "end": segment['end']
-            })
+        window_labels = await asyncio.gather(*[label(window) for window in windows])
+        # Unlabelled windows are filled from their neighbours, which needs at least one
+        if all(labels is None for labels in window_labels):
+            raise errors[-1]
+        window_labels = [[None] * len(window) if labels is None else labels for window, labels in zip(windows, window_labels)]
+        labels = reconcile_windows(windows, window_labels, len(transcript))
+        transcript.set_speakers(fill_missing_speakers(labels))
         
-        return speakers
+        return transcript.speaker_turns()
         
     except Exception as e:
         raise Exception(f"Speaker identification failed: {str(e)}")
 
+async def get_speakers(file_id: str, language: Optional[str] = None) -> List[Dict]:
+    """
+    Get the speaker segments of a file, computing them at most once per file_id.
+    
+    Args:
+        file_id: The ID of the uploaded file
+        language: Optional language code
+        
+    Returns:
+        List[Dict]: List of speaker segments with speaker IDs
+    """
+    async def produce() -> List[Dict]:
+        transcription = await get_transcript(file_id, language)
+        return await identify_speakers(transcription)
+    
+    return await get_or_create_artifact(file_id, "speakers", produce, language)
+
 async def process_audio_with_diarization(file_id: str, language: Optional[str] = None) -> Dict:
     """
     Process an audio file with both transcription and speaker diarization.
@@ -67,16 +339,44 @@ async def process_audio_with_diarization(file_id: str, language: Optional[str] =
         language: Optional language code
         
     Returns:
-        dict: Contains transcription and speaker information
+        dict: Contains transcription, segments and speaker information
     """
     # First, get the transcription
-    transcription = await transcribe_audio(file_id, language)
+    transcription = await get_transcript(file_id, language)
     
     # Then, identify speakers
-    speakers = await identify_speakers(transcription)
+    speakers = await get_speakers(file_id, language)
     
     return {
         "transcription": transcription["text"],
+        "segments": transcription["segments"],
         "speakers": speakers,
         "language": transcription["language"]
-    } 
\ No newline at end of file
+    }
+
+async def get_transcript_file(file_id: str, language: Optional[str] = None) -> Path:
+    """
+    Get the binary transcript file of a file, writing it from the diarized transcript on first use.
+    
+    Every segment is stored with its speaker, so a time range can be read
+    with open_transcript without loading the transcript or speaker artifacts.
+    
+    Args:
+        file_id: The ID of the uploaded file
+        language: Optional language code
+        
+    Returns:
+        Path: Path of the binary transcript file
+    """
+    path = get_artifact_path(file_id, "transcript", language, extension="bin")
+    if path.exists():
+        return path
+    
+    # Produce the transcript and speakers first, they take their own stage locks
+    result = await process_audio_with_diarization(file_id, language)
+    async with get_artifact_lock(file_id, "transcript", language):
+        # Another request may have written it while we waited
+        if not path.exists():
+            transcript = Transcript.from_segments(result["segments"], result["speakers"])
+            await asyncio.to_thread(write_transcript, transcript, path)
+    return path
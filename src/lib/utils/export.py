@@ -1,7 +1,36 @@
-from typing import Dict, List, Optional
-from datetime import timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 from pathlib import Path
 import json
+from src.lib.utils.transcript import MappedTranscript, Transcript
+
+# Size of the blocks written to the client when streaming an export
+STREAM_BUFFER_SIZE = 64 * 1024
+# Number of cues whose timestamps are formatted together
+TIMESTAMP_BATCH_SIZE = 1024
+
+def format_timestamps(times: Sequence[float], separator: str = ",") -> List[str]:
+    """
+    Format a batch of times in seconds into HH:MM:SS,mmm timestamps.
+    
+    Each time is rounded to whole milliseconds once and split with integer
+    arithmetic, which is much cheaper per cue than going through timedelta.
+    
+    Args:
+        times: Times in seconds
+        separator: Separator before the milliseconds ("," for SRT, "." for VTT)
+        
+    Returns:
+        List[str]: Formatted timestamps, in the same order
+    """
+    timestamps = []
+    append = timestamps.append
+    for time in times:
+        milliseconds = max(round(time * 1000), 0)
+        hours, milliseconds = divmod(milliseconds, 3_600_000)
+        minutes, milliseconds = divmod(milliseconds, 60_000)
+        seconds, milliseconds = divmod(milliseconds, 1000)
+        append(f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{milliseconds:03d}")
+    return timestamps
 
 def format_timestamp(seconds: float) -> str:
     """
@@ -13,48 +42,192 @@ def format_timestamp(seconds: float) -> str:
     Returns:
         str: Formatted timestamp
     """
-    time = timedelta(seconds=seconds)
-    hours = int(time.total_seconds() // 3600)
-    minutes = int((time.total_seconds() % 3600) // 60)
-    seconds = time.total_seconds() % 60
-    milliseconds = int((seconds % 1) * 1000)
-    seconds = int(seconds)
+    return format_timestamps((seconds,))[0]
+
+def get_transcript(transcription: Dict) -> Transcript:
+    """
+    Get the segments of a transcription as a Transcript.
     
-    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+    Args:
+        transcription: Dictionary containing either a Transcript under
+            "transcript", or segments and optional speaker turns
+        
+    Returns:
+        Transcript: Segments with their aligned speakers
+    """
+    transcript = transcription.get("transcript")
+    if isinstance(transcript, Transcript):
+        return transcript
+    return Transcript.from_segments(transcription.get("segments", []), transcription.get("speakers"))
 
-def export_to_txt(transcription: Dict) -> str:
+def select_time_range(
+    transcription: Dict,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    rebase: bool = False,
+    transcript: Optional[Union[Transcript, MappedTranscript]] = None
+) -> Dict:
     """
-    Export transcription to plain text format.
+    Restrict a transcription to the segments overlapping a time range.
+    
+    Overlapping segments are found by binary search over the sorted segment
+    times instead of scanning every segment.
     
     Args:
         transcription: Dictionary containing transcription data
+        start: Start of the range in seconds (default: beginning)
+        end: End of the range in seconds (default: end of the transcription)
+        rebase: Shift the selected segments so the range starts at zero
+        transcript: Optional Transcript or MappedTranscript to read the
+            segments and their speakers from instead of the transcription
         
     Returns:
-        str: Formatted text content
+        dict: Transcription data with only the overlapping segments, their
+            text and speaker turns
+        
+    Raises:
+        ValueError: If the range is empty
     """
-    text = []
+    start = 0.0 if start is None else start
+    end = float("inf") if end is None else end
+    if start < 0 or end <= start:
+        raise ValueError(f"Invalid time range: {start} to {end}")
     
-    # Add transcription text
-    text.append(transcription["text"])
-    text.append("\n")
+    if transcript is None:
+        transcript = get_transcript(transcription)
+    first, last = transcript.find_range(start, end)
+    clip = transcript[first:last]
+    if rebase:
+        clip = clip.shift(-start)
+    
+    selected = {
+        **transcription,
+        "segments": [{"text": segment.text, "start": segment.start, "end": segment.end} for segment in clip]
+    }
+    # Replace the full text wherever it is carried, pipeline results keep it
+    # under "transcription"
+    text = "".join(segment.text for segment in clip).strip()
+    for key in [key for key in ("text", "transcription") if key in transcription] or ["text"]:
+        selected[key] = text
+    if "speakers" in transcription or transcript.speakers:
+        selected["speakers"] = clip.speaker_turns()
+    return selected
+
+def _iter_cue_times(transcript: Transcript, separator: str) -> Iterator[Tuple[int, str, str]]:
+    """Yield (index, start, end) for each segment with timestamps formatted in batches."""
+    for batch_start in range(0, len(transcript), TIMESTAMP_BATCH_SIZE):
+        batch_end = batch_start + TIMESTAMP_BATCH_SIZE
+        starts = format_timestamps(transcript.starts[batch_start:batch_end], separator)
+        ends = format_timestamps(transcript.ends[batch_start:batch_end], separator)
+        for offset in range(len(starts)):
+            yield batch_start + offset, starts[offset], ends[offset]
+
+def iter_txt(transcription: Dict) -> Iterator[bytes]:
+    """
+    Export transcription to plain text format, one line at a time.
+    
+    Args:
+        transcription: Dictionary containing transcription data
+        
+    Yields:
+        bytes: UTF-8 encoded chunks of the text content
+    """
+    # Add transcription text, pipeline results carry it under "transcription"
+    yield transcription.get("text", transcription.get("transcription", "")).encode()
+    yield b"\n\n"
     
     # Add speaker information if available
     if "speakers" in transcription:
-        text.append("\nSpeaker Information:")
+        yield b"\n\nSpeaker Information:"
         for speaker in transcription["speakers"]:
-            text.append(f"{speaker['speaker_id']}: {speaker['text']}")
+            yield f"\n{speaker['speaker_id']}: {speaker['text']}".encode()
     
     # Add summary if available
     if "summary" in transcription:
-        text.append("\nSummary:")
-        text.append(transcription["summary"])
+        yield f"\n\nSummary:\n{transcription['summary']}".encode()
     
     # Add key points if available
     if "key_points" in transcription:
-        text.append("\nKey Points:")
-        text.append(transcription["key_points"])
+        yield f"\n\nKey Points:\n{transcription['key_points']}".encode()
+
+def iter_srt(transcription: Dict) -> Iterator[bytes]:
+    """
+    Export transcription to SRT format, one cue at a time.
+    
+    Args:
+        transcription: Dictionary containing transcription data
+        
+    Yields:
+        bytes: UTF-8 encoded SRT cues
+    """
+    transcript = get_transcript(transcription)
     
-    return "\n".join(text)
+    for index, start_time, end_time in _iter_cue_times(transcript, ","):
+        # Add speaker information if available
+        speaker = transcript.get_speaker(index)
+        speaker_text = f"{speaker}: " if speaker else ""
+        
+        # Create SRT entry, cues are separated by a blank line
+        separator = "\n" if index else ""
+        yield f"{separator}{index + 1}\n{start_time} --> {end_time}\n{speaker_text}{transcript.get_text(index)}\n".encode()
+
+def iter_vtt(transcription: Dict) -> Iterator[bytes]:
+    """
+    Export transcription to WebVTT format, one cue at a time.
+    
+    Args:
+        transcription: Dictionary containing transcription data
+        
+    Yields:
+        bytes: UTF-8 encoded WebVTT header and cues
+    """
+    transcript = get_transcript(transcription)
+    
+    yield b"WEBVTT\n"
+    
+    # VTT uses . instead of , for milliseconds
+    for index, start_time, end_time in _iter_cue_times(transcript, "."):
+        # Add speaker information if available
+        speaker = transcript.get_speaker(index)
+        speaker_text = f"{speaker}: " if speaker else ""
+        
+        # Create VTT entry, preceded by a blank line
+        yield f"\n{start_time} --> {end_time}\n{speaker_text}{transcript.get_text(index)}\n".encode()
+
+def iter_json(transcription: Dict, chunk_size: int = 4096) -> Iterator[bytes]:
+    """
+    Export transcription to JSON format incrementally.
+    
+    Args:
+        transcription: Dictionary containing transcription data
+        chunk_size: Approximate size in characters of each chunk
+        
+    Yields:
+        bytes: UTF-8 encoded chunks of the JSON document
+    """
+    buffer = []
+    buffered = 0
+    for piece in json.JSONEncoder(indent=2).iterencode(transcription):
+        buffer.append(piece)
+        buffered += len(piece)
+        if buffered >= chunk_size:
+            yield "".join(buffer).encode()
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+def export_to_txt(transcription: Dict) -> str:
+    """
+    Export transcription to plain text format.
+    
+    Args:
+        transcription: Dictionary containing transcription data
+        
+    Returns:
+        str: Formatted text content
+    """
+    return b"".join(iter_txt(transcription)).decode()
 
 def export_to_srt(transcription: Dict) -> str:
     """
@@ -66,30 +239,7 @@ def export_to_srt(transcription: Dict) -> str:
     Returns:
         str: Formatted SRT content
     """
-    srt = []
-    
-    for i, segment in enumerate(transcription["segments"], 1):
-        # Format timestamps
-        start_time = format_timestamp(segment["start"])
-        end_time = format_timestamp(segment["end"])
-        
-        # Add speaker information if available
-        speaker_text = ""
-        if "speakers" in transcription:
-            for speaker in transcription["speakers"]:
-                if speaker["start"] == segment["start"] and speaker["end"] == segment["end"]:
-                    speaker_text = f"{speaker['speaker_id']}: "
-                    break
-        
-        # Create SRT entry
-        srt.extend([
-            str(i),
-            f"{start_time} --> {end_time}",
-            f"{speaker_text}{segment['text']}",
-            ""
-        ])
-    
-    return "\n".join(srt)
+    return b"".join(iter_srt(transcription)).decode()
 
 def export_to_vtt(transcription: Dict) -> str:
     """
@@ -101,29 +251,7 @@ def export_to_vtt(transcription: Dict) -> str:
     Returns:
         str: Formatted VTT content
     """
-    vtt = ["WEBVTT", ""]
-    
-    for segment in transcription["segments"]:
-        # Format timestamps (VTT uses . instead of , for milliseconds)
-        start_time = format_timestamp(segment["start"]).replace(",", ".")
-        end_time = format_timestamp(segment["end"]).replace(",", ".")
-        
-        # Add speaker information if available
-        speaker_text = ""
-        if "speakers" in transcription:
-            for speaker in transcription["speakers"]:
-                if speaker["start"] == segment["start"] and speaker["end"] == segment["end"]:
-                    speaker_text = f"{speaker['speaker_id']}: "
-                    break
-        
-        # Create VTT entry
-        vtt.extend([
-            f"{start_time} --> {end_time}",
-            f"{speaker_text}{segment['text']}",
-            ""
-        ])
-    
-    return "\n".join(vtt)
+    return b"".join(iter_vtt(transcription)).decode()
 
 def export_to_json(transcription: Dict) -> str:
     """
@@ -135,7 +263,47 @@ def export_to_json(transcription: Dict) -> str:
     Returns:
         str: JSON formatted content
     """
-    return json.dumps(transcription, indent=2)
+    return b"".join(iter_json(transcription)).decode()
+
+def _buffer_chunks(chunks: Iterable[bytes], buffer_size: int) -> Iterator[bytes]:
+    """Coalesce small chunks into blocks of about buffer_size bytes."""
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        if len(buffer) >= buffer_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+def stream_transcription(transcription: Dict, format: str, buffer_size: int = STREAM_BUFFER_SIZE) -> Iterator[bytes]:
+    """
+    Export transcription to the specified format as a stream of bytes.
+    
+    Args:
+        transcription: Dictionary containing transcription data
+        format: Export format (txt, srt, vtt, json)
+        buffer_size: Approximate size in bytes of each yielded block
+        
+    Returns:
+        Iterator[bytes]: UTF-8 encoded content in the specified format
+        
+    Raises:
+        ValueError: If the format is not supported
+    """
+    exporters = {
+        "txt": iter_txt,
+        "srt": iter_srt,
+        "vtt": iter_vtt,
+        "json": iter_json
+    }
+    
+    # Validated here rather than inside a generator so errors surface before streaming starts
+    exporter = exporters.get(format.lower())
+    if exporter is None:
+        raise ValueError(f"Unsupported export format: {format}")
+    
+    return _buffer_chunks(exporter(transcription), buffer_size)
 
 def export_transcription(transcription: Dict, format: str) -> str:
     """
@@ -1,11 +1,15 @@
 import pytest
 from src.lib.utils.export import (
     format_timestamp,
+    format_timestamps,
     export_to_txt,
     export_to_srt,
     export_to_vtt,
     export_to_json,
-    export_transcription
+    export_transcription,
+    iter_srt,
+    stream_transcription,
+    select_time_range
 )
 
 def test_format_timestamp():
@@ -18,6 +22,18 @@ def test_format_timestamp():
     # Test with hours
     assert format_timestamp(3661.123) == "01:01:01,123"
 
+def test_format_timestamps():
+    times = [0, 0.0006, 65.5, 3661.123, 359999.999, -0.2]
+    assert format_timestamps(times) == [
+        "00:00:00,000",
+        "00:00:00,001",
+        "00:01:05,500",
+        "01:01:01,123",
+        "99:59:59,999",
+        "00:00:00,000"
+    ]
+    assert format_timestamps([65.5], ".") == ["00:01:05.500"]
+
 def test_export_to_txt():
     # Test data
     transcription = {
@@ -122,4 +138,107 @@ def test_export_transcription():
     # Test invalid format
     with pytest.raises(ValueError) as exc_info:
         export_transcription(transcription, "invalid")
-    assert "Unsupported export format" in str(exc_info.value) 
\ No newline at end of file
+    assert "Unsupported export format" in str(exc_info.value)
+
+def test_stream_transcription_matches_export():
+    transcription = {
+        "text": "Hello world.",
+        "segments": [
+            {"text": "Hello", "start": 0.0, "end": 1.0},
+            {"text": "world.", "start": 1.0, "end": 2.0}
+        ],
+        "speakers": [
+            {"speaker_id": "Speaker 1", "text": "Hello", "start": 0.0, "end": 1.0},
+            {"speaker_id": "Speaker 2", "text": "world.", "start": 1.0, "end": 2.0}
+        ],
+        "summary": "A greeting exchange",
+        "key_points": "1. Speaker 1 said hello"
+    }
+    
+    for format in ["txt", "srt", "vtt", "json"]:
+        chunks = list(stream_transcription(transcription, format, buffer_size=16))
+        assert b"".join(chunks).decode() == export_transcription(transcription, format)
+    
+    # Unsupported formats fail before anything is streamed
+    with pytest.raises(ValueError):
+        stream_transcription(transcription, "pdf")
+
+def test_iter_srt_yields_one_cue_per_segment():
+    transcription = {
+        "segments": [
+            {"text": f"Segment {i}", "start": float(i), "end": float(i + 1)}
+            for i in range(100)
+        ]
+    }
+    
+    cues = list(iter_srt(transcription))
+    assert len(cues) == 100
+    assert cues[0] == b"1\n00:00:00,000 --> 00:00:01,000\nSegment 0\n"
+    assert cues[1].startswith(b"\n2\n")
+
+def test_export_to_srt_with_mismatched_speaker_times():
+    transcription = {
+        "segments": [{"text": "Hello", "start": 0.0, "end": 1.0}],
+        "speakers": [{"speaker_id": "Speaker 1", "text": "Hello", "start": 0.001, "end": 0.999}]
+    }
+    assert "Speaker 1: Hello" in export_to_srt(transcription)
+
+def test_select_time_range():
+    transcription = {
+        "text": "One two three four.",
+        "segments": [
+            {"text": " One", "start": 0.0, "end": 60.0},
+            {"text": " two", "start": 60.0, "end": 120.0},
+            {"text": " three", "start": 120.0, "end": 180.0},
+            {"text": " four.", "start": 180.0, "end": 240.0}
+        ],
+        "speakers": [
+            {"speaker_id": "Speaker 1", "text": " One two", "start": 0.0, "end": 120.0},
+            {"speaker_id": "Speaker 2", "text": " three four.", "start": 120.0, "end": 240.0}
+        ],
+        "language": "en"
+    }
+    
+    clip = select_time_range(transcription, 90.0, 150.0)
+    assert clip["text"] == "two three"
+    assert clip["segments"] == transcription["segments"][1:3]
+    assert clip["speakers"] == [
+        {"speaker_id": "Speaker 1", "text": " two", "start": 60.0, "end": 120.0},
+        {"speaker_id": "Speaker 2", "text": " three", "start": 120.0, "end": 180.0}
+    ]
+    assert clip["language"] == "en"
+    
+    rebased = select_time_range(transcription, 90.0, 150.0, rebase=True)
+    assert [(segment["start"], segment["end"]) for segment in rebased["segments"]] == [(0.0, 30.0), (30.0, 90.0)]
+    assert "00:00:00,000 --> 00:00:30,000\nSpeaker 1:  two" in export_to_srt(rebased)
+    
+    assert select_time_range(transcription, start=200.0)["text"] == "four."
+    assert select_time_range(transcription, end=30.0)["text"] == "One"
+    assert select_time_range(transcription, 300.0, 400.0)["segments"] == []
+    
+    with pytest.raises(ValueError):
+        select_time_range(transcription, 150.0, 90.0)
+
+def test_select_time_range_json_export():
+    transcription = {
+        "transcription": "One two three four.",
+        "segments": [
+            {"text": " One", "start": 0.0, "end": 60.0},
+            {"text": " two", "start": 60.0, "end": 120.0},
+            {"text": " three", "start": 120.0, "end": 180.0},
+            {"text": " four.", "start": 180.0, "end": 240.0}
+        ],
+        "speakers": [
+            {"speaker_id": "Speaker 1", "text": " One two", "start": 0.0, "end": 120.0},
+            {"speaker_id": "Speaker 2", "text": " three four.", "start": 120.0, "end": 240.0}
+        ]
+    }
+    
+    clip = select_time_range(transcription, 90.0, 150.0)
+    assert clip["transcription"] == "two three"
+    assert "text" not in clip
+    
+    result = export_to_json(clip)
+    assert "two three" in result
+    assert "One" not in result
+    assert "four" not in result
@@ -1,18 +1,55 @@
 import os
+import sys
+import asyncio
+import time
 import uuid
+import shutil
+import hashlib
+import threading
+import argparse
+import tempfile
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import AsyncIterator, Dict, List, Optional, Union
 from fastapi import UploadFile, HTTPException
+from src.lib.utils.artifacts import delete_artifacts
+from src.lib.utils.fileIndex import FileIndex
+from src.lib.utils.audioDecoding import AudioDecodeError, get_audio_duration, probe_audio
 
 # Constants
 ALLOWED_EXTENSIONS = {'mp3', 'mp4', 'wav'}
 MAX_FILE_SIZE = 500 * 1024 * 1024  # 500MB in bytes
 UPLOAD_DIR = Path("uploads")
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB chunks
+INDEX_FILENAME = "index.db"
+UPLOAD_SESSION_TTL = 24 * 60 * 60  # Seconds without new bytes before a resumable upload is discarded
+
+_indexes: Dict[Path, FileIndex] = {}
+_session_locks: Dict[str, asyncio.Lock] = {}
+# Uploads are committed from worker threads, the duplicate check and insert must not interleave
+_commit_lock = threading.Lock()
 
 def ensure_upload_dir():
     """Ensure the upload directory exists."""
     UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+def get_file_index() -> FileIndex:
+    """Get the index of files stored in UPLOAD_DIR, creating it on first use."""
+    index_path = UPLOAD_DIR / INDEX_FILENAME
+    if index_path not in _indexes:
+        _indexes[index_path] = FileIndex(index_path)
+    return _indexes[index_path]
+
+def _find_file_index() -> Optional[FileIndex]:
+    """Get the index of files stored in UPLOAD_DIR for a lookup, or None if nothing was indexed yet."""
+    index_path = UPLOAD_DIR / INDEX_FILENAME
+    if index_path not in _indexes and not index_path.exists():
+        return None
+    return get_file_index()
+
+def get_shard_dir(file_id: str) -> Path:
+    """Get the sharded directory for a file ID, e.g. uploads/ab/cd for abcd1234-..."""
+    return UPLOAD_DIR / file_id[:2] / file_id[2:4]
+
 def get_file_extension(filename: str) -> str:
     """Get the file extension from a filename."""
     return filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
@@ -22,60 +59,471 @@ def is_allowed_file(filename: str) -> bool:
     return get_file_extension(filename) in ALLOWED_EXTENSIONS
 
 async def validate_file(file: UploadFile) -> None:
-    """Validate the uploaded file."""
+    """
+    Validate the uploaded file type.
+    
+    The size limit is enforced while the file is saved, so the upload is
+    only read once.
+    """
     if not is_allowed_file(file.filename):
         raise HTTPException(
             status_code=400,
             detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
         )
+
+def _file_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail=f"File too large. Maximum size is {MAX_FILE_SIZE / (1024 * 1024)}MB"
+    )
+
+def _commit_upload(tmp_path: Path, extension: str, file_size: int, file_hash: str) -> dict:
+    """
+    Move a fully received upload into its shard directory and index it.
     
-    # Check file size
+    Content that was already uploaded is not stored again, the temporary
+    file is dropped and the existing file_id is returned instead. The audio
+    duration is probed and indexed, or left empty if the file can't be probed.
+    """
+    # Probed before taking the lock, ffprobe is slow
+    duration = get_audio_duration(tmp_path)
+    index = get_file_index()
+    with _commit_lock:
+        existing_id = index.find_by_hash(file_hash)
+        existing_path = get_file_path(existing_id) if existing_id else None
+        if existing_path and existing_path.exists():
+            tmp_path.unlink()
+            # Each upload holds a reference, the file is deleted with the last one
+            index.add_reference(existing_id)
+            return {
+                "file_id": existing_id,
+                "path": existing_path,
+                "size": file_size,
+                "sha256": file_hash,
+                "duplicate": True
+            }
+        
+        # Generate unique filename
+        file_id = str(uuid.uuid4())
+        file_path = get_shard_dir(file_id) / f"{file_id}.{extension}"
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, file_path)
+        index.add(
+            file_id,
+            path=file_path.relative_to(UPLOAD_DIR).as_posix(),
+            extension=extension,
+            size=file_size,
+            file_hash=file_hash,
+            duration=duration,
+            created_at=time.time()
+        )
+        
+        return {
+            "file_id": file_id,
+            "path": file_path,
+            "size": file_size,
+            "sha256": file_hash,
+            "duplicate": False
+        }
+
+async def store_upload_file(file: UploadFile) -> dict:
+    """
+    Save the uploaded file in a single streaming pass.
+    
+    The upload is written to a temporary file in UPLOAD_DIR while its size is
+    checked against MAX_FILE_SIZE and its SHA-256 hash computed, then renamed
+    into place. Oversized uploads are aborted as soon as they pass the limit.
+    
+    Content that was already uploaded is not stored again, the existing
+    file_id is returned instead.
+    
+    Args:
+        file: The uploaded file
+        
+    Returns:
+        dict: Contains file_id, path, size, sha256 and whether it was a duplicate
+    """
+    ensure_upload_dir()
+    
+    fd, tmp_name = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".part")
+    digest = hashlib.sha256()
     file_size = 0
-    chunk_size = 1024 * 1024  # 1MB chunks
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > MAX_FILE_SIZE:
+                    raise _file_too_large()
+                digest.update(chunk)
+                buffer.write(chunk)
+        
+        return await asyncio.to_thread(
+            _commit_upload, Path(tmp_name), get_file_extension(file.filename), file_size, digest.hexdigest()
+        )
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+async def save_upload_file(file: UploadFile) -> str:
+    """Save the uploaded file and return its unique identifier."""
+    return (await store_upload_file(file))["file_id"]
+
+def get_session_dir() -> Path:
+    """Get the directory holding partially received resumable uploads."""
+    return UPLOAD_DIR / ".sessions"
+
+def _get_session(session_id: str) -> Dict:
+    index = _find_file_index()
+    session = index.get_session(session_id) if index is not None else None
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Upload session not found: {session_id}")
+    return session
+
+def _get_part_path(session_id: str) -> Path:
+    return get_session_dir() / f"{session_id}.part"
+
+def create_upload_session(filename: str, size: int) -> Dict:
+    """
+    Start a resumable upload.
+    
+    Args:
+        filename: Name of the file being uploaded
+        size: Total size of the file in bytes
+        
+    Returns:
+        dict: Contains session_id, offset and size
+    """
+    if not is_allowed_file(filename):
+        raise HTTPException(
+            status_code=400,
+            detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+    if size <= 0:
+        raise HTTPException(status_code=400, detail="File size must be positive")
+    if size > MAX_FILE_SIZE:
+        raise _file_too_large()
+    
+    expire_upload_sessions()
+    session_id = str(uuid.uuid4())
+    get_session_dir().mkdir(parents=True, exist_ok=True)
+    _get_part_path(session_id).touch()
+    get_file_index().add_session(session_id, filename, get_file_extension(filename), size)
+    
+    return {
+        "session_id": session_id,
+        "offset": 0,
+        "size": size
+    }
+
+def get_upload_session(session_id: str) -> Dict:
+    """
+    Get the progress of a resumable upload.
+    
+    Returns:
+        dict: Contains session_id, offset (bytes received so far) and size
+    """
+    session = _get_session(session_id)
+    return {
+        "session_id": session_id,
+        "offset": _get_part_path(session_id).stat().st_size,
+        "size": session["size"]
+    }
+
+async def append_upload_chunk(
+    session_id: str,
+    offset: int,
+    chunks: AsyncIterator[bytes],
+    length: Optional[int] = None,
+    total: Optional[int] = None
+) -> int:
+    """
+    Append a byte range to a resumable upload.
+    
+    The data is streamed straight onto the end of the partial file. A range
+    that does not start at the current offset is rejected with 409 so the
+    client can query the offset and resume from there.
+    
+    Args:
+        session_id: The upload session ID
+        offset: Position of the first byte of this range
+        chunks: The range contents
+        length: Optional expected length of the range
+        total: Optional total file size the client sent, must match the session
+        
+    Returns:
+        int: The new offset
+    """
+    session = _get_session(session_id)
+    if total is not None and total != session["size"]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Total size {total} does not match the session size {session['size']}"
+        )
+    lock = _session_locks.setdefault(session_id, asyncio.Lock())
+    async with lock:
+        part_path = _get_part_path(session_id)
+        current = part_path.stat().st_size
+        if offset != current:
+            raise HTTPException(status_code=409, detail=f"Expected offset {current}")
+        
+        received = 0
+        with open(part_path, "ab") as buffer:
+            try:
+                async for chunk in chunks:
+                    received += len(chunk)
+                    if current + received > session["size"]:
+                        raise HTTPException(status_code=400, detail="Range exceeds the declared file size")
+                    buffer.write(chunk)
+                if length is not None and received != length:
+                    raise HTTPException(status_code=400, detail=f"Expected {length} bytes, received {received}")
+            except BaseException:
+                # Drop the incomplete range so the client can resend it
+                buffer.truncate(current)
+                raise
+        
+        return current + received
+
+async def finalize_upload_session(session_id: str) -> Dict:
+    """
+    Complete a resumable upload once all bytes were received.
     
-    while chunk := await file.read(chunk_size):
-        file_size += len(chunk)
-        if file_size > MAX_FILE_SIZE:
+    Returns:
+        dict: Contains file_id, path, size, sha256 and whether it was a duplicate
+    """
+    session = _get_session(session_id)
+    lock = _session_locks.setdefault(session_id, asyncio.Lock())
+    async with lock:
+        part_path = _get_part_path(session_id)
+        received = part_path.stat().st_size
+        if received != session["size"]:
             raise HTTPException(
-                status_code=400,
-                detail=f"File too large. Maximum size is {MAX_FILE_SIZE / (1024 * 1024)}MB"
+                status_code=409,
+                detail=f"Upload incomplete: received {received} of {session['size']} bytes"
             )
+        
+        file_hash = await asyncio.to_thread(hash_file, part_path)
+        saved = await asyncio.to_thread(_commit_upload, part_path, session["extension"], received, file_hash)
+        get_file_index().remove_session(session_id)
     
-    # Reset file pointer
-    await file.seek(0)
+    _session_locks.pop(session_id, None)
+    return saved
 
-async def save_upload_file(file: UploadFile) -> str:
-    """Save the uploaded file and return its unique identifier."""
-    ensure_upload_dir()
+def delete_upload_session(session_id: str) -> None:
+    """Abort a resumable upload and discard the received bytes."""
+    _get_session(session_id)
+    _get_part_path(session_id).unlink(missing_ok=True)
+    get_file_index().remove_session(session_id)
+    _session_locks.pop(session_id, None)
+
+def expire_upload_sessions(ttl: float = UPLOAD_SESSION_TTL) -> int:
+    """
+    Discard resumable uploads that received no bytes for longer than ttl.
+    
+    Partial files left without a session are removed as well.
     
-    # Generate unique filename
-    file_id = str(uuid.uuid4())
-    extension = get_file_extension(file.filename)
-    filename = f"{file_id}.{extension}"
-    file_path = UPLOAD_DIR / filename
+    Args:
+        ttl: Idle time in seconds after which a session expires
+        
+    Returns:
+        int: Number of sessions discarded
+    """
+    index = _find_file_index()
+    if index is None:
+        return 0
     
-    # Save file
-    with open(file_path, "wb") as buffer:
-        while chunk := await file.read(1024 * 1024):  # 1MB chunks
-            buffer.write(chunk)
+    cutoff = time.time() - ttl
+    expired = 0
+    sessions = set()
+    for session in index.list_sessions():
+        session_id = session["session_id"]
+        sessions.add(session_id)
+        lock = _session_locks.get(session_id)
+        if lock is not None and lock.locked():
+            continue
+        part_path = _get_part_path(session_id)
+        last_active = part_path.stat().st_mtime if part_path.exists() else session["created_at"]
+        if last_active < cutoff:
+            part_path.unlink(missing_ok=True)
+            index.remove_session(session_id)
+            _session_locks.pop(session_id, None)
+            expired += 1
     
-    return file_id
+    session_dir = get_session_dir()
+    if session_dir.exists():
+        for part_path in session_dir.glob("*.part"):
+            if part_path.stem not in sessions and part_path.stat().st_mtime < cutoff:
+                part_path.unlink(missing_ok=True)
+    
+    return expired
+
+def hash_file(file_path: Path, chunk_size: int = UPLOAD_CHUNK_SIZE) -> str:
+    """Compute the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 def get_file_path(file_id: str) -> Optional[Path]:
-    """Get the file path for a given file ID."""
-    for ext in ALLOWED_EXTENSIONS:
-        path = UPLOAD_DIR / f"{file_id}.{ext}"
-        if path.exists():
-            return path
+    """
+    Get the file path for a given file ID.
+    
+    Looks the file up in the index first and only probes the sharded and
+    the legacy flat layout for each allowed extension for files that are
+    not indexed.
+    """
+    index = _find_file_index()
+    record = index.get(file_id) if index is not None else None
+    if record:
+        return UPLOAD_DIR / record["path"]
+    
+    for directory in (get_shard_dir(file_id), UPLOAD_DIR):
+        for ext in ALLOWED_EXTENSIONS:
+            path = directory / f"{file_id}.{ext}"
+            if path.exists():
+                return path
     return None
 
+def get_file_metadata(file_id: str) -> Optional[Dict]:
+    """
+    Get the stored metadata of a file.
+    
+    Returns:
+        Optional[Dict]: Contains file_id, path, extension, size, hash, duration and created_at
+    """
+    index = _find_file_index()
+    return index.get(file_id) if index is not None else None
+
 def delete_file(file_id: str) -> bool:
-    """Delete a file by its ID."""
+    """
+    Delete a file and its stored pipeline results by its ID.
+    
+    Uploads of identical content share one file ID, so the file is only
+    removed once every upload of it was deleted.
+    
+    Returns:
+        bool: True if the file was removed from disk
+    """
     file_path = get_file_path(file_id)
-    if file_path and file_path.exists():
-        file_path.unlink()
-        return True
-    return False
+    index = _find_file_index()
+    # An upload of the same content must not reference the file while it is removed
+    with _commit_lock:
+        indexed = index is not None and index.get(file_id) is not None
+        if not indexed and file_path is None:
+            return False
+        if indexed and index.release(file_id) > 0:
+            return False
+        try:
+            delete_artifacts(file_id)
+        except ValueError:
+            # Not a UUID, no pipeline results were ever stored for it
+            pass
+        if file_path and file_path.exists():
+            file_path.unlink()
+            return True
+        return False
+
+def rebuild_index() -> int:
+    """
+    Rebuild the file index from the files in UPLOAD_DIR.
+    
+    Used to recover a lost or corrupt index. Every file is re-hashed, so this
+    reads all uploads once.
+    
+    Returns:
+        int: Number of files indexed
+    """
+    ensure_upload_dir()
+    index = get_file_index()
+    index.clear()
+    
+    count = 0
+    for path in UPLOAD_DIR.rglob("*"):
+        if not path.is_file() or not is_allowed_file(path.name):
+            continue
+        stat = path.stat()
+        index.add(
+            path.stem,
+            path=path.relative_to(UPLOAD_DIR).as_posix(),
+            extension=get_file_extension(path.name),
+            size=stat.st_size,
+            file_hash=hash_file(path),
+            duration=get_audio_duration(path),
+            created_at=stat.st_mtime
+        )
+        count += 1
+    
+    return count
+
+def migrate_flat_uploads(batch_size: int = 1000, pause: float = 0.0) -> int:
+    """
+    Move files from the legacy flat UPLOAD_DIR layout into shard directories.
+    
+    Safe to run while the service is serving requests: each file is first
+    hard linked into its shard, the index is pointed at the new path and only
+    then is the flat entry removed, so the indexed path always exists.
+    
+    Args:
+        batch_size: Number of files moved between pauses
+        pause: Seconds to sleep between batches to limit I/O load
+        
+    Returns:
+        int: Number of files moved
+    """
+    if not UPLOAD_DIR.exists():
+        return 0
+    
+    index = get_file_index()
+    moved = 0
+    with os.scandir(UPLOAD_DIR) as entries:
+        for entry in entries:
+            if not entry.is_file() or not is_allowed_file(entry.name):
+                continue
+            
+            source = Path(entry.path)
+            file_id = source.stem
+            target = get_shard_dir(file_id) / source.name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if not target.exists():
+                try:
+                    os.link(source, target)
+                except OSError:
+                    # Filesystem without hard links
+                    shutil.copy2(source, target)
+            
+            relative_path = target.relative_to(UPLOAD_DIR).as_posix()
+            if index.get(file_id):
+                index.update(file_id, path=relative_path)
+            else:
+                stat = target.stat()
+                index.add(
+                    file_id,
+                    path=relative_path,
+                    extension=get_file_extension(source.name),
+                    size=stat.st_size,
+                    file_hash=hash_file(target),
+                    created_at=stat.st_mtime
+                )
+            source.unlink()
+            
+            moved += 1
+            if pause and moved % batch_size == 0:
+                time.sleep(pause)
+    
+    return moved
+
+def get_audio_metadata(file_path: Path) -> Dict:
+    """
+    Get the format, duration, sample rate and channel count of an audio file.
+    
+    Values that cannot be read, e.g. because ffprobe is not installed, are None.
+    """
+    metadata = {"duration": None, "sample_rate": None, "channels": None, "format": get_file_extension(str(file_path))}
+    try:
+        probed = probe_audio(file_path)
+    except AudioDecodeError:
+        return metadata
+    return {**metadata, **{key: value for key, value in probed.items() if key != "format"}}
 
 async def process_file(file: Union[UploadFile, str, Path]) -> dict:
     """Process the uploaded file or a file path and return its info as a dict."""
@@ -83,22 +531,36 @@ async def process_file(file: Union[UploadFile, str, Path]) -> dict:
         await validate_file(file)
         file_id = await save_upload_file(file)
         file_path = get_file_path(file_id)
-        # Simulate metadata for tests
-        return {
-            "status": "processed",
-            "path": str(file_path),
-            "metadata": {"duration": 3600, "format": get_file_extension(file.filename)},
-            "size": file_path.stat().st_size if file_path else 0
-        }
     else:
         # Assume file is a path (str or Path)
         file_path = Path(file)
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
-        # Simulate metadata for tests
-        return {
-            "status": "processed",
-            "path": str(file_path),
-            "metadata": {"duration": 3600, "format": get_file_extension(str(file_path))},
-            "size": file_path.stat().st_size
-        } 
\ No newline at end of file
+    
+    return {
+        "status": "processed",
+        "path": str(file_path),
+        "metadata": await asyncio.to_thread(get_audio_metadata, file_path),
+        "size": file_path.stat().st_size
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line maintenance tools for the upload directory."""
+    parser = argparse.ArgumentParser(description="Manage uploaded files")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild-index", help="Rebuild the file index from the upload directory")
+    migrate = subparsers.add_parser("migrate-layout", help="Move flat uploads into shard directories")
+    migrate.add_argument("--batch-size", type=int, default=1000, help="Files moved between pauses")
+    migrate.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    args = parser.parse_args(argv)
+    
+    if args.command == "rebuild-index":
+        count = rebuild_index()
+        print(f"Indexed {count} files in {UPLOAD_DIR}")
+    elif args.command == "migrate-layout":
+        count = migrate_flat_uploads(args.batch_size, args.pause)
+        print(f"Moved {count} files into shard directories")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
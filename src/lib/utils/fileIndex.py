@@ -0,0 +1,162 @@
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+class FileIndex:
+    """SQLite index of uploaded file metadata and resumable upload sessions."""
+
+    def __init__(self, path: Path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS files (
+                    file_id TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    extension TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    hash TEXT NOT NULL,
+                    duration REAL,
+                    refs INTEGER NOT NULL DEFAULT 1,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            columns = [row["name"] for row in self._conn.execute("PRAGMA table_info(files)")]
+            if "refs" not in columns:
+                # Indexes created before uploads were reference counted
+                self._conn.execute("ALTER TABLE files ADD COLUMN refs INTEGER NOT NULL DEFAULT 1")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS files_hash ON files (hash)")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS upload_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    extension TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+
+    def add(
+        self,
+        file_id: str,
+        path: str,
+        extension: str,
+        size: int,
+        file_hash: str,
+        duration: Optional[float] = None,
+        created_at: Optional[float] = None
+    ) -> None:
+        """
+        Record a stored file.
+
+        Args:
+            file_id: The ID of the file
+            path: Path of the file relative to the upload directory
+            extension: File extension
+            size: Size in bytes
+            file_hash: SHA-256 hex digest of the contents
+            duration: Optional audio duration in seconds
+            created_at: Unix timestamp (default: now)
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO files (file_id, path, extension, size, hash, duration, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (file_id, path, extension, size, file_hash, duration,
+                 time.time() if created_at is None else created_at)
+            )
+
+    def get(self, file_id: str) -> Optional[Dict]:
+        """Get the metadata of a file, or None if it is not indexed."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM files WHERE file_id = ?", (file_id,)).fetchone()
+        return dict(row) if row else None
+
+    def update(self, file_id: str, **fields: Any) -> None:
+        """Update metadata columns of an indexed file."""
+        columns = ", ".join(f"{column} = ?" for column in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE files SET {columns} WHERE file_id = ?", (*fields.values(), file_id))
+
+    def add_reference(self, file_id: str) -> int:
+        """
+        Record another upload of the content of an indexed file.
+
+        Returns:
+            int: Number of uploads now sharing the file, 0 if it is not indexed
+        """
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE files SET refs = refs + 1 WHERE file_id = ?", (file_id,))
+            row = self._conn.execute("SELECT refs FROM files WHERE file_id = ?", (file_id,)).fetchone()
+        return row["refs"] if row else 0
+
+    def release(self, file_id: str) -> int:
+        """
+        Drop one upload of a file, removing it from the index with the last one.
+
+        Returns:
+            int: Number of uploads still sharing the file
+        """
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE files SET refs = refs - 1 WHERE file_id = ?", (file_id,))
+            row = self._conn.execute("SELECT refs FROM files WHERE file_id = ?", (file_id,)).fetchone()
+            if row is None or row["refs"] <= 0:
+                self._conn.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
+                return 0
+        return row["refs"]
+
+    def find_by_hash(self, file_hash: str) -> Optional[str]:
+        """Get the ID of a stored file with the given content hash."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file_id FROM files WHERE hash = ? LIMIT 1", (file_hash,)
+            ).fetchone()
+        return row["file_id"] if row else None
+
+    def remove(self, file_id: str) -> None:
+        """Remove a file from the index."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
+
+    def clear(self) -> None:
+        """Remove all files from the index."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM files")
+
+    def add_session(self, session_id: str, filename: str, extension: str, size: int) -> None:
+        """Record a resumable upload session."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO upload_sessions (session_id, filename, extension, size, created_at) VALUES (?, ?, ?, ?, ?)",
+                (session_id, filename, extension, size, time.time())
+            )
+
+    def get_session(self, session_id: str) -> Optional[Dict]:
+        """Get a resumable upload session, or None if it does not exist."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM upload_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def list_sessions(self) -> List[Dict]:
+        """List all resumable upload sessions."""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM upload_sessions").fetchall()
+        return [dict(row) for row in rows]
+
+    def remove_session(self, session_id: str) -> None:
+        """Remove a finished or aborted upload session."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM upload_sessions WHERE session_id = ?", (session_id,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Protocol
+
+# Constants
+JOB_DB_PATH = Path(os.getenv("JOB_DB_PATH", "jobs.db"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOB_STATUSES = ("queued", "running", "completed", "failed")
+
+ProgressCallback = Callable[[float], None]
+JobHandler = Callable[[Dict, ProgressCallback], Awaitable[Any]]
+
+# Registered handlers by job kind
+_handlers: Dict[str, JobHandler] = {}
+
+class JobError(Exception):
+    """Custom exception for job queue errors."""
+    pass
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """
+    Register a coroutine function as the handler for a job kind.
+
+    The handler receives the job payload and a progress callback taking a
+    fraction between 0 and 1, and returns a JSON serializable result.
+    """
+    def register(handler: JobHandler) -> JobHandler:
+        _handlers[kind] = handler
+        return handler
+    return register
+
+class JobBackend(Protocol):
+    """Storage for job state and results."""
+
+    def create_job(self, job_id: str, kind: str, payload: Dict) -> Dict:
+        ...
+
+    def update_job(self, job_id: str, **fields: Any) -> None:
+        ...
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        ...
+
+    def list_jobs(self, status: str) -> List[Dict]:
+        ...
+
+class SQLiteJobBackend:
+    """Job backend persisting jobs in a local SQLite database."""
+
+    def __init__(self, path: Path = JOB_DB_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    progress REAL NOT NULL DEFAULT 0,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+
+    def _to_dict(self, row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def create_job(self, job_id: str, kind: str, payload: Dict) -> Dict:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, payload, created_at, updated_at) VALUES (?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), now, now)
+            )
+        return self.get_job(job_id)
+
+    def update_job(self, job_id: str, **fields: Any) -> None:
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{column} = ?" for column in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list_jobs(self, status: str) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at", (status,)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def close(self) -> None:
+        self._conn.close()
+
+class JobQueue:
+    """In-process async job queue processed by a fixed pool of worker tasks."""
+
+    def __init__(self, backend: JobBackend, num_workers: int = JOB_WORKERS):
+        self.backend = backend
+        self.num_workers = num_workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start the workers and requeue jobs left unfinished by a previous run."""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue()
+        for status in ("running", "queued"):
+            for job in await asyncio.to_thread(self.backend.list_jobs, status):
+                await asyncio.to_thread(self.backend.update_job, job["id"], status="queued", progress=0.0)
+                self._queue.put_nowait(job["id"])
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.num_workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers. Interrupted jobs are picked up again on the next start."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    async def submit(self, kind: str, payload: Dict) -> str:
+        """
+        Queue a job.
+
+        Args:
+            kind: Job kind registered with job_handler
+            payload: JSON serializable arguments for the handler
+
+        Returns:
+            str: The job ID
+        """
+        if kind not in _handlers:
+            raise JobError(f"No handler registered for job kind: {kind}")
+
+        job_id = str(uuid.uuid4())
+        await asyncio.to_thread(self.backend.create_job, job_id, kind, payload)
+        if self._queue is not None:
+            self._queue.put_nowait(job_id)
+        return job_id
+
+    async def get_job(self, job_id: str) -> Optional[Dict]:
+        """Get the status, progress and result of a job."""
+        return await asyncio.to_thread(self.backend.get_job, job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _update_job(self, job_id: str, **fields: Any) -> None:
+        # Backend writes commit to disk, keep them off the event loop
+        await asyncio.to_thread(self.backend.update_job, job_id, **fields)
+
+    async def _run(self, job_id: str) -> None:
+        job = await asyncio.to_thread(self.backend.get_job, job_id)
+        if job is None or job["status"] != "queued":
+            return
+
+        # Handlers report progress synchronously, only the latest value is written
+        latest: List[float] = []
+        writer: Optional[asyncio.Task] = None
+
+        async def write_progress() -> None:
+            while latest:
+                progress = latest.pop()
+                await self._update_job(job_id, progress=progress)
+
+        def report_progress(progress: float) -> None:
+            nonlocal writer
+            latest[:] = [min(max(progress, 0.0), 1.0)]
+            if writer is None or writer.done():
+                writer = asyncio.create_task(write_progress())
+
+        await self._update_job(job_id, status="running")
+        try:
+            result = await _handlers[job["kind"]](job["payload"], report_progress)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = str(e)
+            if writer is not None:
+                await writer
+            await self._update_job(job_id, status="failed", error=error)
+        else:
+            if writer is not None:
+                await writer
+            await self._update_job(job_id, status="completed", progress=1.0, result=result)
+
+_job_queue: Optional[JobQueue] = None
+
+def get_job_queue() -> JobQueue:
+    """Get the application job queue, backed by SQLite at JOB_DB_PATH."""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue(SQLiteJobBackend(JOB_DB_PATH), JOB_WORKERS)
+    return _job_queue
@@ -0,0 +1,80 @@
+import os
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+import httpx
+import openai
+
+# Constants
+MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", 64))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", 32))
+KEEPALIVE_EXPIRY = 120.0  # Seconds an idle connection is kept open
+REQUEST_TIMEOUT = httpx.Timeout(600.0, connect=10.0)  # Whisper calls on long chunks are slow
+MAX_RETRIES = 2
+
+# Maximum number of in-flight requests per endpoint, across all callers
+ENDPOINT_LIMITS = {
+    "transcriptions": int(os.getenv("OPENAI_TRANSCRIPTION_CONCURRENCY", 8)),
+    "chat": int(os.getenv("OPENAI_CHAT_CONCURRENCY", 16)),
+}
+
+# Clients and semaphores are bound to the event loop that created them
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, openai.AsyncOpenAI]" = weakref.WeakKeyDictionary()
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+def get_client() -> openai.AsyncOpenAI:
+    """
+    Get the shared OpenAI client for the running event loop.
+
+    All requests go through one pooled HTTP client so connections are kept
+    alive and reused across transcription, diarization and summarization.
+
+    Returns:
+        openai.AsyncOpenAI: The shared client
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY
+            ),
+            timeout=REQUEST_TIMEOUT
+        )
+        client = openai.AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            max_retries=MAX_RETRIES,
+            http_client=http_client
+        )
+        _clients[loop] = client
+    return client
+
+def _get_semaphore(endpoint: str) -> asyncio.Semaphore:
+    """Get the concurrency semaphore for an endpoint on the running event loop."""
+    if endpoint not in ENDPOINT_LIMITS:
+        raise ValueError(f"Unknown OpenAI endpoint: {endpoint}")
+
+    semaphores = _semaphores.setdefault(asyncio.get_running_loop(), {})
+    if endpoint not in semaphores:
+        semaphores[endpoint] = asyncio.Semaphore(ENDPOINT_LIMITS[endpoint])
+    return semaphores[endpoint]
+
+@asynccontextmanager
+async def limit(endpoint: str) -> AsyncIterator[None]:
+    """
+    Wait for a free request slot on an endpoint.
+
+    Args:
+        endpoint: One of ENDPOINT_LIMITS ("transcriptions" or "chat")
+    """
+    async with _get_semaphore(endpoint):
+        yield
+
+async def close_client() -> None:
+    """Close the shared client of the running event loop and its connection pool."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
@@ -0,0 +1,188 @@
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Union
+from src.lib.utils.transcript import Transcript
+
+try:
+    import tiktoken
+except ImportError:  # Listed in requirements.txt, without it budgets are only character based estimates
+    tiktoken = None
+
+# Constants
+CHARS_PER_TOKEN = 4  # Rough average for English text when tiktoken is not installed
+MESSAGE_OVERHEAD_TOKENS = 4  # Role and separators added to every chat message
+RESPONSE_TOKENS = int(os.getenv("PROMPT_RESPONSE_TOKENS", 1024))  # Context kept free for the reply
+
+# Context window of each model in tokens, dated snapshots match their base model
+MODEL_CONTEXT_TOKENS = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-4": 8192,
+    "gpt-4-32k": 32768,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+}
+DEFAULT_CONTEXT_TOKENS = 8192
+
+class PromptBudgetError(Exception):
+    """Raised when a prompt does not fit the context window of its model."""
+    pass
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: Optional[str]):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model or "gpt-4")
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count the tokens of a text for a model.
+
+    Uses the model's tiktoken encoding when tiktoken is installed, and a
+    character based estimate otherwise.
+
+    Args:
+        text: The text
+        model: Optional model name
+
+    Returns:
+        int: Number of tokens
+    """
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text))
+
+def get_context_tokens(model: str) -> int:
+    """Get the context window of a model in tokens."""
+    if model in MODEL_CONTEXT_TOKENS:
+        return MODEL_CONTEXT_TOKENS[model]
+    # Longest known name the model starts with, e.g. gpt-4-0613 -> gpt-4
+    for name in sorted(MODEL_CONTEXT_TOKENS, key=len, reverse=True):
+        if model.startswith(f"{name}-"):
+            return MODEL_CONTEXT_TOKENS[name]
+    return DEFAULT_CONTEXT_TOKENS
+
+def get_prompt_budget(model: str, response_tokens: Optional[int] = None) -> int:
+    """
+    Get the number of tokens a prompt may use with a model.
+
+    Args:
+        model: Model name
+        response_tokens: Tokens kept free for the reply (default: RESPONSE_TOKENS)
+
+    Returns:
+        int: Prompt token budget
+    """
+    return get_context_tokens(model) - (RESPONSE_TOKENS if response_tokens is None else response_tokens)
+
+def build_messages(system: str, prompt: str, model: str, response_tokens: Optional[int] = None) -> List[Dict]:
+    """
+    Build the messages of a chat request, checking they fit the model.
+
+    Args:
+        system: System message
+        prompt: User message
+        model: Model the request is sent to
+        response_tokens: Tokens kept free for the reply (default: RESPONSE_TOKENS)
+
+    Returns:
+        List[Dict]: Chat messages
+
+    Raises:
+        PromptBudgetError: If the messages are over the prompt budget of the model
+    """
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": prompt}
+    ]
+    tokens = sum(count_tokens(message["content"], model) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+    budget = get_prompt_budget(model, response_tokens)
+    if tokens > budget:
+        raise PromptBudgetError(f"Prompt of {tokens} tokens is over the {budget} token budget of {model}")
+    return messages
+
+def render_segments(
+    segments: Union[Transcript, List[Dict]],
+    with_times: bool = True,
+    with_speakers: bool = True,
+    first_index: int = 0
+) -> str:
+    """
+    Render segments compactly, one "[idx start-end] speaker: text" line per segment.
+
+    Args:
+        segments: Transcript, or list of segment dictionaries
+        with_times: Prefix each line with the segment index and times in seconds
+        with_speakers: Include the speaker of segments that have one
+        first_index: Index of the first segment, for parts of a longer transcript
+
+    Returns:
+        str: The rendered segments
+    """
+    if not isinstance(segments, Transcript):
+        segments = Transcript.from_segments(segments)
+
+    lines = []
+    for segment in segments:
+        line = segment.text.strip()
+        if with_speakers and segment.speaker:
+            line = f"{segment.speaker}: {line}"
+        if with_times:
+            line = f"[{first_index + segment.index} {segment.start:.1f}-{segment.end:.1f}] {line}"
+        lines.append(line)
+    return "\n".join(lines)
+
+def split_text(text: str, max_tokens: int, model: Optional[str] = None) -> List[str]:
+    """
+    Split a text into chunks of at most max_tokens, on line boundaries where possible.
+
+    Chunk sizes are the sums of the token counts of their lines and words,
+    which can be slightly more than the count of the joined chunk.
+
+    Args:
+        text: The text to split, typically one rendered segment per line
+        max_tokens: Token budget of each chunk
+        model: Optional model name the tokens are counted for
+
+    Returns:
+        List[str]: The chunks, in order
+    """
+    # Lines over budget on their own are split on words. Counts are kept per
+    # piece and summed, so every word and line is only counted once.
+    pieces = []
+    for line in text.splitlines():
+        line_tokens = count_tokens(line, model)
+        if line_tokens <= max_tokens:
+            pieces.append((line, line_tokens))
+            continue
+        words: List[str] = []
+        words_tokens = 0
+        for word in line.split():
+            word_tokens = count_tokens(f" {word}", model)
+            if words and words_tokens + word_tokens > max_tokens:
+                pieces.append((" ".join(words), words_tokens))
+                words = []
+                words_tokens = 0
+            words.append(word)
+            words_tokens += word_tokens
+        if words:
+            pieces.append((" ".join(words), words_tokens))
+
+    chunks = []
+    chunk: List[str] = []
+    chunk_tokens = 0
+    for piece, piece_tokens in pieces:
+        if chunk and chunk_tokens + piece_tokens > max_tokens:
+            chunks.append("\n".join(chunk))
+            chunk = []
+            chunk_tokens = 0
+        chunk.append(piece)
+        chunk_tokens += piece_tokens
+    if chunk:
+        chunks.append("\n".join(chunk))
+
+    return chunks
@@ -1,63 +1,281 @@
 import os
-from typing import Dict, List
-import openai
+import re
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar, Union
+from pydantic import BaseModel, field_validator
+from src.lib.utils.artifacts import get_or_create_artifact, save_artifact
+from src.lib.utils.openaiClient import get_client, limit
+from src.lib.utils.transcript import Transcript
+from src.lib.utils.prompts import build_messages, count_tokens, render_segments, split_text
 
-# Initialize OpenAI client
-client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Constants
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "gpt-4")
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", 3000))  # Transcript tokens per summarized chunk
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", 4))  # Chunks summarized at once per transcript
+KEY_POINT_MARKER = re.compile(r"^\s*(?:\d+[.)]|[-*\u2022])\s*")
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 class SummaryError(Exception):
     """Custom exception for summarization errors."""
     pass
 
-async def generate_summary(transcription: str, speakers: List[Dict]) -> Dict:
+async def gather_bounded(items: List[T], function: Callable[[T], Awaitable[R]], concurrency: Optional[int] = None) -> List[R]:
+    """
+    Apply a coroutine function to items with at most concurrency calls in flight.
+    
+    Args:
+        items: Inputs of the function
+        function: Coroutine function to apply
+        concurrency: Maximum number of concurrent calls (default: SUMMARY_CONCURRENCY)
+        
+    Returns:
+        List: Results, in the order of the items
+    """
+    semaphore = asyncio.Semaphore(concurrency or SUMMARY_CONCURRENCY)
+    
+    async def run(item: T) -> R:
+        async with semaphore:
+            return await function(item)
+    
+    return await asyncio.gather(*(run(item) for item in items))
+
+async def _complete(system: str, prompt: str) -> str:
+    """Run one chat completion with the summary model."""
+    async with limit("chat"):
+        response = await get_client().chat.completions.create(
+            model=SUMMARY_MODEL,
+            messages=build_messages(system, prompt, SUMMARY_MODEL)
+        )
+    
+    return response.choices[0].message.content
+
+async def summarize_chunk(chunk: str) -> str:
+    """
+    Summarize one part of a long conversation.
+    
+    Args:
+        chunk: Consecutive speaker lines of the conversation
+        
+    Returns:
+        str: Summary of the part, keeping speaker attribution
+    """
+    prompt = f"""Summarize this part of a longer conversation, 
+    keeping the main points made by each speaker and who made them.
+    
+    Conversation:
+    {chunk}
+    """
+    
+    return await _complete(
+        "You are a content summarization expert. Create clear, concise summaries that maintain the key points and speaker attribution.",
+        prompt
+    )
+
+async def combine_summaries(summaries: List[str]) -> str:
+    """
+    Merge summaries of consecutive parts of a conversation into one summary.
+    
+    Args:
+        summaries: Summaries of the parts, in order
+        
+    Returns:
+        str: The combined summary
+    """
+    parts = "\n\n".join(f"Part {i + 1}:\n{summary}" for i, summary in enumerate(summaries))
+    prompt = f"""These are summaries of consecutive parts of one conversation. 
+    Combine them into a single comprehensive summary, 
+    highlighting the main points discussed by each speaker. 
+    Format the summary to clearly indicate who said what.
+    
+    {parts}
+    """
+    
+    return await _complete(
+        "You are a content summarization expert. Create clear, concise summaries that maintain the key points and speaker attribution.",
+        prompt
+    )
+
+async def condense_summaries(summaries: List[str], max_tokens: Optional[int] = None) -> List[str]:
+    """
+    Combine chunk summaries in rounds until all of them fit one prompt.
+    
+    Args:
+        summaries: Summaries of consecutive chunks, in order
+        max_tokens: Token budget of each combine prompt (default: SUMMARY_CHUNK_TOKENS)
+        
+    Returns:
+        List[str]: Summaries of consecutive parts that fit max_tokens together
+    """
+    max_tokens = max_tokens or SUMMARY_CHUNK_TOKENS
+    while len(summaries) > 1 and sum(count_tokens(summary, SUMMARY_MODEL) for summary in summaries) > max_tokens:
+        groups: List[List[str]] = [[]]
+        group_tokens = 0
+        for summary in summaries:
+            summary_tokens = count_tokens(summary, SUMMARY_MODEL)
+            if groups[-1] and group_tokens + summary_tokens > max_tokens:
+                groups.append([])
+                group_tokens = 0
+            groups[-1].append(summary)
+            group_tokens += summary_tokens
+        
+        # Make progress even if every summary is over budget on its own
+        if len(groups) == len(summaries):
+            groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+        
+        summaries = await gather_bounded(groups, combine_summaries)
+    
+    return summaries
+
+async def extract_key_points(summary: str) -> str:
+    """
+    Extract the key points discussed from a summary.
+    
+    Args:
+        summary: Summary returned by summarize_conversation
+        
+    Returns:
+        str: The key points
+    """
+    key_points_prompt = f"""Based on this summary, extract the key points discussed:
+    
+    {summary}
+    """
+    
+    return await _complete(
+        "Extract the main key points from the summary, maintaining speaker attribution.",
+        key_points_prompt
+    )
+
+class SummaryResult(BaseModel):
+    """Structured reply of the summary model."""
+    summary: str
+    key_points: List[str]
+    
+    @field_validator("key_points", mode="before")
+    @classmethod
+    def split_key_points(cls, value: Any) -> Any:
+        # Models sometimes return the key points as one block of text
+        if isinstance(value, str):
+            return [line for line in value.splitlines() if line.strip()]
+        return value
+    
+    def format_key_points(self) -> str:
+        """Render the key points as a numbered list."""
+        points = [KEY_POINT_MARKER.sub("", point).strip() for point in self.key_points]
+        return "\n".join(f"{i + 1}. {point}" for i, point in enumerate(point for point in points if point))
+
+def parse_summary_result(content: str) -> SummaryResult:
+    """
+    Parse and validate the JSON object in a model reply.
+    
+    Args:
+        content: Reply content, possibly wrapped in a code fence or prose
+        
+    Returns:
+        SummaryResult: The validated summary and key points
+        
+    Raises:
+        ValueError: If the reply has no valid summary object
+    """
+    start = content.find("{")
+    end = content.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("No JSON object in summary reply")
+    return SummaryResult.model_validate_json(content[start:end + 1])
+
+async def summarize_structured(conversation: str) -> SummaryResult:
+    """
+    Get the summary and key points of a conversation in a single call.
+    
+    Args:
+        conversation: Speaker lines, or summaries of consecutive parts of the conversation
+        
+    Returns:
+        SummaryResult: The validated summary and key points
+        
+    Raises:
+        ValueError: If the reply cannot be parsed
+    """
+    prompt = f"""Please provide a comprehensive summary of this conversation, 
+    highlighting the main points discussed by each speaker, 
+    and extract the key points discussed. 
+    Format the summary to clearly indicate who said what.
+    
+    Respond only with a JSON object of this form:
+    {{"summary": "<summary>", "key_points": ["<key point>", ...]}}
+    
+    {conversation}
+    """
+    
+    content = await _complete(
+        "You are a content summarization expert. Create clear, concise summaries that maintain the key points and speaker attribution. You reply with JSON only.",
+        prompt
+    )
+    return parse_summary_result(content)
+
+async def summarize_conversation(conversation: str) -> str:
+    """
+    Summarize a conversation with speaker attribution, as plain text.
+    
+    Args:
+        conversation: Speaker lines, or summaries of consecutive parts of the conversation
+        
+    Returns:
+        str: The summary
+    """
+    prompt = f"""Please provide a comprehensive summary of this conversation, 
+    highlighting the main points discussed by each speaker. 
+    Format the summary to clearly indicate who said what.
+    
+    {conversation}
+    """
+    
+    return await _complete(
+        "You are a content summarization expert. Create clear, concise summaries that maintain the key points and speaker attribution.",
+        prompt
+    )
+
+async def generate_summary(transcription: str, speakers: Union[Transcript, List[Dict]]) -> Dict:
     """
     Generate a summary of the transcribed content with speaker attribution.
     
+    The summary and key points come from one structured model call. If the
+    reply is not valid, they are requested separately instead.
+    
     Args:
         transcription: The full transcription text
-        speakers: List of speaker segments
+        speakers: Transcript with speakers, or list of speaker segments
         
     Returns:
         dict: Contains summary and key points
     """
     try:
-        # Prepare the prompt for GPT-4
-        prompt = f"""Please provide a comprehensive summary of this conversation, 
-        highlighting the main points discussed by each speaker. 
-        Format the summary to clearly indicate who said what.
-        
-        Transcription:
-        {transcription}
-        
-        Speakers:
-        {speakers}
-        """
-        
-        response = await client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a content summarization expert. Create clear, concise summaries that maintain the key points and speaker attribution."},
-                {"role": "user", "content": prompt}
-            ]
-        )
+        dialogue = render_segments(speakers, with_times=False) or transcription.strip()
         
-        summary = response.choices[0].message.content
+        # Transcripts over the prompt budget are summarized in chunks first
+        if count_tokens(dialogue, SUMMARY_MODEL) > SUMMARY_CHUNK_TOKENS:
+            chunk_summaries = await gather_bounded(split_text(dialogue, SUMMARY_CHUNK_TOKENS, SUMMARY_MODEL), summarize_chunk)
+            parts = await condense_summaries(chunk_summaries)
+            conversation = "Summaries of consecutive parts of the conversation:\n\n" + "\n\n".join(
+                f"Part {i + 1}:\n{part}" for i, part in enumerate(parts)
+            )
+        else:
+            conversation = f"Conversation:\n{dialogue}"
         
-        # Extract key points
-        key_points_prompt = f"""Based on this summary, extract the key points discussed:
+        try:
+            result = await summarize_structured(conversation)
+            return {
+                "summary": result.summary,
+                "key_points": result.format_key_points()
+            }
+        except ValueError:
+            # Malformed reply, ask for the summary and key points separately
+            pass
         
-        {summary}
-        """
-        
-        key_points_response = await client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "Extract the main key points from the summary, maintaining speaker attribution."},
-                {"role": "user", "content": key_points_prompt}
-            ]
-        )
-        
-        key_points = key_points_response.choices[0].message.content
+        summary = await summarize_conversation(conversation)
+        key_points = await extract_key_points(summary)
         
         return {
             "summary": summary,
@@ -67,6 +285,42 @@ async def generate_summary(transcription: str, speakers: List[Dict]) -> Dict:
     except Exception as e:
         raise Exception(f"Summary generation failed: {str(e)}")
 
+async def get_summary(file_id: str, language: str = None) -> Dict:
+    """
+    Get the summary and key points of a file, computing each at most once per file_id.
+    
+    Args:
+        file_id: The ID of the uploaded file
+        language: Optional language code
+        
+    Returns:
+        dict: Contains summary and key points
+    """
+    from src.lib.utils.diarization import process_audio_with_diarization
+    
+    async def produce_summary() -> str:
+        result = await process_audio_with_diarization(file_id, language)
+        transcript = Transcript.from_segments(result.get("segments", []), result["speakers"])
+        summary_data = await generate_summary(result["transcription"], transcript)
+        save_artifact(file_id, "key_points", summary_data["key_points"], language)
+        return summary_data["summary"]
+    
+    summary = await get_or_create_artifact(file_id, "summary", produce_summary, language)
+    
+    async def produce_key_points() -> str:
+        try:
+            return await extract_key_points(summary)
+        except Exception as e:
+            raise Exception(f"Summary generation failed: {str(e)}")
+    
+    # Normally stored alongside the summary, only recomputed if missing
+    key_points = await get_or_create_artifact(file_id, "key_points", produce_key_points, language)
+    
+    return {
+        "summary": summary,
+        "key_points": key_points
+    }
+
 async def process_with_summary(file_id: str, language: str = None) -> Dict:
     """
     Process an audio file with transcription, diarization, and summarization.
@@ -84,11 +338,11 @@ async def process_with_summary(file_id: str, language: str = None) -> Dict:
     result = await process_audio_with_diarization(file_id, language)
     
     # Generate summary
-    summary_data = await generate_summary(result["transcription"], result["speakers"])
+    summary_data = await get_summary(file_id, language)
     
     # Combine all results
     return {
         **result,
         "summary": summary_data["summary"],
         "key_points": summary_data["key_points"]
-    } 
\ No newline at end of file
+    }
\ No newline at end of file
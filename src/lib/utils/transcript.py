@@ -0,0 +1,467 @@
+import os
+import sys
+import json
+import mmap
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Speaker id of segments without a speaker
+NO_SPEAKER = -1
+
+# Binary transcript file layout, all values little-endian:
+#   header          magic, version, segment count, speaker count
+#   offset table    byte offset of each section below, then the file size
+#   starts, ends    float64 per segment
+#   speaker ids     int16 per segment
+#   text offsets    uint64 per segment plus one, into the text blob
+#   speakers        UTF-8 JSON array of speaker names
+#   text            UTF-8 segment texts, back to back
+# Sections start on 8 byte boundaries so columns can be mapped in place.
+FILE_MAGIC = b"TRSC"
+FILE_VERSION = 1
+_HEADER = struct.Struct("<4sHxxII")
+_SECTIONS = ("starts", "ends", "speaker_ids", "text_offsets", "speakers", "text")
+_OFFSET_TABLE = struct.Struct(f"<{len(_SECTIONS) + 1}Q")
+
+class TranscriptFormatError(ValueError):
+    """Raised when a binary transcript file is invalid."""
+    pass
+
+def find_time_range(starts: Sequence[float], ends: Sequence[float], start: float, end: float) -> Tuple[int, int]:
+    """
+    Find the segments overlapping a time range with binary search.
+
+    Segments must be sorted by start time with non-decreasing end times,
+    as produced by Whisper and merge_chunk_transcriptions.
+
+    Args:
+        starts: Segment start times in seconds
+        ends: Segment end times in seconds
+        start: Start of the range in seconds
+        end: End of the range in seconds
+
+    Returns:
+        Tuple[int, int]: Index of the first overlapping segment and one past the last
+    """
+    first = bisect_right(ends, start)
+    last = bisect_left(starts, end, lo=first)
+    return first, max(first, last)
+
+def align_turns(starts: Sequence[float], ends: Sequence[float], turns: List[Dict]) -> List[Optional[str]]:
+    """
+    Assign each segment the speaker whose turn overlaps it the most.
+
+    Segments and turns are sorted by start time once and merged with two
+    pointers, so alignment is linear in the number of segments and speaker
+    turns as long as speaker turns do not nest inside each other.
+
+    Args:
+        starts: Segment start times in seconds
+        ends: Segment end times in seconds
+        turns: Speaker turns with speaker_id, start and end times
+
+    Returns:
+        List[Optional[str]]: Speaker ID for each segment, in segment order, or None
+    """
+    turns = sorted(
+        (turn for turn in turns if "start" in turn and "end" in turn),
+        key=lambda turn: turn["start"]
+    )
+    order = sorted(range(len(starts)), key=starts.__getitem__)
+    labels: List[Optional[str]] = [None] * len(starts)
+
+    j = 0
+    for i in order:
+        start = starts[i]
+        end = ends[i]
+
+        # Skip turns that ended before this segment starts
+        while j < len(turns) and turns[j]["end"] < start:
+            j += 1
+
+        best_overlap = 0.0
+        k = j
+        while k < len(turns) and turns[k]["start"] <= end:
+            overlap = min(end, turns[k]["end"]) - max(start, turns[k]["start"])
+            exact = turns[k]["start"] == start and turns[k]["end"] == end
+            if overlap > best_overlap or (labels[i] is None and exact):
+                best_overlap = overlap
+                labels[i] = turns[k]["speaker_id"]
+            k += 1
+
+    return labels
+
+class Segment:
+    """Read-only view of one row of a Transcript."""
+
+    __slots__ = ("_transcript", "_index")
+
+    def __init__(self, transcript: "Transcript", index: int):
+        self._transcript = transcript
+        self._index = index
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def start(self) -> float:
+        return self._transcript.starts[self._index]
+
+    @property
+    def end(self) -> float:
+        return self._transcript.ends[self._index]
+
+    @property
+    def text(self) -> str:
+        return self._transcript.get_text(self._index)
+
+    @property
+    def speaker(self) -> Optional[str]:
+        return self._transcript.get_speaker(self._index)
+
+    def to_dict(self) -> Dict:
+        """Convert the row to a segment dictionary."""
+        segment = {"text": self.text, "start": self.start, "end": self.end}
+        if self.speaker is not None:
+            segment["speaker_id"] = self.speaker
+        return segment
+
+    def __repr__(self) -> str:
+        return f"Segment(start={self.start!r}, end={self.end!r}, text={self.text!r}, speaker={self.speaker!r})"
+
+class Transcript:
+    """
+    Column-oriented list of transcript segments.
+
+    Start and end times are stored in float arrays, speakers as indexes into
+    a small table of speaker names and all segment texts in a single UTF-8
+    buffer with offsets, so a segment costs about 30 bytes plus its text
+    instead of a dict per segment. Rows are accessed through Segment views.
+    """
+
+    __slots__ = ("starts", "ends", "speaker_ids", "speakers", "_text", "_offsets", "_speaker_index")
+
+    def __init__(self):
+        self.starts = array("d")
+        self.ends = array("d")
+        self.speaker_ids = array("h")
+        self.speakers: List[str] = []
+        self._text = bytearray()
+        self._offsets = array("Q", [0])
+        self._speaker_index: Dict[str, int] = {}
+
+    @classmethod
+    def from_segments(cls, segments: List[Dict], speakers: Optional[List[Dict]] = None) -> "Transcript":
+        """
+        Build a transcript from segment dictionaries.
+
+        Args:
+            segments: Segments with text, start and end times, and optionally a speaker_id
+            speakers: Optional speaker turns, assigned to the segments they overlap most
+
+        Returns:
+            Transcript: The transcript
+        """
+        transcript = cls()
+        for segment in segments:
+            transcript.append(
+                segment.get("start", 0.0),
+                segment.get("end", 0.0),
+                segment.get("text", ""),
+                segment.get("speaker_id")
+            )
+        if speakers:
+            transcript.set_speakers(align_turns(transcript.starts, transcript.ends, speakers))
+        return transcript
+
+    def _get_speaker_id(self, speaker: Optional[str]) -> int:
+        if speaker is None:
+            return NO_SPEAKER
+        speaker_id = self._speaker_index.get(speaker)
+        if speaker_id is None:
+            speaker_id = self._speaker_index[speaker] = len(self.speakers)
+            self.speakers.append(speaker)
+        return speaker_id
+
+    def append(self, start: float, end: float, text: str, speaker: Optional[str] = None) -> None:
+        """
+        Add a segment at the end of the transcript.
+
+        Args:
+            start: Start time in seconds
+            end: End time in seconds
+            text: Segment text
+            speaker: Optional speaker label
+        """
+        self.starts.append(start)
+        self.ends.append(end)
+        self.speaker_ids.append(self._get_speaker_id(speaker))
+        self._text += text.encode("utf-8")
+        self._offsets.append(len(self._text))
+
+    def set_speakers(self, labels: Sequence[Optional[str]]) -> None:
+        """Replace the speaker of every segment with the given labels, in segment order."""
+        if len(labels) != len(self):
+            raise ValueError(f"Expected {len(self)} speaker labels, got {len(labels)}")
+        self.speakers = []
+        self._speaker_index = {}
+        self.speaker_ids = array("h", (self._get_speaker_id(label) for label in labels))
+
+    def get_text(self, index: int) -> str:
+        """Get the text of a segment."""
+        return self._text[self._offsets[index]:self._offsets[index + 1]].decode("utf-8")
+
+    def get_speaker(self, index: int) -> Optional[str]:
+        """Get the speaker label of a segment, or None."""
+        speaker_id = self.speaker_ids[index]
+        return self.speakers[speaker_id] if speaker_id != NO_SPEAKER else None
+
+    def find_range(self, start: float, end: float) -> Tuple[int, int]:
+        """Get the index range of the segments overlapping start to end seconds."""
+        return find_time_range(self.starts, self.ends, start, end)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Segment, "Transcript"]:
+        if isinstance(index, slice):
+            transcript = Transcript()
+            for i in range(*index.indices(len(self))):
+                transcript.append(self.starts[i], self.ends[i], self.get_text(i), self.get_speaker(i))
+            return transcript
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Transcript index out of range")
+        return Segment(self, index)
+
+    def __iter__(self) -> Iterator[Segment]:
+        for index in range(len(self)):
+            yield Segment(self, index)
+
+    def shift(self, offset: float) -> "Transcript":
+        """
+        Copy the transcript with all times moved by offset seconds.
+
+        Args:
+            offset: Seconds added to every start and end time, times are clamped at zero
+
+        Returns:
+            Transcript: The shifted copy
+        """
+        transcript = Transcript()
+        transcript.starts = array("d", (max(start + offset, 0.0) for start in self.starts))
+        transcript.ends = array("d", (max(end + offset, 0.0) for end in self.ends))
+        transcript.speaker_ids = array("h", self.speaker_ids)
+        transcript.speakers = list(self.speakers)
+        transcript._text = bytearray(self._text)
+        transcript._offsets = array("Q", self._offsets)
+        transcript._speaker_index = dict(self._speaker_index)
+        return transcript
+
+    def to_segments(self) -> List[Dict]:
+        """Convert the transcript to a list of segment dictionaries."""
+        return [segment.to_dict() for segment in self]
+
+    def speaker_turns(self) -> List[Dict]:
+        """
+        Group consecutive segments of the same speaker into turns.
+
+        Returns:
+            List[Dict]: Turns with speaker_id, text, start and end times
+        """
+        turns: List[Dict] = []
+        previous = None
+        for segment in self:
+            speaker = segment.speaker
+            if speaker is None:
+                previous = None
+                continue
+            if speaker == previous:
+                turns[-1]["text"] = f"{turns[-1]['text'].rstrip()} {segment.text.lstrip()}"
+                turns[-1]["end"] = segment.end
+            else:
+                turns.append({
+                    "speaker_id": speaker,
+                    "text": segment.text,
+                    "start": segment.start,
+                    "end": segment.end
+                })
+            previous = speaker
+        return turns
+
+def _pad(data: bytes) -> bytes:
+    return data + b"\0" * (-len(data) % 8)
+
+def _little_endian(column: array) -> bytes:
+    if sys.byteorder != "little":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+def write_transcript(transcript: Transcript, path: Path) -> None:
+    """
+    Write a transcript to a binary transcript file.
+
+    Args:
+        transcript: The transcript to store
+        path: Destination path, replaced atomically
+    """
+    sections = [
+        _little_endian(transcript.starts),
+        _little_endian(transcript.ends),
+        _little_endian(transcript.speaker_ids),
+        _little_endian(transcript._offsets),
+        json.dumps(transcript.speakers).encode("utf-8"),
+        bytes(transcript._text)
+    ]
+
+    offsets = []
+    position = _HEADER.size + _OFFSET_TABLE.size
+    for section in sections:
+        offsets.append(position)
+        position += len(_pad(section))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # A unique temporary file, so concurrent writers never share one
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name, suffix=".tmp", delete=False) as f:
+        try:
+            f.write(_HEADER.pack(FILE_MAGIC, FILE_VERSION, len(transcript), len(transcript.speakers)))
+            f.write(_OFFSET_TABLE.pack(*offsets, position))
+            for section in sections:
+                f.write(_pad(section))
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, path)
+
+class MappedTranscript:
+    """
+    Read-only transcript backed by a memory-mapped binary transcript file.
+
+    Only the header is parsed when the file is opened. Time range lookups
+    binary search the mapped time columns, and slicing decodes just the
+    requested segments, so any part of a long transcript can be read
+    without loading the whole file.
+    """
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise TranscriptFormatError(f"Empty transcript file: {path}")
+
+        try:
+            magic, version, count, speaker_count = _HEADER.unpack_from(self._mmap, 0)
+            offsets = _OFFSET_TABLE.unpack_from(self._mmap, _HEADER.size)
+        except struct.error:
+            self._mmap.close()
+            raise TranscriptFormatError(f"Truncated transcript file: {path}")
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            self._mmap.close()
+            raise TranscriptFormatError(f"Not a version {FILE_VERSION} transcript file: {path}")
+        if offsets[-1] != len(self._mmap):
+            self._mmap.close()
+            raise TranscriptFormatError(f"Truncated transcript file: {path}")
+
+        sections = dict(zip(_SECTIONS, offsets))
+        self._count = count
+        self._text_start = sections["text"]
+        self.starts = self._column(sections["starts"], count, "d")
+        self.ends = self._column(sections["ends"], count, "d")
+        self.speaker_ids = self._column(sections["speaker_ids"], count, "h")
+        self._offsets = self._column(sections["text_offsets"], count + 1, "Q")
+        self.speakers: List[str] = json.loads(
+            self._mmap[sections["speakers"]:sections["text"]].rstrip(b"\0").decode("utf-8")
+        )
+        if len(self.speakers) != speaker_count:
+            self.close()
+            raise TranscriptFormatError(f"Corrupt speaker table in transcript file: {path}")
+
+    def _column(self, offset: int, count: int, typecode: str) -> Sequence:
+        size = array(typecode).itemsize * count
+        column = memoryview(self._mmap)[offset:offset + size].cast(typecode)
+        if sys.byteorder != "little":
+            column = array(typecode, column)
+            column.byteswap()
+        return column
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get_text(self, index: int) -> str:
+        """Get the text of a segment."""
+        start = self._text_start + self._offsets[index]
+        end = self._text_start + self._offsets[index + 1]
+        return self._mmap[start:end].decode("utf-8")
+
+    def get_speaker(self, index: int) -> Optional[str]:
+        """Get the speaker label of a segment, or None."""
+        speaker_id = self.speaker_ids[index]
+        return self.speakers[speaker_id] if speaker_id != NO_SPEAKER else None
+
+    def find_range(self, start: float, end: float) -> Tuple[int, int]:
+        """Get the index range of the segments overlapping start to end seconds."""
+        return find_time_range(self.starts, self.ends, start, end)
+
+    def slice(self, first: int, last: int) -> Transcript:
+        """
+        Copy segments first to last (exclusive) into an in-memory Transcript.
+
+        Args:
+            first: Index of the first segment
+            last: Index one past the last segment
+
+        Returns:
+            Transcript: The selected segments
+        """
+        transcript = Transcript()
+        for index in range(max(first, 0), min(last, self._count)):
+            transcript.append(self.starts[index], self.ends[index], self.get_text(index), self.get_speaker(index))
+        return transcript
+
+    def __getitem__(self, index: slice) -> Transcript:
+        if not isinstance(index, slice) or index.step not in (None, 1):
+            raise TypeError("MappedTranscript only supports contiguous slices, use slice()")
+        return self.slice(*index.indices(self._count)[:2])
+
+    def slice_time(self, start: float, end: float) -> Transcript:
+        """Copy the segments overlapping start to end seconds into an in-memory Transcript."""
+        return self.slice(*self.find_range(start, end))
+
+    def close(self) -> None:
+        """Release the mapped columns and unmap the file."""
+        for column in (self.starts, self.ends, self.speaker_ids, self._offsets):
+            if isinstance(column, memoryview):
+                column.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "MappedTranscript":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+def open_transcript(path: Path) -> MappedTranscript:
+    """
+    Open a binary transcript file for random access.
+
+    Args:
+        path: Path of a file written by write_transcript
+
+    Returns:
+        MappedTranscript: The mapped transcript, to be closed after use
+
+    Raises:
+        TranscriptFormatError: If the file is not a valid transcript file
+    """
+    return MappedTranscript(path)
@@ -1,16 +1,303 @@
 import os
+import re
+import json
+import math
+import shutil
+import tempfile
+import asyncio
+import hashlib
+import logging
+import weakref
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, List, Optional
-import openai
-from src.lib.utils.fileHandling import get_file_path
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+from src.lib.utils.fileHandling import get_file_path, get_file_metadata, hash_file
+from src.lib.utils.artifacts import (
+    get_or_create_artifact,
+    get_artifact_lock,
+    load_artifact,
+    save_artifact
+)
+from src.lib.utils.audioDecoding import (
+    DECODE_SAMPLE_RATE,
+    DECODE_SAMPLE_WIDTH,
+    get_audio_duration,
+    iter_levels,
+    iter_pcm_frames,
+    write_wav
+)
+from src.lib.utils.openaiClient import get_client, limit
+from src.lib.utils.transcriptionBackends import (
+    WHISPER_MAX_FILE_SIZE,
+    LocalWhisperBackend,
+    get_transcription_backend,
+    load_local_model,
+    transcribe_with_model
+)
+from src.lib.utils.correctionCache import CorrectionCache
+from src.lib.utils.prompts import build_messages, count_tokens
 from Levenshtein import distance
 
-# Initialize OpenAI client
-client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Constants
+CACHE_DIR = Path(os.getenv("TRANSCRIPTION_CACHE_DIR", "cache/transcriptions"))
+CACHE_MAX_BYTES = int(os.getenv("TRANSCRIPTION_CACHE_MAX_BYTES", 1024 * 1024 * 1024))  # 1GB
+CHUNK_DIR = Path(os.getenv("TRANSCRIPTION_CHUNK_DIR", "cache/chunks"))
+CHUNK_DURATION = 10 * 60  # Target chunk length in seconds
+CHUNK_OVERLAP = 2.0  # Seconds of audio shared by consecutive chunks
+CHUNK_SILENCE_WINDOW = 30.0  # Seconds before a cut point searched for silence
+CHUNK_LEVEL_WINDOW = 0.1  # Seconds of audio per loudness measurement of the silence search
+CHUNK_MIN_SILENCE = 0.3  # Shortest pause in seconds a chunk is cut at
+CHUNK_SILENCE_DB = 16  # A pause is this many dB quieter than the file on average
+MAX_CONCURRENT_CHUNKS = int(os.getenv("MAX_CONCURRENT_CHUNKS", 4))
+POOL_WORKERS = int(os.getenv("TRANSCRIPTION_POOL_WORKERS", os.cpu_count() or 1))  # Processes decoding with a local engine
+POOL_QUEUED_PER_WORKER = int(os.getenv("TRANSCRIPTION_POOL_QUEUED_PER_WORKER", 1))  # Chunks waiting per busy worker
+CORRECTION_MODEL = os.getenv("CORRECTION_MODEL", "gpt-4")
+CORRECTION_CACHE_PATH = Path(os.getenv("CORRECTION_CACHE_PATH", "cache/corrections.db"))
+CORRECTION_BATCH_SEGMENTS = int(os.getenv("CORRECTION_BATCH_SEGMENTS", 40))  # Segments corrected per request
+CORRECTION_BATCH_TOKENS = int(os.getenv("CORRECTION_BATCH_TOKENS", 1500))  # Segment text tokens per request
+CORRECTION_CONCURRENCY = int(os.getenv("CORRECTION_CONCURRENCY", 4))  # Batches corrected at once per transcript
+CORRECTION_MIN_AVG_LOGPROB = float(os.getenv("CORRECTION_MIN_AVG_LOGPROB", -0.5))  # Less confident segments are corrected
+CORRECTION_MAX_NO_SPEECH_PROB = float(os.getenv("CORRECTION_MAX_NO_SPEECH_PROB", 0.5))  # Likelier silence is corrected
+CORRECTION_MAX_COMPRESSION_RATIO = float(os.getenv("CORRECTION_MAX_COMPRESSION_RATIO", 2.4))  # Repetitive text is corrected
+CORRECTION_LEXICON_PATH = Path(os.getenv("CORRECTION_LEXICON_PATH", "/usr/share/dict/words"))  # One known word per line
+
+_correction_caches: Dict[Path, CorrectionCache] = {}
+_lexicons: Dict[Path, FrozenSet[str]] = {}
+
+logger = logging.getLogger(__name__)
+
+def get_cache_key(file_hash: str, model: str, language: Optional[str] = None) -> str:
+    """Build the cache key for a transcription of the given content, model and language."""
+    return hashlib.sha256(f"{file_hash}:{model}:{language or 'auto'}".encode()).hexdigest()
+
+def load_cached_transcription(cache_key: str) -> Optional[Dict]:
+    """
+    Load a cached transcription result.
+    
+    Args:
+        cache_key: Key returned by get_cache_key
+        
+    Returns:
+        Optional[Dict]: The cached result, or None on a miss
+    """
+    cache_path = CACHE_DIR / f"{cache_key}.json"
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            result = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        # Corrupt entry, drop it and treat as a miss
+        cache_path.unlink(missing_ok=True)
+        return None
+    
+    # Mark as recently used for LRU eviction
+    try:
+        os.utime(cache_path)
+    except FileNotFoundError:
+        # Evicted concurrently, the loaded result is still valid
+        pass
+    return result
+
+def save_cached_transcription(cache_key: str, result: Dict) -> None:
+    """
+    Store a transcription result and evict least recently used entries
+    if the cache grows beyond CACHE_MAX_BYTES.
+    
+    Args:
+        cache_key: Key returned by get_cache_key
+        result: Dictionary with text, segments and language
+    """
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    cache_path = CACHE_DIR / f"{cache_key}.json"
+    # A unique temporary file, so concurrent saves of one key never share one
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=CACHE_DIR, prefix=cache_path.name, suffix=".tmp", delete=False
+    ) as f:
+        try:
+            json.dump(result, f)
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, cache_path)
+    evict_cache()
+
+def evict_cache(max_bytes: Optional[int] = None) -> int:
+    """
+    Remove least recently used cache entries until the cache fits in max_bytes.
+    
+    Args:
+        max_bytes: Size bound in bytes (default: CACHE_MAX_BYTES)
+        
+    Returns:
+        int: Number of entries removed
+    """
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    if not CACHE_DIR.exists():
+        return 0
+    
+    entries = []
+    for path in CACHE_DIR.glob("*.json"):
+        try:
+            entries.append((path, path.stat()))
+        except FileNotFoundError:
+            continue
+    
+    total = sum(stat.st_size for _, stat in entries)
+    removed = 0
+    for path, stat in sorted(entries, key=lambda entry: entry[1].st_mtime):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= stat.st_size
+        removed += 1
+    
+    return removed
+
+# Model loaded once by each pool worker process
+_worker_model = None
+
+def _init_pool_worker(loader: Callable, loader_args: Tuple) -> None:
+    """Load the model of a pool worker before it takes any work."""
+    global _worker_model
+    _worker_model = loader(*loader_args)
+
+def _transcribe_in_worker(
+    file_path: str,
+    language: Optional[str],
+    start: float = 0.0,
+    duration: Optional[float] = None
+) -> Tuple[Dict, float]:
+    """Decode one clip of a file with the model of the pool worker."""
+    return transcribe_with_model(_worker_model, Path(file_path), language, start=start, duration=duration)
+
+class TranscriptionPool:
+    """
+    Process pool decoding audio with a local engine off the event loop.
+    
+    Every worker process loads the model once at startup and then decodes
+    clips of a file, given as an offset and duration, so the clips of one
+    file run on all cores at once and each worker only decodes its own part
+    of the audio. At most
+    workers * (1 + queued_per_worker) chunks are handed to the pool at a
+    time, further callers wait for a free slot instead of piling up work.
+    """
+    
+    def __init__(
+        self,
+        loader: Callable = load_local_model,
+        loader_args: Tuple = (),
+        workers: int = POOL_WORKERS,
+        queued_per_worker: int = POOL_QUEUED_PER_WORKER
+    ):
+        self.loader = loader
+        self.loader_args = loader_args
+        self.workers = max(1, workers)
+        self.capacity = self.workers * (1 + max(0, queued_per_worker))
+        self.in_flight = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Semaphores are bound to the event loop that created them
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned workers, the engine's threads don't survive a fork
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_pool_worker,
+                initargs=(self.loader, self.loader_args)
+            )
+        return self._executor
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.capacity)
+        return self._semaphores[loop]
+    
+    async def transcribe(
+        self,
+        file_path: Path,
+        language: Optional[str] = None,
+        start: float = 0.0,
+        duration: Optional[float] = None
+    ) -> Tuple[Dict, float]:
+        """
+        Decode an audio file, or a clip of it, in a worker process.
+        
+        Args:
+            file_path: Path to the audio file
+            language: Optional language code
+            start: Seconds into the file the clip starts at
+            duration: Length of the clip in seconds, None for the rest of the file
+            
+        Returns:
+            Tuple[Dict, float]: Transcription in the Whisper API format, and the audio duration in seconds
+        """
+        async with self._get_semaphore():
+            self.in_flight += 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    self._get_executor(), _transcribe_in_worker, str(file_path), language, start, duration
+                )
+            except BrokenProcessPool:
+                # A worker died, start a fresh pool on the next call
+                self.shutdown(wait=False)
+                raise
+            finally:
+                self.in_flight -= 1
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes, queued clips are cancelled."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+_transcription_pool: Optional[TranscriptionPool] = None
+
+def get_transcription_pool(backend: LocalWhisperBackend) -> TranscriptionPool:
+    """Get the application process pool, loading the model of the local backend in each worker."""
+    global _transcription_pool
+    if _transcription_pool is None:
+        workers = max(1, POOL_WORKERS)
+        # Split the cores between workers unless the backend sets a thread count
+        cpu_threads = backend.cpu_threads or max(1, (os.cpu_count() or 1) // workers)
+        _transcription_pool = TranscriptionPool(
+            load_local_model,
+            (backend.model_name, backend.device, backend.compute_type, cpu_threads),
+            workers
+        )
+    return _transcription_pool
+
+async def shutdown_transcription_pool() -> None:
+    """Stop the worker processes of the application process pool, if it was started."""
+    global _transcription_pool
+    if _transcription_pool is not None:
+        pool = _transcription_pool
+        _transcription_pool = None
+        # Waits for the clips being decoded, off the event loop
+        await asyncio.to_thread(pool.shutdown)
+
+async def _transcribe_file(
+    file_path: Path,
+    language: Optional[str] = None,
+    start: float = 0.0,
+    duration: Optional[float] = None
+) -> Dict:
+    """Send a single audio file, or a clip of it with the local backend, to the configured transcription backend."""
+    backend = get_transcription_backend()
+    if isinstance(backend, LocalWhisperBackend):
+        # CPU bound, decode in the process pool so the event loop stays responsive
+        return await backend.measure(get_transcription_pool(backend).transcribe(file_path, language, start, duration))
+    return await backend.transcribe(file_path, language)
 
 async def transcribe_audio(file_id: str, language: Optional[str] = None) -> Dict:
     """
-    Transcribe an audio file using Whisper.
+    Transcribe an audio file with the backend selected by TRANSCRIPTION_BACKEND.
     
     Args:
         file_id: The ID of the uploaded file
@@ -23,70 +310,519 @@ async def transcribe_audio(file_id: str, language: Optional[str] = None) -> Dict
     if not file_path:
         raise ValueError(f"File not found for ID: {file_id}")
     
+    # Identical content is only ever transcribed once per model and language
+    backend = get_transcription_backend()
+    metadata = get_file_metadata(file_id)
+    file_hash = metadata["hash"] if metadata else hash_file(file_path)
+    cache_key = get_cache_key(file_hash, backend.model, language)
+    cached = load_cached_transcription(cache_key)
+    if cached is not None:
+        return cached
+    
+    chunks = []
     try:
-        with open(file_path, "rb") as audio_file:
-            # Prepare transcription options
-            options = {
-                "model": "whisper-1",
-                "file": audio_file,
-                "response_format": "verbose_json"
-            }
-            
-            # Add language if specified
-            if language:
-                options["language"] = language
-            
-            # Call Whisper API
-            response = await client.audio.transcriptions.create(**options)
-            
-            return {
-                "text": response.text,
-                "segments": response.segments,
-                "language": response.language
-            }
-            
+        # Files over the backend's size or chunk duration limit are split and transcribed concurrently
+        if isinstance(backend, LocalWhisperBackend):
+            # Pool workers decode their own clip of the file, nothing is cut up front
+            chunks = await asyncio.to_thread(plan_clips, file_path, backend.chunk_duration)
+        elif backend.max_file_size is None and backend.chunk_duration is None:
+            chunks = [{"path": file_path, "offset": 0.0}]
+        else:
+            chunks = await asyncio.to_thread(
+                chunk_audio,
+                file_path,
+                0 if backend.chunk_duration is not None else backend.max_file_size,
+                backend.chunk_duration or CHUNK_DURATION
+            )
+        # The process pool applies its own backpressure, so all chunks are queued to it
+        semaphore = asyncio.Semaphore(
+            len(chunks) if isinstance(backend, LocalWhisperBackend) else MAX_CONCURRENT_CHUNKS
+        )
+        
+        async def transcribe_chunk(chunk: Dict) -> Dict:
+            async with semaphore:
+                if "duration" in chunk:
+                    return await _transcribe_file(chunk["path"], language, chunk["offset"], chunk["duration"])
+                return await _transcribe_file(chunk["path"], language)
+        
+        results = await asyncio.gather(*[transcribe_chunk(chunk) for chunk in chunks])
+        result = merge_chunk_transcriptions(chunks, results)
+        
     except Exception as e:
         raise Exception(f"Transcription failed: {str(e)}")
+    finally:
+        if chunks and chunks[0]["path"] != file_path:
+            shutil.rmtree(chunks[0]["path"].parent, ignore_errors=True)
+    
+    save_cached_transcription(cache_key, result)
+    return result
+
+def get_correction_cache() -> CorrectionCache:
+    """Get the cache of corrected segment texts at CORRECTION_CACHE_PATH."""
+    if CORRECTION_CACHE_PATH not in _correction_caches:
+        _correction_caches[CORRECTION_CACHE_PATH] = CorrectionCache(CORRECTION_CACHE_PATH)
+    return _correction_caches[CORRECTION_CACHE_PATH]
+
+def get_correction_key(text: str) -> str:
+    """Build the correction cache key of a segment text for the correction model."""
+    return hashlib.sha256(f"{CORRECTION_MODEL}:{text}".encode()).hexdigest()
+
+def batch_segment_texts(texts: List[Tuple[int, str]], max_segments: int, max_tokens: int) -> List[List[Tuple[int, str]]]:
+    """
+    Group (index, text) pairs into batches bounded by segment count and tokens.
+    
+    Args:
+        texts: Segment indexes and texts, in order
+        max_segments: Maximum number of segments per batch
+        max_tokens: Maximum number of text tokens per batch
+        
+    Returns:
+        List[List[Tuple[int, str]]]: The batches, in order
+    """
+    batches: List[List[Tuple[int, str]]] = []
+    batch_tokens = 0
+    for index, text in texts:
+        tokens = count_tokens(text, CORRECTION_MODEL)
+        if not batches or len(batches[-1]) >= max_segments or (batches[-1] and batch_tokens + tokens > max_tokens):
+            batches.append([])
+            batch_tokens = 0
+        batches[-1].append((index, text))
+        batch_tokens += tokens
+    return batches
 
-async def correct_transcription(text: str) -> str:
+def parse_corrections(content: str) -> Dict[int, str]:
     """
-    Review and correct transcription errors using GPT-4.
+    Parse the segment index to corrected text mapping in a model reply.
     
     Args:
-        text: The transcribed text to correct
+        content: Reply content with a JSON object, possibly wrapped in a code fence or prose
         
     Returns:
-        str: Corrected text
+        Dict[int, str]: Corrected text by segment index, empty if the reply is not valid
     """
+    start = content.find("{")
+    end = content.rfind("}")
+    if start == -1 or end < start:
+        return {}
     try:
-        response = await client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a transcription correction expert. Review the text and fix any obvious transcription errors while maintaining the original meaning."},
-                {"role": "user", "content": f"Please review and correct this transcription:\n\n{text}"}
-            ]
+        data = json.loads(content[start:end + 1])
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    
+    corrections = {}
+    for index, text in data.items():
+        if isinstance(text, str) and text.strip():
+            try:
+                corrections[int(index)] = text.strip()
+            except ValueError:
+                continue
+    return corrections
+
+async def correct_batch(batch: List[Tuple[int, str]]) -> Dict[int, str]:
+    """
+    Correct a batch of segment texts with one GPT-4 request.
+    
+    Args:
+        batch: Segment indexes and texts
+        
+    Returns:
+        Dict[int, str]: Corrected text by segment index, for the segments in the reply
+    """
+    segment_lines = "\n".join(f"[{index}] {text}" for index, text in batch)
+    prompt = f"""Please review and correct these transcription segments. 
+    Fix any obvious transcription errors while maintaining the original meaning, 
+    and keep every segment separate.
+    Respond only with a JSON object mapping each segment index to its corrected text, 
+    for example {{"{batch[0][0]}": "Corrected text."}}.
+    
+    Segments:
+    {segment_lines}
+    """
+    
+    async with limit("chat"):
+        response = await get_client().chat.completions.create(
+            model=CORRECTION_MODEL,
+            messages=build_messages(
+                "You are a transcription correction expert. Review the text and fix any obvious transcription errors while maintaining the original meaning.",
+                prompt,
+                CORRECTION_MODEL
+            )
         )
+    
+    corrections = parse_corrections(response.choices[0].message.content or "")
+    indexes = {index for index, _ in batch}
+    return {index: text for index, text in corrections.items() if index in indexes}
+
+def load_lexicon(path: Path) -> Optional[FrozenSet[str]]:
+    """
+    Load a word list for the lexicon check of correction gating.
+    
+    Loaded word lists are kept in memory. A missing file is not remembered,
+    so a word list installed later is picked up.
+    
+    Args:
+        path: Text file with one word per line
         
-        return response.choices[0].message.content
+    Returns:
+        Optional[FrozenSet[str]]: Lowercased words, or None if the file does not exist
+    """
+    if path in _lexicons:
+        return _lexicons[path]
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            lexicon = frozenset(line.strip().lower() for line in f if line.strip())
+    except FileNotFoundError:
+        logger.warning("Correction lexicon %s not found, segments are gated on confidence only", path)
+        return None
+    _lexicons[path] = lexicon
+    return lexicon
+
+def is_suspect_segment(segment: Dict, lexicon: Optional[FrozenSet[str]] = None) -> bool:
+    """
+    Check whether a Whisper segment may contain transcription errors.
+    
+    A segment is suspect when Whisper reports low confidence, a likely
+    hallucination over silence or repetitive text, or when it has words
+    missing from the lexicon. Segments without confidence values are
+    always suspect.
+    
+    Args:
+        segment: Whisper segment from a verbose_json transcription
+        lexicon: Optional set of known lowercase words
+        
+    Returns:
+        bool: True if the segment should be corrected
+    """
+    avg_logprob = segment.get("avg_logprob")
+    no_speech_prob = segment.get("no_speech_prob")
+    if avg_logprob is None or no_speech_prob is None:
+        return True
+    if avg_logprob < CORRECTION_MIN_AVG_LOGPROB or no_speech_prob > CORRECTION_MAX_NO_SPEECH_PROB:
+        return True
+    if segment.get("compression_ratio", 0.0) > CORRECTION_MAX_COMPRESSION_RATIO:
+        return True
+    if lexicon is not None:
+        words = re.findall(r"[^\W\d_]+(?:'[^\W\d_]+)*", segment["text"])
+        return any(word.lower() not in lexicon for word in words)
+    return False
+
+def gate_segments(segments: List[Dict]) -> Tuple[List[bool], Dict]:
+    """
+    Select the segments worth sending for correction.
+    
+    Args:
+        segments: Whisper segments
+        
+    Returns:
+        Tuple[List[bool], Dict]: Whether each segment is suspect, and the total
+        number of segments with the number of segments and text tokens skipped
+    """
+    lexicon = load_lexicon(CORRECTION_LEXICON_PATH)
+    suspect = [is_suspect_segment(segment, lexicon) for segment in segments]
+    skipped = [segment["text"].strip() for segment, flag in zip(segments, suspect) if not flag]
+    stats = {
+        "segments": len(segments),
+        "skipped_segments": len(skipped),
+        "skipped_tokens": sum(count_tokens(text, CORRECTION_MODEL) for text in skipped if text)
+    }
+    return suspect, stats
+
+async def correct_segments(segments: List[Dict], suspect: Optional[List[bool]] = None) -> List[Dict]:
+    """
+    Correct transcription errors segment by segment using GPT-4.
+    
+    Segments are corrected in batches with at most CORRECTION_CONCURRENCY
+    requests in flight. Corrections are cached by a hash of the segment
+    text, so a text that was corrected before, in this transcript or an
+    earlier one, is never sent again. Segments missing from a reply keep
+    their text and are retried on the next run.
+    
+    Args:
+        segments: Whisper segments
+        suspect: Optional flags from gate_segments, segments not flagged keep their text
+        
+    Returns:
+        List[Dict]: Copies of the segments with corrected text
+    """
+    try:
+        if suspect is None:
+            suspect = [True] * len(segments)
+        texts = [segment["text"].strip() for segment in segments]
+        keys = [get_correction_key(text) for text in texts]
+        cache = get_correction_cache()
+        corrections = await asyncio.to_thread(
+            cache.get_many, [key for key, flag in zip(keys, suspect) if flag]
+        )
+        
+        # Each distinct uncached text is sent once
+        pending: Dict[str, int] = {}
+        for index, (key, text) in enumerate(zip(keys, texts)):
+            if suspect[index] and text and key not in corrections and key not in pending:
+                pending[key] = index
+        
+        if pending:
+            batches = batch_segment_texts(
+                [(index, texts[index]) for index in pending.values()],
+                CORRECTION_BATCH_SEGMENTS,
+                CORRECTION_BATCH_TOKENS
+            )
+            semaphore = asyncio.Semaphore(CORRECTION_CONCURRENCY)
+            
+            async def correct(batch: List[Tuple[int, str]]) -> Dict[int, str]:
+                async with semaphore:
+                    return await correct_batch(batch)
+            
+            results = await asyncio.gather(*[correct(batch) for batch in batches])
+            new_corrections = {
+                keys[index]: text for result in results for index, text in result.items()
+            }
+            await asyncio.to_thread(cache.put_many, new_corrections)
+            corrections.update(new_corrections)
+        
+        corrected = []
+        for segment, key, text, flag in zip(segments, keys, texts, suspect):
+            if not flag:
+                corrected.append({**segment})
+                continue
+            # Keep Whisper's leading space so segment texts still join into the full text
+            leading = segment["text"][:len(segment["text"]) - len(segment["text"].lstrip())]
+            corrected.append({**segment, "text": leading + corrections.get(key, text)})
+        return corrected
         
     except Exception as e:
         raise Exception(f"Transcription correction failed: {str(e)}")
 
-def chunk_audio(file_path: Path, chunk_size: int = 25 * 1024 * 1024) -> List[Path]:
+async def get_transcript(file_id: str, language: Optional[str] = None) -> Dict:
+    """
+    Get the Whisper transcription of a file, computing it at most once per file_id.
+    
+    Args:
+        file_id: The ID of the uploaded file
+        language: Optional language code
+        
+    Returns:
+        dict: Contains transcription text, segments and language
+    """
+    return await get_or_create_artifact(
+        file_id, "transcript", lambda: transcribe_audio(file_id, language), language
+    )
+
+async def get_corrected_transcript(file_id: str, language: Optional[str] = None) -> Dict:
+    """
+    Get the GPT-4 corrected transcription of a file, computing it at most once per file_id.
+    
+    Only segments selected by gate_segments are sent for correction.
+    
+    Args:
+        file_id: The ID of the uploaded file
+        language: Optional language code
+        
+    Returns:
+        dict: Contains corrected text and segments, and the gating stats under correction
+    """
+    async def produce() -> Dict:
+        transcription = await get_transcript(file_id, language)
+        # Loading the lexicon and counting tokens would block the event loop
+        suspect, stats = await asyncio.to_thread(gate_segments, transcription["segments"])
+        segments = await correct_segments(transcription["segments"], suspect)
+        return {
+            "text": "".join(segment["text"] for segment in segments).strip(),
+            "segments": segments,
+            "correction": stats
+        }
+    
+    corrected = await get_or_create_artifact(file_id, "corrected", produce, language)
+    if isinstance(corrected, str):
+        # Stored by a version that corrected the whole text at once, its text
+        # does not match the segments, so the correction is redone per segment
+        async with get_artifact_lock(file_id, "corrected", language):
+            corrected = load_artifact(file_id, "corrected", language)
+            if not isinstance(corrected, dict):
+                corrected = await produce()
+                save_artifact(file_id, "corrected", corrected, language)
+    return corrected
+
+def plan_clips(
+    file_path: Path,
+    chunk_duration: float = CHUNK_DURATION,
+    overlap: float = CHUNK_OVERLAP
+) -> List[Dict]:
+    """
+    Split an audio file into clips of about chunk_duration without writing any audio.
+    
+    Consecutive clips share overlap seconds of audio so no words are lost at
+    the cut. Files whose duration cannot be probed are a single clip.
+    
+    Args:
+        file_path: Path to the audio file
+        chunk_duration: Target length of each clip in seconds
+        overlap: Seconds of audio shared by consecutive clips
+        
+    Returns:
+        List[Dict]: Clips with the file path, their offset and duration in seconds
+    """
+    file_path = Path(file_path)
+    duration = get_audio_duration(file_path)
+    if duration is None:
+        return [{"path": file_path, "offset": 0.0}]
+    
+    clips = []
+    start = 0.0
+    while True:
+        end = min(start + chunk_duration, duration)
+        clips.append({"path": file_path, "offset": start, "duration": end - start})
+        if end >= duration:
+            return clips
+        start = max(end - overlap, start + 1.0)
+
+def _find_split_point(levels: List[float], threshold: float, target: int, window: int, min_silence: int) -> int:
+    """Find a cut point, as a level index, at the last silence before target, falling back to target."""
+    end = target
+    run = 0
+    for index in range(target - 1, max(0, target - window) - 1, -1):
+        if levels[index] <= threshold:
+            run += 1
+            continue
+        if run >= min_silence:
+            break
+        end = index
+        run = 0
+    if run < min_silence:
+        return target
+    return end - run // 2
+
+def chunk_audio(
+    file_path: Path,
+    chunk_size: int = WHISPER_MAX_FILE_SIZE,
+    chunk_duration: float = CHUNK_DURATION,
+    overlap: float = CHUNK_OVERLAP
+) -> List[Dict]:
     """
     Split large audio files into smaller chunks for processing.
     
+    Chunks are cut at the last silence before each chunk_duration boundary and
+    consecutive chunks share overlap seconds of audio so no words are lost at
+    the cut. The file is streamed twice through iter_pcm_frames, once to
+    measure its loudness and once to write the chunks as 16kHz mono WAV
+    files, so it is never held in memory as a whole.
+    
     Args:
         file_path: Path to the audio file
-        chunk_size: Size of each chunk in bytes (default: 25MB)
+        chunk_size: Files up to this size in bytes are not split, and no chunk is
+            larger (default: 25MB, 0 to split any file)
+        chunk_duration: Target length of each chunk in seconds, shorter files are not split
+        overlap: Seconds of audio shared by consecutive chunks
         
     Returns:
-        List[Path]: List of paths to chunk files
+        List[Dict]: Chunks with their path and offset in seconds into the original file
+    """
+    file_path = Path(file_path)
+    if file_path.stat().st_size <= chunk_size:
+        return [{"path": file_path, "offset": 0.0}]
+    if chunk_size:
+        # Keep every decoded chunk under the size limit
+        chunk_duration = min(chunk_duration, (chunk_size - 1024) / (DECODE_SAMPLE_RATE * DECODE_SAMPLE_WIDTH))
+    # Probing reads the header only, short files are never decoded here
+    duration = get_audio_duration(file_path)
+    if duration is not None and duration <= chunk_duration:
+        return [{"path": file_path, "offset": 0.0}]
+    
+    levels = list(iter_levels(file_path, CHUNK_LEVEL_WINDOW))
+    if len(levels) * CHUNK_LEVEL_WINDOW <= chunk_duration:
+        return [{"path": file_path, "offset": 0.0}]
+    mean_level = math.sqrt(sum(level * level for level in levels) / len(levels))
+    threshold = mean_level * 10 ** (-CHUNK_SILENCE_DB / 20)
+    chunk_windows = max(1, int(chunk_duration / CHUNK_LEVEL_WINDOW))
+    overlap_windows = int(overlap / CHUNK_LEVEL_WINDOW)
+    search_windows = min(int(CHUNK_SILENCE_WINDOW / CHUNK_LEVEL_WINDOW), chunk_windows // 2)
+    min_silence = max(1, round(CHUNK_MIN_SILENCE / CHUNK_LEVEL_WINDOW))
+    
+    ranges = []
+    start = 0
+    while start < len(levels):
+        end = start + chunk_windows
+        if end >= len(levels):
+            end = len(levels)
+        else:
+            end = _find_split_point(levels, threshold, end, search_windows, min_silence)
+        ranges.append((start, end))
+        if end >= len(levels):
+            break
+        start = max(end - overlap_windows, start + 1)
+    
+    # Unique per call so concurrent transcriptions of one file don't share chunks
+    CHUNK_DIR.mkdir(parents=True, exist_ok=True)
+    chunk_dir = Path(tempfile.mkdtemp(prefix=f"{file_path.stem}-", dir=CHUNK_DIR))
+    
+    chunks = []
+    for start, end in ranges:
+        offset = start * CHUNK_LEVEL_WINDOW
+        chunk_path = chunk_dir / f"{len(chunks):04d}.wav"
+        length = None if end >= len(levels) else (end - start) * CHUNK_LEVEL_WINDOW
+        write_wav(chunk_path, iter_pcm_frames(file_path, start=offset, duration=length))
+        chunks.append({"path": chunk_path, "offset": offset})
+    
+    return chunks
+
+def _normalize_words(text: str) -> List[str]:
+    """Lowercase words without punctuation, for comparing overlapping text."""
+    return re.findall(r"\w+", text.lower())
+
+def _strip_overlap(previous_text: str, text: str, max_words: int = 20) -> str:
+    """Remove leading words of text that repeat the end of previous_text."""
+    previous_words = _normalize_words(previous_text)[-max_words:]
+    words = text.split()
+    normalized = [" ".join(_normalize_words(word)) for word in words]
+    
+    for size in range(min(len(previous_words), len(words)), 0, -1):
+        if normalized[:size] == previous_words[-size:]:
+            return " ".join(words[size:])
+    return text
+
+def merge_chunk_transcriptions(chunks: List[Dict], results: List[Dict]) -> Dict:
     """
-    # TODO: Implement audio chunking
-    # This would require additional audio processing libraries
-    # For now, we'll return the original file
-    return [file_path]
+    Stitch per-chunk Whisper results back into a single transcription.
+    
+    Segment timestamps are shifted by their chunk offset and text that was
+    transcribed twice in the overlap between chunks is dropped.
+    
+    Args:
+        chunks: Chunks returned by chunk_audio
+        results: Transcription of each chunk, in the same order
+        
+    Returns:
+        dict: Contains transcription text, segments and language
+    """
+    if len(results) == 1:
+        return results[0]
+    
+    segments = []
+    for chunk, result in zip(chunks, results):
+        offset = chunk["offset"]
+        for segment in result["segments"]:
+            segment = {**segment, "start": segment["start"] + offset, "end": segment["end"] + offset}
+            
+            if segments and segment["start"] < segments[-1]["end"]:
+                previous = segments[-1]
+                # Fully inside audio the previous chunk already covered
+                if segment["end"] <= previous["end"]:
+                    continue
+                text = _strip_overlap(previous["text"], segment["text"])
+                if not text.strip():
+                    continue
+                segment["text"] = f" {text}" if segment["text"].startswith(" ") else text
+                segment["start"] = previous["end"]
+            
+            segment["id"] = len(segments)
+            segments.append(segment)
+    
+    return {
+        "text": " ".join(segment["text"].strip() for segment in segments),
+        "segments": segments,
+        "language": results[0]["language"]
+    }
 
 class TranscriptionError(Exception):
     """Custom exception for transcription errors."""
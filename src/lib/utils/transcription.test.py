@@ -4,7 +4,6 @@ from pathlib import Path
 from src.lib.utils.transcription import (
     transcribe_audio,
     detect_language,
-    correct_transcription,
     calculate_accuracy,
     TranscriptionError
 )
@@ -62,43 +61,14 @@ async def test_transcribe_audio_api_error():
             await transcribe_audio("test_file_id")
         assert "Transcription failed" in str(exc_info.value)
 
-@pytest.mark.asyncio
-async def test_correct_transcription():
-    # Mock GPT-4 response
-    mock_response = MagicMock()
-    mock_response.choices = [
-        MagicMock(
-            message=MagicMock(
-                content="This is a corrected transcription."
-            )
-        )
-    ]
-    
-    with patch('openai.OpenAI') as mock_openai:
-        mock_client = MagicMock()
-        mock_openai.return_value = mock_client
-        mock_client.chat.completions.create.return_value = mock_response
-        
-        result = await correct_transcription("This is a test transcription.")
-        assert result == "This is a corrected transcription."
-
-@pytest.mark.asyncio
-async def test_correct_transcription_error():
-    with patch('openai.OpenAI') as mock_openai:
-        mock_client = MagicMock()
-        mock_openai.return_value = mock_client
-        mock_client.chat.completions.create.side_effect = Exception("API Error")
-        
-        with pytest.raises(Exception) as exc_info:
-            await correct_transcription("test transcription")
-        assert "Transcription correction failed" in str(exc_info.value)
-
-def test_chunk_audio():
+def test_chunk_audio(tmp_path):
     # Test with a small file (should return original file)
-    mock_file_path = Path("test_audio.mp3")
+    mock_file_path = tmp_path / "test_audio.mp3"
+    mock_file_path.write_bytes(b"mock audio content")
     result = chunk_audio(mock_file_path)
     assert len(result) == 1
-    assert result[0] == mock_file_path 
+    assert result[0]["path"] == mock_file_path
+    assert result[0]["offset"] == 0.0 
 
 def test_detect_language():
     # Test language detection
@@ -0,0 +1,415 @@
+import os
+import time
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Awaitable, Dict, List, Optional, Protocol, Tuple
+from src.lib.utils.openaiClient import get_client, limit
+from src.lib.utils.audioDecoding import DECODE_SAMPLE_RATE, iter_pcm_frames
+
+try:
+    from faster_whisper import WhisperModel
+except ImportError:  # Optional, only needed by the local backend
+    WhisperModel = None
+
+# Constants
+TRANSCRIPTION_BACKEND = os.getenv("TRANSCRIPTION_BACKEND", "openai")  # openai, local or fake
+OPENAI_TRANSCRIPTION_MODEL = os.getenv("OPENAI_TRANSCRIPTION_MODEL", "whisper-1")
+WHISPER_MAX_FILE_SIZE = 25 * 1024 * 1024  # 25MB upload limit of the Whisper API
+LOCAL_WHISPER_MODEL = os.getenv("LOCAL_WHISPER_MODEL", "small")  # Model size or path of a CTranslate2 model
+LOCAL_WHISPER_DEVICE = os.getenv("LOCAL_WHISPER_DEVICE", "cpu")
+LOCAL_WHISPER_COMPUTE_TYPE = os.getenv("LOCAL_WHISPER_COMPUTE_TYPE", "int8")
+LOCAL_WHISPER_CPU_THREADS = int(os.getenv("LOCAL_WHISPER_CPU_THREADS", 0))  # 0 lets CTranslate2 decide
+LOCAL_WHISPER_BEAM_SIZE = int(os.getenv("LOCAL_WHISPER_BEAM_SIZE", 5))
+LOCAL_WHISPER_CHUNK_DURATION = float(os.getenv("LOCAL_WHISPER_CHUNK_DURATION", 5 * 60))  # Seconds of audio per work item
+FAKE_SEGMENT_SECONDS = 5.0  # Length of each segment produced by the fake backend
+FAKE_BYTES_PER_SECOND = 16000  # Audio duration the fake backend assumes per byte, 128kbps MP3
+
+class TranscriptionBackendError(Exception):
+    """Custom exception for transcription backend errors."""
+    pass
+
+class TranscriptionMetrics:
+    """Timing and throughput counters of a transcription backend."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all counters."""
+        with self._lock:
+            self.requests = 0
+            self.failures = 0
+            self.audio_seconds = 0.0
+            self.processing_seconds = 0.0
+            self.last_processing_seconds = 0.0
+
+    def record(self, processing_seconds: float, audio_seconds: float = 0.0, failed: bool = False) -> None:
+        """
+        Record one transcription request.
+
+        Args:
+            processing_seconds: Wall clock time the request took
+            audio_seconds: Duration of the transcribed audio
+            failed: Whether the request failed
+        """
+        with self._lock:
+            self.requests += 1
+            self.failures += int(failed)
+            self.audio_seconds += audio_seconds
+            self.processing_seconds += processing_seconds
+            self.last_processing_seconds = processing_seconds
+
+    def snapshot(self) -> Dict:
+        """
+        Get the current counters.
+
+        Returns:
+            Dict: Request and failure counts, audio and processing seconds, and the
+            real time factor, seconds of audio transcribed per second of processing
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "failures": self.failures,
+                "audio_seconds": self.audio_seconds,
+                "processing_seconds": self.processing_seconds,
+                "last_processing_seconds": self.last_processing_seconds,
+                "realtime_factor": self.audio_seconds / self.processing_seconds if self.processing_seconds else 0.0
+            }
+
+class TranscriptionBackend(Protocol):
+    """Speech to text engine producing Whisper style verbose_json transcriptions."""
+
+    # Name of the backend and model, part of the transcription cache key
+    name: str
+    model: str
+    # Files over this size in bytes are split before transcription, None for no limit
+    max_file_size: Optional[int]
+    # Files are split into chunks of about this many seconds, None to only split on size
+    chunk_duration: Optional[float]
+    metrics: TranscriptionMetrics
+
+    async def transcribe(self, file_path: Path, language: Optional[str] = None) -> Dict:
+        ...
+
+    def get_metrics(self) -> Dict:
+        ...
+
+class MeteredBackend(ABC):
+    """Base class recording the metrics of every transcription of a backend."""
+
+    name = "base"
+    model = ""
+    max_file_size: Optional[int] = None
+    chunk_duration: Optional[float] = None
+
+    def __init__(self):
+        self.metrics = TranscriptionMetrics()
+
+    async def transcribe(self, file_path: Path, language: Optional[str] = None) -> Dict:
+        """
+        Transcribe an audio file.
+
+        Args:
+            file_path: Path to the audio file
+            language: Optional language code
+
+        Returns:
+            dict: Contains transcription text, segments and language
+        """
+        return await self.measure(self._transcribe(Path(file_path), language))
+
+    async def measure(self, transcription: Awaitable[Tuple[Dict, float]]) -> Dict:
+        """
+        Await a transcription of this backend and record its metrics.
+
+        Args:
+            transcription: Awaitable of the result and the audio duration in seconds
+
+        Returns:
+            dict: The transcription result
+        """
+        started = time.perf_counter()
+        try:
+            result, audio_seconds = await transcription
+        except Exception:
+            self.metrics.record(time.perf_counter() - started, failed=True)
+            raise
+        self.metrics.record(time.perf_counter() - started, audio_seconds)
+        return result
+
+    @abstractmethod
+    async def _transcribe(self, file_path: Path, language: Optional[str]) -> Tuple[Dict, float]:
+        """Transcribe a file, returning the result and the audio duration in seconds."""
+
+    def get_metrics(self) -> Dict:
+        """Get the timing and throughput metrics of the backend."""
+        return {"backend": self.name, "model": self.model, **self.metrics.snapshot()}
+
+def _get_field(item, name: str, default=None):
+    """Read a field of a dict or an object."""
+    return item.get(name, default) if isinstance(item, dict) else getattr(item, name, default)
+
+def _serialize_segments(segments) -> List[Dict]:
+    """Convert Whisper segment objects to plain dicts so they can be cached."""
+    return [
+        segment if isinstance(segment, dict) else segment.model_dump()
+        for segment in segments or []
+    ]
+
+def _get_audio_seconds(segments: List[Dict], duration: Optional[float] = None) -> float:
+    """Get the audio duration of a transcription, from the end of its last segment if unknown."""
+    if duration:
+        return float(duration)
+    return float(segments[-1]["end"]) if segments else 0.0
+
+class OpenAIBackend(MeteredBackend):
+    """Transcription with the OpenAI Whisper API."""
+
+    name = "openai"
+    max_file_size = WHISPER_MAX_FILE_SIZE
+
+    def __init__(self, model: str = OPENAI_TRANSCRIPTION_MODEL):
+        super().__init__()
+        self.model = model
+
+    async def _transcribe(self, file_path: Path, language: Optional[str]) -> Tuple[Dict, float]:
+        with open(file_path, "rb") as audio_file:
+            # Prepare transcription options
+            options = {
+                "model": self.model,
+                "file": audio_file,
+                "response_format": "verbose_json"
+            }
+
+            # Add language if specified
+            if language:
+                options["language"] = language
+
+            # Call Whisper API
+            async with limit("transcriptions"):
+                response = await get_client().audio.transcriptions.create(**options)
+
+        segments = _serialize_segments(response.segments)
+        result = {
+            "text": response.text,
+            "segments": segments,
+            "language": response.language
+        }
+        return result, _get_audio_seconds(segments, _get_field(response, "duration"))
+
+def load_local_model(
+    model: str = LOCAL_WHISPER_MODEL,
+    device: str = LOCAL_WHISPER_DEVICE,
+    compute_type: str = LOCAL_WHISPER_COMPUTE_TYPE,
+    cpu_threads: int = LOCAL_WHISPER_CPU_THREADS
+):
+    """
+    Load a faster-whisper model.
+
+    Args:
+        model: Model size, e.g. "small", or path of a converted CTranslate2 model
+        device: "cpu", "cuda" or "auto"
+        compute_type: Weight quantization, e.g. "int8" on CPU
+        cpu_threads: Threads used by the model, 0 lets CTranslate2 decide
+
+    Returns:
+        WhisperModel: The loaded model
+    """
+    if WhisperModel is None:
+        raise TranscriptionBackendError("The local backend requires faster-whisper: pip install faster-whisper")
+    return WhisperModel(model, device=device, compute_type=compute_type, cpu_threads=cpu_threads)
+
+def load_clip(file_path: Path, start: float, duration: Optional[float]):
+    """
+    Decode part of an audio file into the 16kHz mono float32 samples faster-whisper takes.
+
+    Args:
+        file_path: Path to the audio file
+        start: Seconds into the file the clip starts at
+        duration: Length of the clip in seconds, None for the rest of the file
+
+    Returns:
+        numpy.ndarray: Samples between -1 and 1
+    """
+    # numpy comes with faster-whisper
+    import numpy
+
+    pcm = b"".join(iter_pcm_frames(file_path, DECODE_SAMPLE_RATE, start=start, duration=duration))
+    return numpy.frombuffer(pcm, dtype="<i2").astype(numpy.float32) / 32768.0
+
+def transcribe_with_model(
+    whisper_model,
+    file_path: Path,
+    language: Optional[str] = None,
+    beam_size: int = LOCAL_WHISPER_BEAM_SIZE,
+    start: float = 0.0,
+    duration: Optional[float] = None
+) -> Tuple[Dict, float]:
+    """
+    Transcribe an audio file, or a clip of it, with a loaded faster-whisper model.
+
+    Blocks until the audio is decoded, run it off the event loop. A clip is
+    decoded on its own, segment times are relative to its start.
+
+    Args:
+        whisper_model: Model returned by load_local_model
+        file_path: Path to the audio file
+        language: Optional language code, detected when not given
+        beam_size: Beam size of the decoder
+        start: Seconds into the file to start at
+        duration: Seconds of audio to transcribe, None for the rest of the file
+
+    Returns:
+        Tuple[Dict, float]: Transcription in the Whisper API format, and the audio duration in seconds
+    """
+    audio = str(file_path) if not start and duration is None else load_clip(Path(file_path), start, duration)
+    segments, info = whisper_model.transcribe(audio, language=language, beam_size=beam_size)
+    result_segments = []
+    for segment in segments:
+        result_segments.append({
+            "id": len(result_segments),
+            "seek": _get_field(segment, "seek", 0),
+            "start": segment.start,
+            "end": segment.end,
+            "text": segment.text,
+            "tokens": list(_get_field(segment, "tokens", []) or []),
+            "temperature": _get_field(segment, "temperature", 0.0),
+            "avg_logprob": segment.avg_logprob,
+            "compression_ratio": segment.compression_ratio,
+            "no_speech_prob": segment.no_speech_prob
+        })
+
+    result = {
+        "text": "".join(segment["text"] for segment in result_segments).strip(),
+        "segments": result_segments,
+        "language": info.language
+    }
+    return result, _get_audio_seconds(result_segments, info.duration)
+
+class LocalWhisperBackend(MeteredBackend):
+    """
+    Offline transcription on the CPU with faster-whisper (CTranslate2).
+
+    transcribe decodes in a thread of this process, transcribe_audio runs the
+    same decoding on every core with the process pool of the transcription module.
+    """
+
+    name = "local"
+    chunk_duration = LOCAL_WHISPER_CHUNK_DURATION
+
+    def __init__(
+        self,
+        model: str = LOCAL_WHISPER_MODEL,
+        device: str = LOCAL_WHISPER_DEVICE,
+        compute_type: str = LOCAL_WHISPER_COMPUTE_TYPE,
+        cpu_threads: int = LOCAL_WHISPER_CPU_THREADS
+    ):
+        if WhisperModel is None:
+            raise TranscriptionBackendError("The local backend requires faster-whisper: pip install faster-whisper")
+        super().__init__()
+        self.model_name = model
+        self.model = f"faster-whisper:{Path(model).name}:{compute_type}"
+        self.device = device
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self._whisper_model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        # Loaded on first use, loading takes seconds and a lot of memory
+        with self._lock:
+            if self._whisper_model is None:
+                self._whisper_model = load_local_model(
+                    self.model_name, self.device, self.compute_type, self.cpu_threads
+                )
+            return self._whisper_model
+
+    async def _transcribe(self, file_path: Path, language: Optional[str]) -> Tuple[Dict, float]:
+        return await asyncio.to_thread(
+            lambda: transcribe_with_model(self._get_model(), file_path, language)
+        )
+
+class FakeBackend(MeteredBackend):
+    """Deterministic offline backend for tests and benchmarks, derives segments from the file size."""
+
+    name = "fake"
+    model = "fake"
+
+    def __init__(
+        self,
+        segment_seconds: float = FAKE_SEGMENT_SECONDS,
+        bytes_per_second: int = FAKE_BYTES_PER_SECOND,
+        latency: float = 0.0
+    ):
+        super().__init__()
+        self.segment_seconds = segment_seconds
+        self.bytes_per_second = bytes_per_second
+        self.latency = latency
+
+    async def _transcribe(self, file_path: Path, language: Optional[str]) -> Tuple[Dict, float]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        duration = file_path.stat().st_size / self.bytes_per_second
+        segments = []
+        start = 0.0
+        while start < duration:
+            end = min(start + self.segment_seconds, duration)
+            segments.append({
+                "id": len(segments),
+                "seek": 0,
+                "start": start,
+                "end": end,
+                "text": f" Segment {len(segments) + 1} of {file_path.stem}.",
+                "tokens": [],
+                "temperature": 0.0,
+                "avg_logprob": -0.1,
+                "compression_ratio": 1.0,
+                "no_speech_prob": 0.0
+            })
+            start = end
+
+        result = {
+            "text": "".join(segment["text"] for segment in segments).strip(),
+            "segments": segments,
+            "language": language or "en"
+        }
+        return result, duration
+
+BACKENDS = {
+    "openai": OpenAIBackend,
+    "local": LocalWhisperBackend,
+    "fake": FakeBackend,
+}
+
+_backend: Optional[TranscriptionBackend] = None
+
+def create_backend(name: str) -> TranscriptionBackend:
+    """
+    Create a transcription backend by name.
+
+    Args:
+        name: One of BACKENDS ("openai", "local" or "fake")
+
+    Returns:
+        TranscriptionBackend: The backend with its default configuration
+    """
+    if name not in BACKENDS:
+        raise TranscriptionBackendError(f"Unknown transcription backend: {name}")
+    return BACKENDS[name]()
+
+def get_transcription_backend() -> TranscriptionBackend:
+    """Get the application transcription backend, selected by TRANSCRIPTION_BACKEND."""
+    global _backend
+    if _backend is None:
+        _backend = create_backend(TRANSCRIPTION_BACKEND)
+    return _backend
+
+def set_transcription_backend(backend: Optional[TranscriptionBackend]) -> None:
+    """Replace the application transcription backend, None to select it from TRANSCRIPTION_BACKEND again."""
+    global _backend
+    _backend = backend
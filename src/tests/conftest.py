@@ -4,7 +4,11 @@ from unittest.mock import MagicMock, patch
 from fastapi.testclient import TestClient
 from src.app.main import app
 from playwright.sync_api import sync_playwright
+import json
+import time
 import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
 # Mock environment variables
@@ -127,4 +131,73 @@ def test_environment():
         if key in os.environ:
             del os.environ[key]
 
+class StubModelServer:
+    """Local stand-in for the OpenAI chat completions API."""
+    
+    def __init__(self):
+        self.requests = []
+        self.delay = 0.0
+        self.active = 0
+        self.max_active = 0
+        self.respond = lambda request: "Stub response"
+        self._lock = threading.Lock()
+    
+    def complete(self, request):
+        with self._lock:
+            self.requests.append(request)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            content = self.respond(request)
+        finally:
+            with self._lock:
+                self.active -= 1
+        
+        return {
+            "id": f"chatcmpl-{len(self.requests)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        }
+
+@pytest.fixture
+def stub_model_server(monkeypatch):
+    """
+    Serve chat completions from a local HTTP server and point the OpenAI client at it.
+    
+    Set `respond` to a function of the request body returning the reply
+    content, and `delay` to slow every reply down.
+    """
+    stub = StubModelServer()
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            body = json.dumps(stub.complete(request)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_port}/v1")
+    
+    yield stub
+    
+    server.shutdown()
+    server.server_close()
+
 # NOTE: Do NOT define a custom 'browser' fixture here. Use pytest-playwright's built-in browser fixture for browser automation tests. 
\ No newline at end of file
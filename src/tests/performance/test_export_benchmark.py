@@ -0,0 +1,61 @@
+import time
+import pytest
+from datetime import timedelta
+from src.lib.utils.export import format_timestamps, export_to_srt
+
+CUE_COUNT = 100_000
+
+def legacy_format_timestamp(seconds: float) -> str:
+    """The timedelta based formatter the batch formatter replaced."""
+    time = timedelta(seconds=seconds)
+    hours = int(time.total_seconds() // 3600)
+    minutes = int((time.total_seconds() % 3600) // 60)
+    seconds = time.total_seconds() % 60
+    milliseconds = int((seconds % 1) * 1000)
+    seconds = int(seconds)
+    
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+
+def per_cue_microseconds(function, repeat: int = 3) -> float:
+    """Best of repeat runs, in microseconds per cue."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best / CUE_COUNT * 1_000_000
+
+@pytest.mark.performance
+def test_timestamp_formatting_benchmark(record_property):
+    starts = [i * 2.345 for i in range(CUE_COUNT)]
+    ends = [start + 2.0 for start in starts]
+    
+    def legacy():
+        for start, end in zip(starts, ends):
+            legacy_format_timestamp(start).replace(",", ".")
+            legacy_format_timestamp(end).replace(",", ".")
+    
+    def batch():
+        format_timestamps(starts, ".")
+        format_timestamps(ends, ".")
+    
+    # Timings are recorded rather than asserted, wall-clock limits flake on loaded machines
+    record_property("legacy_us_per_cue", round(per_cue_microseconds(legacy), 3))
+    record_property("batch_us_per_cue", round(per_cue_microseconds(batch), 3))
+    
+    assert len(format_timestamps(starts, ".")) == CUE_COUNT
+
+@pytest.mark.performance
+def test_srt_export_benchmark(record_property):
+    transcription = {
+        "segments": [
+            {"text": f" Segment {i}", "start": i * 2.345, "end": i * 2.345 + 2.0}
+            for i in range(CUE_COUNT)
+        ]
+    }
+    
+    output = []
+    cost = per_cue_microseconds(lambda: output.append(export_to_srt(transcription)), repeat=1)
+    record_property("srt_us_per_cue", round(cost, 3))
+    
+    assert output[0].count(" --> ") == CUE_COUNT
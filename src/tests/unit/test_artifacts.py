@@ -0,0 +1,139 @@
+import asyncio
+import pytest
+from unittest.mock import patch, AsyncMock
+from src.lib.utils import artifacts
+from src.lib.utils.artifacts import (
+    get_artifact_path,
+    load_artifact,
+    save_artifact,
+    get_or_create_artifact,
+    delete_artifacts
+)
+from src.lib.utils.summarization import process_with_summary
+from src.lib.utils.diarization import get_transcript_file
+from src.lib.utils.transcript import open_transcript, write_transcript
+
+FILE_ID = "0f8b6a2e-4c1d-4e7a-9b3f-2d5c8e1a7f60"
+
+@pytest.fixture(autouse=True)
+def artifact_dir(tmp_path, monkeypatch):
+    """Point the artifact store at a temporary directory."""
+    monkeypatch.setattr(artifacts, "ARTIFACT_DIR", tmp_path / "artifacts")
+    return tmp_path / "artifacts"
+
+def test_unknown_stage():
+    with pytest.raises(ValueError):
+        get_artifact_path(FILE_ID, "unknown")
+
+def test_save_and_load_artifact():
+    assert load_artifact(FILE_ID, "summary") is None
+    save_artifact(FILE_ID, "summary", "A summary")
+    assert load_artifact(FILE_ID, "summary") == "A summary"
+    # Stages are stored per language
+    assert load_artifact(FILE_ID, "summary", "es") is None
+
+@pytest.mark.asyncio
+async def test_get_or_create_artifact_computes_once():
+    producer = AsyncMock(return_value={"text": "Hello"})
+    results = await asyncio.gather(*[
+        get_or_create_artifact(FILE_ID, "transcript", producer) for _ in range(5)
+    ])
+    assert all(result == {"text": "Hello"} for result in results)
+    assert producer.await_count == 1
+
+@pytest.mark.parametrize("file_id", ["", ".", "..", "../secret", "a/b", FILE_ID.replace("-", "")])
+def test_invalid_file_ids_are_rejected(artifact_dir, file_id):
+    save_artifact(FILE_ID, "transcript", {"text": "Hello"})
+    
+    with pytest.raises(ValueError):
+        load_artifact(file_id, "transcript")
+    with pytest.raises(ValueError):
+        delete_artifacts(file_id)
+    assert load_artifact(FILE_ID, "transcript") == {"text": "Hello"}
+
+def test_invalid_language_is_rejected():
+    with pytest.raises(ValueError):
+        get_artifact_path(FILE_ID, "transcript", "../../secret")
+
+def test_delete_artifacts(artifact_dir):
+    save_artifact(FILE_ID, "transcript", {"text": "Hello"})
+    assert delete_artifacts(FILE_ID)
+    assert not (artifact_dir / FILE_ID).exists()
+    assert not delete_artifacts(FILE_ID)
+
+@pytest.mark.asyncio
+async def test_export_after_summarize_reuses_stages():
+    transcription = {
+        "text": "Hello. Hi there.",
+        "segments": [
+            {"text": "Hello.", "start": 0.0, "end": 1.0},
+            {"text": "Hi there.", "start": 1.0, "end": 2.0}
+        ],
+        "language": "en"
+    }
+    speakers = [
+        {"speaker_id": "Speaker 1", "text": "Hello.", "start": 0.0, "end": 1.0},
+        {"speaker_id": "Speaker 2", "text": "Hi there.", "start": 1.0, "end": 2.0}
+    ]
+    
+    with patch("src.lib.utils.transcription.transcribe_audio", AsyncMock(return_value=transcription)) as mock_transcribe, \
+         patch("src.lib.utils.diarization.identify_speakers", AsyncMock(return_value=speakers)) as mock_speakers, \
+         patch("src.lib.utils.summarization.generate_summary", AsyncMock(return_value={
+             "summary": "A greeting",
+             "key_points": "1. Hello"
+         })) as mock_summary:
+        
+        first = await process_with_summary(FILE_ID, "en")
+        second = await process_with_summary(FILE_ID, "en")
+        
+        assert first == second
+        assert first["summary"] == "A greeting"
+        assert first["key_points"] == "1. Hello"
+        assert first["segments"] == transcription["segments"]
+        assert mock_transcribe.await_count == 1
+        assert mock_speakers.await_count == 1
+        assert mock_summary.await_count == 1
+
+@pytest.mark.asyncio
+async def test_transcript_file_is_written_once(artifact_dir):
+    transcription = {
+        "text": "Hello. Hi there.",
+        "segments": [
+            {"text": "Hello.", "start": 0.0, "end": 1.0},
+            {"text": "Hi there.", "start": 1.0, "end": 2.0}
+        ],
+        "language": "en"
+    }
+    
+    speakers = [
+        {"speaker_id": "Speaker 1", "text": "Hello.", "start": 0.0, "end": 1.0},
+        {"speaker_id": "Speaker 2", "text": "Hi there.", "start": 1.0, "end": 2.0}
+    ]
+    
+    with patch("src.lib.utils.transcription.transcribe_audio", AsyncMock(return_value=transcription)) as mock_transcribe, \
+         patch("src.lib.utils.diarization.identify_speakers", AsyncMock(return_value=speakers)):
+        path = await get_transcript_file(FILE_ID, "en")
+        assert path == artifact_dir / FILE_ID / "transcript.en.bin"
+        assert await get_transcript_file(FILE_ID, "en") == path
+        assert mock_transcribe.await_count == 1
+    
+    # Segments are stored with their speakers
+    with open_transcript(path) as transcript:
+        clip = transcript.slice_time(1.5, 2.0)
+        assert clip.to_segments() == [{**transcription["segments"][1], "speaker_id": "Speaker 2"}]
+
+@pytest.mark.asyncio
+async def test_concurrent_transcript_files_are_written_once(artifact_dir):
+    transcription = {"text": "Hello.", "segments": [{"text": "Hello.", "start": 0.0, "end": 1.0}], "language": "en"}
+    
+    with patch("src.lib.utils.transcription.transcribe_audio", AsyncMock(return_value=transcription)), \
+         patch("src.lib.utils.diarization.identify_speakers", AsyncMock(return_value=[])), \
+         patch("src.lib.utils.diarization.write_transcript", wraps=write_transcript) as mock_write:
+        paths = await asyncio.gather(*[get_transcript_file(FILE_ID) for _ in range(5)])
+    
+    assert len(set(paths)) == 1
+    assert mock_write.call_count == 1
+    # Only the pipeline artifacts are left, no temporary files
+    assert sorted(path.name for path in (artifact_dir / FILE_ID).iterdir()) == [
+        "speakers.auto.json", "transcript.auto.bin", "transcript.auto.json"
+    ]
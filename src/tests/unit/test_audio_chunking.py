@@ -0,0 +1,115 @@
+import wave
+import asyncio
+import pytest
+from unittest.mock import patch
+from pydub import AudioSegment
+from pydub.generators import Sine
+from src.lib.utils import transcription, fileHandling
+from src.lib.utils.transcription import (
+    chunk_audio,
+    merge_chunk_transcriptions,
+    transcribe_audio
+)
+
+@pytest.fixture(autouse=True)
+def temp_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(transcription, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(fileHandling, "UPLOAD_DIR", tmp_path / "uploads")
+    monkeypatch.setattr(transcription, "CHUNK_DIR", tmp_path / "chunks")
+
+@pytest.fixture
+def audio_file(tmp_path):
+    """Seven seconds of audio with a silent gap between 3s and 4s."""
+    tone = Sine(440).to_audio_segment(duration=3000, volume=-10)
+    audio = tone + AudioSegment.silent(duration=1000) + tone
+    path = tmp_path / "episode.wav"
+    audio.export(path, format="wav")
+    return path
+
+def test_chunk_audio_small_file(audio_file):
+    chunks = chunk_audio(audio_file)
+    assert chunks == [{"path": audio_file, "offset": 0.0}]
+
+def test_chunk_audio_splits_on_silence(audio_file):
+    chunks = chunk_audio(audio_file, chunk_size=0, chunk_duration=4.5, overlap=0.5)
+    
+    assert len(chunks) == 2
+    assert chunks[0]["offset"] == 0.0
+    # Cut in the silent gap rather than at the 4.5s boundary, minus the overlap
+    assert 2.5 <= chunks[1]["offset"] <= 3.5
+    
+    first = AudioSegment.from_file(chunks[0]["path"])
+    second = AudioSegment.from_file(chunks[1]["path"])
+    assert 3000 <= len(first) <= 4000
+    assert abs(chunks[1]["offset"] * 1000 + len(second) - 7000) <= 1
+
+def test_chunks_fit_the_size_limit(audio_file):
+    limit = 2 * 16000 * 2 + 1024  # Two seconds of 16kHz 16-bit mono
+    
+    chunks = chunk_audio(audio_file, chunk_size=limit, overlap=0.0)
+    
+    assert len(chunks) >= 4
+    assert all(chunk["path"].stat().st_size <= limit for chunk in chunks)
+    with wave.open(str(chunks[0]["path"]), "rb") as wav:
+        assert (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) == (16000, 1, 2)
+
+def test_merge_chunk_transcriptions_offsets_and_overlap():
+    chunks = [{"offset": 0.0}, {"offset": 9.0}]
+    results = [
+        {
+            "text": "Hello there. How are you today?",
+            "segments": [
+                {"text": " Hello there.", "start": 0.0, "end": 4.0},
+                {"text": " How are you today?", "start": 4.0, "end": 10.0}
+            ],
+            "language": "en"
+        },
+        {
+            "text": "today? I am fine. Thanks.",
+            "segments": [
+                {"text": " today?", "start": 0.0, "end": 0.8},
+                {"text": " you today? I am fine.", "start": 0.5, "end": 3.0},
+                {"text": " Thanks.", "start": 3.0, "end": 4.0}
+            ],
+            "language": "en"
+        }
+    ]
+    
+    merged = merge_chunk_transcriptions(chunks, results)
+    
+    assert [segment["text"] for segment in merged["segments"]] == [
+        " Hello there.", " How are you today?", " I am fine.", " Thanks."
+    ]
+    assert merged["segments"][2]["start"] == 10.0
+    assert merged["segments"][3]["start"] == 12.0
+    assert [segment["id"] for segment in merged["segments"]] == [0, 1, 2, 3]
+    assert merged["text"] == "Hello there. How are you today? I am fine. Thanks."
+    assert merged["language"] == "en"
+
+@pytest.mark.asyncio
+async def test_transcribe_audio_bounds_chunk_concurrency(audio_file, tmp_path, monkeypatch):
+    monkeypatch.setattr(transcription, "MAX_CONCURRENT_CHUNKS", 2)
+    chunk_dir = tmp_path / "chunks" / "episode"
+    chunk_dir.mkdir(parents=True)
+    chunks = [{"path": chunk_dir / f"{i}.wav", "offset": i * 10.0} for i in range(6)]
+    
+    active = 0
+    peak = 0
+    
+    async def fake_transcribe(path, language=None):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return {"text": path.stem, "segments": [{"text": f" {path.stem}", "start": 0.0, "end": 5.0}], "language": "en"}
+    
+    with patch.object(transcription, "get_file_path", return_value=audio_file), \
+         patch.object(transcription, "chunk_audio", return_value=chunks), \
+         patch.object(transcription, "_transcribe_file", fake_transcribe):
+        result = await transcribe_audio("test_file_id")
+    
+    assert peak == 2
+    assert [segment["start"] for segment in result["segments"]] == [0.0, 10.0, 20.0, 30.0, 40.0, 50.0]
+    # Chunk files are removed once transcribed
+    assert not chunk_dir.exists()
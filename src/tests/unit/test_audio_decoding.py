@@ -0,0 +1,104 @@
+import io
+import math
+import wave
+import struct
+import pytest
+from fastapi import UploadFile
+from src.lib.utils import audioDecoding, fileHandling
+from src.lib.utils.audioDecoding import AudioDecodeError, iter_pcm_frames, probe_audio
+from src.lib.utils.fileHandling import process_file, store_upload_file
+
+@pytest.fixture(autouse=True)
+def without_ffmpeg(tmp_path, monkeypatch):
+    """Decode with the standard library so results don't depend on the ffmpeg build."""
+    monkeypatch.setattr(audioDecoding, "FFMPEG_BINARY", "missing-ffmpeg")
+    monkeypatch.setattr(audioDecoding, "FFPROBE_BINARY", "missing-ffprobe")
+    monkeypatch.setattr(fileHandling, "UPLOAD_DIR", tmp_path / "uploads")
+
+def write_tone(path, seconds, sample_rate, channels):
+    """Write a 16-bit PCM WAV file with a 440Hz tone on every channel."""
+    frames = bytearray()
+    for i in range(int(seconds * sample_rate)):
+        sample = int(8000 * math.sin(2 * math.pi * 440 * i / sample_rate))
+        frames += struct.pack("<h", sample) * channels
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(bytes(frames))
+    return path
+
+def test_probe_audio(tmp_path):
+    path = write_tone(tmp_path / "episode.wav", 2.5, 44100, 2)
+
+    assert probe_audio(path) == {"duration": 2.5, "sample_rate": 44100, "channels": 2, "format": "wav"}
+
+    invalid = tmp_path / "episode.mp3"
+    invalid.write_bytes(b"mock audio content")
+    with pytest.raises(AudioDecodeError):
+        probe_audio(invalid)
+
+def test_iter_pcm_frames_resamples_to_mono_16khz(tmp_path):
+    path = write_tone(tmp_path / "episode.wav", 2.5, 44100, 2)
+
+    frames = list(iter_pcm_frames(path, frame_samples=4000))
+
+    # Fixed size frames of 16-bit samples, the last one holds the remainder
+    assert all(len(frame) == 8000 for frame in frames[:-1])
+    assert 0 < len(frames[-1]) <= 8000
+    assert abs(sum(len(frame) for frame in frames) // 2 - 40000) <= 1
+    samples = struct.unpack(f"<{len(frames[0]) // 2}h", frames[0])
+    assert max(samples) > 7000
+
+def test_iter_pcm_frames_passes_through_16khz_mono(tmp_path):
+    path = write_tone(tmp_path / "episode.wav", 1.0, 16000, 1)
+    with wave.open(str(path), "rb") as wav:
+        expected = wav.readframes(wav.getnframes())
+
+    frames = list(iter_pcm_frames(path, frame_samples=3000))
+
+    assert b"".join(frames) == expected
+    assert [len(frame) for frame in frames] == [6000] * 5 + [2000]
+
+def test_iter_pcm_frames_reads_ffmpeg_output_in_frames(tmp_path, monkeypatch):
+    ffmpeg = tmp_path / "ffmpeg"
+    ffmpeg.write_text("#!/bin/sh\nhead -c 10000 /dev/zero\n")
+    ffmpeg.chmod(0o755)
+    monkeypatch.setattr(audioDecoding, "FFMPEG_BINARY", str(ffmpeg))
+    path = tmp_path / "episode.mp3"
+    path.write_bytes(b"mock audio content")
+
+    assert [len(frame) for frame in iter_pcm_frames(path, frame_samples=2000)] == [4000, 4000, 2000]
+
+def test_iter_pcm_frames_needs_ffmpeg_for_other_formats(tmp_path):
+    path = tmp_path / "episode.mp3"
+    path.write_bytes(b"mock audio content")
+
+    with pytest.raises(AudioDecodeError, match="missing-ffmpeg"):
+        next(iter_pcm_frames(path))
+
+@pytest.mark.asyncio
+async def test_process_file_reports_audio_metadata(tmp_path):
+    path = write_tone(tmp_path / "episode.wav", 1.5, 22050, 1)
+
+    processed = await process_file(path)
+
+    assert processed["metadata"] == {"duration": 1.5, "sample_rate": 22050, "channels": 1, "format": "wav"}
+
+@pytest.mark.asyncio
+async def test_upload_indexes_duration(tmp_path):
+    content = write_tone(tmp_path / "episode.wav", 0.5, 16000, 1).read_bytes()
+
+    saved = await store_upload_file(UploadFile(filename="episode.wav", file=io.BytesIO(content)))
+
+    assert fileHandling.get_file_metadata(saved["file_id"])["duration"] == 0.5
+
+def test_iter_pcm_frames_decodes_a_clip(tmp_path):
+    path = write_tone(tmp_path / "episode.wav", 3.0, 16000, 1)
+    with wave.open(str(path), "rb") as wav:
+        expected = wav.readframes(wav.getnframes())
+
+    clip = b"".join(iter_pcm_frames(path, start=1.0, duration=1.5))
+
+    assert clip == expected[32000:80000]
+    assert b"".join(iter_pcm_frames(path, start=2.5)) == expected[80000:]
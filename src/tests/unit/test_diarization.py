@@ -0,0 +1,174 @@
+import re
+import json
+import pytest
+from src.lib.utils import diarization
+from src.lib.utils.diarization import (
+    identify_speakers,
+    parse_speaker_mapping,
+    fill_missing_speakers,
+    get_window_budget,
+    get_windows,
+    reconcile_windows
+)
+
+TRANSCRIPTION = {
+    "text": " Hello there. Hi!",
+    "segments": [
+        {"text": " Hello there.", "start": 0.0, "end": 1.5},
+        {"text": " Hi!", "start": 1.5, "end": 2.0}
+    ],
+    "language": "en"
+}
+
+@pytest.mark.asyncio
+async def test_segments_are_sent_once_compactly(stub_model_server):
+    stub_model_server.respond = lambda request: '{"0": "Speaker 1", "1": "Speaker 2"}'
+    
+    speakers = await identify_speakers(TRANSCRIPTION)
+    
+    prompt = stub_model_server.requests[0]["messages"][-1]["content"]
+    assert "[0 0.0-1.5] Hello there." in prompt
+    assert "[1 1.5-2.0] Hi!" in prompt
+    assert prompt.count("Hello there.") == 1
+    assert "'start'" not in prompt
+    assert speakers == [
+        {"speaker_id": "Speaker 1", "text": " Hello there.", "start": 0.0, "end": 1.5},
+        {"speaker_id": "Speaker 2", "text": " Hi!", "start": 1.5, "end": 2.0}
+    ]
+
+@pytest.mark.parametrize("content", [
+    '```json\n{"0": "Speaker 1", "1": "Speaker 2"}\n```',
+    '[{"segment": 0, "speaker": "Speaker 1"}, {"segment": 1, "speaker": "Speaker 2"}]',
+    "Segment 0: Speaker 1\n[1] -> Speaker 2",
+    '{"0": "Speaker 1", "1": "Speaker 2", "2": "Spea'
+])
+def test_parse_speaker_mapping(content):
+    assert parse_speaker_mapping(content) == {0: "Speaker 1", 1: "Speaker 2"}
+
+def test_parse_speaker_mapping_without_labels():
+    assert parse_speaker_mapping("I cannot tell the speakers apart.") == {}
+    assert parse_speaker_mapping("[0 0.0-1.5] Hello there.") == {}
+
+def test_fill_missing_speakers():
+    assert fill_missing_speakers([None, "A", None, "B", None]) == ["A", "A", "A", "B", "B"]
+    assert fill_missing_speakers([None, None]) == [None, None]
+
+def test_get_windows():
+    assert get_windows(10, 4, 2) == [range(0, 4), range(2, 6), range(4, 8), range(6, 10)]
+    assert get_windows(3, 4, 2) == [range(0, 3)]
+    # Windows share at most half their segments
+    assert get_windows(5, 4, 4) == [range(0, 4), range(2, 5)]
+
+def test_get_windows_within_token_budget():
+    tokens = [10, 10, 50, 10, 10, 10, 100, 10]
+    assert get_windows(8, 6, 2, tokens, 60) == [
+        range(0, 2), range(1, 3), range(2, 4), range(3, 6), range(5, 6), range(6, 7), range(7, 8)
+    ]
+    # Without a budget problem windows are sized by segments only
+    assert get_windows(8, 4, 2, tokens, 1000) == get_windows(8, 4, 2)
+
+def test_reconcile_windows():
+    windows = [range(0, 4), range(2, 6), range(4, 8)]
+    window_labels = [
+        ["Speaker 1", "Speaker 1", "Speaker 2", "Speaker 2"],
+        # Labels are swapped in this window
+        ["Speaker 1", "Speaker 1", "Speaker 2", "Speaker 3"],
+        # A speaker missing from the overlap keeps their name
+        ["Speaker 1", "Speaker 2", "Speaker 1", "Speaker 2"]
+    ]
+    
+    assert reconcile_windows(windows, window_labels, 8) == [
+        "Speaker 1", "Speaker 1", "Speaker 2", "Speaker 2",
+        "Speaker 1", "Speaker 3", "Speaker 1", "Speaker 3"
+    ]
+
+@pytest.mark.asyncio
+async def test_long_transcript_is_labelled_in_windows(stub_model_server, monkeypatch):
+    monkeypatch.setattr(diarization, "DIARIZATION_WINDOW_SEGMENTS", 6)
+    monkeypatch.setattr(diarization, "DIARIZATION_WINDOW_OVERLAP", 3)
+    monkeypatch.setattr(diarization, "DIARIZATION_CONCURRENCY", 2)
+    stub_model_server.delay = 0.05
+    
+    # Host and guest alternate every 3 segments
+    truth = ["Host" if (i // 3) % 2 == 0 else "Guest" for i in range(30)]
+    
+    def respond(request):
+        # Like a model, name speakers in order of appearance within the window
+        indexes = [int(index) for index in re.findall(r"^\s*\[(\d+) ", request["messages"][-1]["content"], re.MULTILINE)]
+        names = {}
+        for index in indexes:
+            names.setdefault(truth[index], f"Speaker {len(names) + 1}")
+        return json.dumps({str(index): names[truth[index]] for index in indexes})
+    
+    stub_model_server.respond = respond
+    transcription = {
+        "text": "",
+        "segments": [{"text": f" Line {i}.", "start": float(i), "end": float(i + 1)} for i in range(30)],
+        "language": "en"
+    }
+    
+    speakers = await identify_speakers(transcription)
+    
+    assert len(stub_model_server.requests) == 9
+    assert stub_model_server.max_active == 2
+    assert [turn["speaker_id"] for turn in speakers] == ["Speaker 1", "Speaker 2"] * 5
+    assert speakers[1] == {"speaker_id": "Speaker 2", "text": " Line 3. Line 4. Line 5.", "start": 3.0, "end": 6.0}
+
+@pytest.mark.asyncio
+async def test_unparseable_reply_fails(stub_model_server):
+    stub_model_server.respond = lambda request: "I cannot tell the speakers apart."
+    
+    with pytest.raises(Exception) as exc_info:
+        await identify_speakers(TRANSCRIPTION)
+    assert "Speaker identification failed" in str(exc_info.value)
+
+@pytest.mark.asyncio
+async def test_windows_fit_the_prompt_budget(stub_model_server, monkeypatch):
+    monkeypatch.setattr(diarization, "DIARIZATION_WINDOW_OVERLAP", 1)
+    stub_model_server.respond = lambda request: json.dumps({
+        index: "Speaker 1"
+        for index in re.findall(r"^\s*\[(\d+) ", request["messages"][-1]["content"], re.MULTILINE)
+    })
+    # Each segment takes about a third of the budget
+    words = " word" * ((get_window_budget(8) // 3) * 4 // 5)
+    transcription = {
+        "text": "",
+        "segments": [{"text": words, "start": float(i), "end": float(i + 1)} for i in range(8)],
+        "language": "en"
+    }
+    
+    speakers = await identify_speakers(transcription)
+    
+    assert len(stub_model_server.requests) > 1
+    assert [turn["speaker_id"] for turn in speakers] == ["Speaker 1"]
+    assert speakers[0]["end"] == 8.0
+
+@pytest.mark.asyncio
+async def test_failed_window_is_retried_then_filled(stub_model_server, monkeypatch):
+    monkeypatch.setattr(diarization, "DIARIZATION_WINDOW_SEGMENTS", 4)
+    monkeypatch.setattr(diarization, "DIARIZATION_WINDOW_OVERLAP", 1)
+    
+    def respond(request):
+        indexes = re.findall(r"^\s*\[(\d+) ", request["messages"][-1]["content"], re.MULTILINE)
+        # The window starting at segment 3 never gets a usable reply
+        if indexes[0] == "3":
+            return "I cannot tell the speakers apart."
+        return json.dumps({index: "Speaker 1" for index in indexes})
+    
+    stub_model_server.respond = respond
+    transcription = {
+        "text": "",
+        "segments": [{"text": f" Line {i}.", "start": float(i), "end": float(i + 1)} for i in range(10)],
+        "language": "en"
+    }
+    
+    speakers = await identify_speakers(transcription)
+    
+    # Windows 0-3, 3-6 (twice) and 6-9
+    assert len(stub_model_server.requests) == 4
+    assert speakers == [{
+        "speaker_id": "Speaker 1",
+        "text": " Line 0. Line 1. Line 2. Line 3. Line 4. Line 5. Line 6. Line 7. Line 8. Line 9.",
+        "start": 0.0,
+        "end": 10.0
+    }]
@@ -0,0 +1,201 @@
+import io
+import time
+import asyncio
+import hashlib
+import pytest
+from fastapi import UploadFile, HTTPException
+from src.lib.utils import fileHandling
+from src.lib.utils.fileHandling import store_upload_file, save_upload_file, get_file_path
+
+class CountingFile(io.BytesIO):
+    """File object that records how many bytes were read from it."""
+    bytes_read = 0
+    
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(fileHandling, "UPLOAD_DIR", tmp_path / "uploads")
+    monkeypatch.setattr(fileHandling, "UPLOAD_CHUNK_SIZE", 1024)
+    return tmp_path / "uploads"
+
+@pytest.mark.asyncio
+async def test_store_upload_file(upload_dir):
+    content = b"test content" * 500
+    saved = await store_upload_file(UploadFile(filename="test.mp3", file=io.BytesIO(content)))
+    
+    assert saved["size"] == len(content)
+    assert saved["sha256"] == hashlib.sha256(content).hexdigest()
+    assert get_file_path(saved["file_id"]) == saved["path"]
+    assert saved["path"].read_bytes() == content
+    # No temporary files left behind
+    assert list(upload_dir.glob("*.part")) == []
+
+@pytest.mark.asyncio
+async def test_save_upload_file_returns_file_id():
+    file_id = await save_upload_file(UploadFile(filename="test.wav", file=io.BytesIO(b"test content")))
+    assert get_file_path(file_id).read_bytes() == b"test content"
+
+@pytest.mark.asyncio
+async def test_store_upload_file_too_large(upload_dir, monkeypatch):
+    monkeypatch.setattr(fileHandling, "MAX_FILE_SIZE", 4096)
+    file = CountingFile(b"x" * 100 * 1024)
+    
+    with pytest.raises(HTTPException) as exc_info:
+        await store_upload_file(UploadFile(filename="test.mp3", file=file))
+    
+    assert exc_info.value.status_code == 400
+    assert "File too large" in exc_info.value.detail
+    # Aborted at most one chunk past the limit
+    assert file.bytes_read <= 4096 + 1024
+    assert list(upload_dir.iterdir()) == []
+
+@pytest.mark.asyncio
+async def test_store_upload_file_deduplicates_content(upload_dir):
+    content = b"same episode"
+    first = await store_upload_file(UploadFile(filename="episode.mp3", file=io.BytesIO(content)))
+    second = await store_upload_file(UploadFile(filename="copy.mp3", file=io.BytesIO(content)))
+    other = await store_upload_file(UploadFile(filename="other.mp3", file=io.BytesIO(b"other episode")))
+    
+    assert not first["duplicate"]
+    assert second["duplicate"]
+    assert second["file_id"] == first["file_id"]
+    assert second["path"] == first["path"]
+    assert other["file_id"] != first["file_id"]
+    assert len(list(upload_dir.rglob("*.mp3"))) == 2
+    assert list(upload_dir.glob("*.part")) == []
+
+@pytest.mark.asyncio
+async def test_concurrent_uploads_of_same_content_are_stored_once(upload_dir, monkeypatch):
+    def slow_probe(path):
+        # Widen the window between hashing and indexing
+        time.sleep(0.1)
+        return None
+    
+    monkeypatch.setattr(fileHandling, "get_audio_duration", slow_probe)
+    content = b"same episode"
+    
+    results = await asyncio.gather(*[
+        store_upload_file(UploadFile(filename=f"{i}.mp3", file=io.BytesIO(content))) for i in range(4)
+    ])
+    
+    assert len({result["file_id"] for result in results}) == 1
+    assert sorted(result["duplicate"] for result in results) == [False, True, True, True]
+    assert len(list(upload_dir.rglob("*.mp3"))) == 1
+    assert fileHandling.get_file_index().get(results[0]["file_id"])["refs"] == 4
+
+@pytest.mark.asyncio
+async def test_shared_file_is_deleted_with_last_upload(upload_dir):
+    content = b"same episode"
+    first = await store_upload_file(UploadFile(filename="episode.mp3", file=io.BytesIO(content)))
+    second = await store_upload_file(UploadFile(filename="copy.mp3", file=io.BytesIO(content)))
+    
+    assert not fileHandling.delete_file(first["file_id"])
+    assert get_file_path(second["file_id"]).read_bytes() == content
+    
+    assert fileHandling.delete_file(second["file_id"])
+    assert not first["path"].exists()
+    assert fileHandling.get_file_metadata(first["file_id"]) is None
+
+@pytest.mark.parametrize("file_id", ["nonexistent", "0f8b6a2e-4c1d-4e7a-9b3f-2d5c8e1a7f60", "../etc"])
+def test_delete_unknown_file(upload_dir, file_id):
+    assert fileHandling.delete_file(file_id) is False
+
+@pytest.mark.asyncio
+async def test_deleted_file_is_stored_again(upload_dir):
+    content = b"same episode"
+    first = await store_upload_file(UploadFile(filename="episode.mp3", file=io.BytesIO(content)))
+    assert fileHandling.delete_file(first["file_id"])
+    
+    second = await store_upload_file(UploadFile(filename="episode.mp3", file=io.BytesIO(content)))
+    assert not second["duplicate"]
+    assert second["file_id"] != first["file_id"]
+    assert second["path"].read_bytes() == content
+
+@pytest.mark.asyncio
+async def test_store_upload_file_records_metadata():
+    content = b"test content"
+    saved = await store_upload_file(UploadFile(filename="test.mp3", file=io.BytesIO(content)))
+    
+    metadata = fileHandling.get_file_metadata(saved["file_id"])
+    file_id = saved["file_id"]
+    assert metadata["path"] == f"{file_id[:2]}/{file_id[2:4]}/{file_id}.mp3"
+    assert metadata["extension"] == "mp3"
+    assert metadata["size"] == len(content)
+    assert metadata["hash"] == hashlib.sha256(content).hexdigest()
+    assert metadata["duration"] is None
+    assert metadata["created_at"] > 0
+
+@pytest.mark.asyncio
+async def test_get_file_path_uses_index(monkeypatch):
+    saved = await store_upload_file(UploadFile(filename="test.mp3", file=io.BytesIO(b"test content")))
+    
+    def fail_exists(self):
+        raise AssertionError("get_file_path probed the filesystem")
+    
+    monkeypatch.setattr(fileHandling.Path, "exists", fail_exists)
+    assert get_file_path(saved["file_id"]) == saved["path"]
+
+def test_get_file_path_unindexed_file(upload_dir):
+    upload_dir.mkdir(parents=True)
+    (upload_dir / "legacy.wav").write_bytes(b"legacy")
+    assert get_file_path("legacy") == upload_dir / "legacy.wav"
+    assert get_file_path("missing") is None
+    assert fileHandling.get_file_metadata("missing") is None
+    # Lookups don't create an index
+    assert not (upload_dir / fileHandling.INDEX_FILENAME).exists()
+
+@pytest.mark.asyncio
+async def test_rebuild_index(upload_dir):
+    saved = await store_upload_file(UploadFile(filename="test.mp3", file=io.BytesIO(b"test content")))
+    (upload_dir / "legacy.wav").write_bytes(b"legacy")
+    fileHandling.get_file_index().clear()
+    
+    assert fileHandling.main(["rebuild-index"]) == 0
+    
+    assert fileHandling.get_file_metadata(saved["file_id"])["hash"] == saved["sha256"]
+    legacy = fileHandling.get_file_metadata("legacy")
+    assert legacy["path"] == "legacy.wav"
+    assert legacy["hash"] == hashlib.sha256(b"legacy").hexdigest()
+    assert len(fileHandling.get_file_index()) == 2
+
+@pytest.mark.asyncio
+async def test_store_upload_file_sharded_layout(upload_dir):
+    saved = await store_upload_file(UploadFile(filename="test.mp3", file=io.BytesIO(b"test content")))
+    file_id = saved["file_id"]
+    assert saved["path"] == upload_dir / file_id[:2] / file_id[2:4] / f"{file_id}.mp3"
+    assert saved["path"].exists()
+
+def test_get_file_path_unindexed_sharded_file(upload_dir):
+    shard_dir = upload_dir / "ab" / "cd"
+    shard_dir.mkdir(parents=True)
+    (shard_dir / "abcdef.mp3").write_bytes(b"sharded")
+    assert get_file_path("abcdef") == shard_dir / "abcdef.mp3"
+
+@pytest.mark.asyncio
+async def test_migrate_flat_uploads(upload_dir):
+    upload_dir.mkdir(parents=True)
+    flat_ids = [f"{i:02d}legacy" for i in range(5)]
+    for file_id in flat_ids:
+        (upload_dir / f"{file_id}.mp3").write_bytes(file_id.encode())
+    
+    # Indexed flat file from before the layout change
+    fileHandling.get_file_index().add(
+        flat_ids[0], path=f"{flat_ids[0]}.mp3", extension="mp3", size=8, file_hash="hash"
+    )
+    
+    assert fileHandling.main(["migrate-layout", "--batch-size", "2"]) == 0
+    
+    assert list(upload_dir.glob("*.mp3")) == []
+    for file_id in flat_ids:
+        path = get_file_path(file_id)
+        assert path == upload_dir / file_id[:2] / file_id[2:4] / f"{file_id}.mp3"
+        assert path.read_bytes() == file_id.encode()
+    assert fileHandling.get_file_metadata(flat_ids[0])["hash"] == "hash"
+    assert fileHandling.get_file_metadata(flat_ids[1])["hash"] == hashlib.sha256(flat_ids[1].encode()).hexdigest()
+    
+    # Nothing left to move
+    assert fileHandling.migrate_flat_uploads() == 0
@@ -0,0 +1,103 @@
+import asyncio
+import pytest
+from src.lib.utils.jobs import (
+    JobQueue,
+    SQLiteJobBackend,
+    JobError,
+    job_handler
+)
+
+@job_handler("test_echo")
+async def echo_job(payload, progress):
+    progress(0.5)
+    await asyncio.sleep(0.01)
+    return {"echo": payload["value"]}
+
+@job_handler("test_fail")
+async def failing_job(payload, progress):
+    raise Exception("Handler error")
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SQLiteJobBackend(tmp_path / "jobs.db")
+    yield backend
+    backend.close()
+
+async def wait_for(queue, job_id, timeout=2.0):
+    for _ in range(int(timeout / 0.01)):
+        job = await queue.get_job(job_id)
+        if job["status"] in ("completed", "failed"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+@pytest.mark.asyncio
+async def test_job_completes_with_result(backend):
+    queue = JobQueue(backend, num_workers=2)
+    await queue.start()
+    try:
+        job_id = await queue.submit("test_echo", {"value": 42})
+        assert (await queue.get_job(job_id))["status"] in ("queued", "running")
+        
+        job = await wait_for(queue, job_id)
+        assert job["status"] == "completed"
+        assert job["progress"] == 1.0
+        assert job["result"] == {"echo": 42}
+        assert job["error"] is None
+    finally:
+        await queue.stop()
+
+@pytest.mark.asyncio
+async def test_job_failure_is_recorded(backend):
+    queue = JobQueue(backend, num_workers=1)
+    await queue.start()
+    try:
+        job = await wait_for(queue, await queue.submit("test_fail", {}))
+        assert job["status"] == "failed"
+        assert job["error"] == "Handler error"
+    finally:
+        await queue.stop()
+
+@pytest.mark.asyncio
+async def test_submit_unknown_kind(backend):
+    with pytest.raises(JobError):
+        await JobQueue(backend).submit("unknown", {})
+
+@pytest.mark.asyncio
+async def test_jobs_persist_across_restarts(tmp_path):
+    path = tmp_path / "jobs.db"
+    
+    # Submitted while no workers are running
+    backend = SQLiteJobBackend(path)
+    job_id = await JobQueue(backend).submit("test_echo", {"value": "later"})
+    backend.close()
+    
+    backend = SQLiteJobBackend(path)
+    queue = JobQueue(backend, num_workers=1)
+    await queue.start()
+    try:
+        job = await wait_for(queue, job_id)
+        assert job["result"] == {"echo": "later"}
+    finally:
+        await queue.stop()
+        backend.close()
+
+@job_handler("test_progress")
+async def progress_job(payload, progress):
+    for step in range(1, 6):
+        progress(step / 10)
+        await asyncio.sleep(0)
+    return {}
+
+@pytest.mark.asyncio
+async def test_progress_is_written_before_completion(backend):
+    queue = JobQueue(backend, num_workers=1)
+    await queue.start()
+    try:
+        job = await wait_for(queue, await queue.submit("test_progress", {}))
+        assert job["status"] == "completed"
+        # A late progress write never overwrites the final progress
+        await asyncio.sleep(0.05)
+        assert (await queue.get_job(job["id"]))["progress"] == 1.0
+    finally:
+        await queue.stop()
@@ -0,0 +1,36 @@
+import asyncio
+import pytest
+from src.lib.utils import openaiClient
+from src.lib.utils.openaiClient import get_client, limit, close_client
+
+@pytest.mark.asyncio
+async def test_get_client_is_shared():
+    client = get_client()
+    assert get_client() is client
+    
+    await close_client()
+    assert get_client() is not client
+    await close_client()
+
+@pytest.mark.asyncio
+async def test_limit_bounds_concurrent_requests(monkeypatch):
+    monkeypatch.setitem(openaiClient.ENDPOINT_LIMITS, "chat", 3)
+    active = 0
+    peak = 0
+    
+    async def request():
+        nonlocal active, peak
+        async with limit("chat"):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+    
+    await asyncio.gather(*[request() for _ in range(10)])
+    assert peak == 3
+
+@pytest.mark.asyncio
+async def test_limit_unknown_endpoint():
+    with pytest.raises(ValueError):
+        async with limit("images"):
+            pass
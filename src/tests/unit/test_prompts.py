@@ -0,0 +1,89 @@
+import pytest
+from src.lib.utils import prompts
+from src.lib.utils.prompts import (
+    PromptBudgetError,
+    build_messages,
+    count_tokens,
+    get_context_tokens,
+    get_prompt_budget,
+    render_segments,
+    split_text
+)
+from src.lib.utils.transcript import Transcript
+
+SEGMENTS = [
+    {"text": " Hello there.", "start": 0.0, "end": 1.25, "speaker_id": "Speaker 1"},
+    {"text": " Hi!", "start": 1.25, "end": 2.0}
+]
+
+def test_render_segments():
+    assert render_segments(SEGMENTS) == "[0 0.0-1.2] Speaker 1: Hello there.\n[1 1.2-2.0] Hi!"
+    assert render_segments(Transcript.from_segments(SEGMENTS), with_speakers=False, first_index=10) == (
+        "[10 0.0-1.2] Hello there.\n[11 1.2-2.0] Hi!"
+    )
+    assert render_segments(SEGMENTS, with_times=False) == "Speaker 1: Hello there.\nHi!"
+    assert render_segments([]) == ""
+
+def test_rendered_segments_are_smaller_than_repr():
+    segments = [
+        {"id": i, "text": f" This is sentence number {i}.", "start": i * 2.0, "end": i * 2.0 + 2.0}
+        for i in range(100)
+    ]
+    text = "".join(segment["text"] for segment in segments)
+    
+    assert count_tokens(render_segments(segments)) * 2 < count_tokens(f"{text}\n{segments}")
+
+def test_model_budgets(monkeypatch):
+    monkeypatch.setattr(prompts, "RESPONSE_TOKENS", 1000)
+    
+    assert get_context_tokens("gpt-4") == 8192
+    assert get_context_tokens("gpt-4-0613") == 8192
+    assert get_context_tokens("gpt-4-32k-0613") == 32768
+    assert get_context_tokens("gpt-4o-2024-05-13") == 128000
+    assert get_context_tokens("unknown-model") == prompts.DEFAULT_CONTEXT_TOKENS
+    assert get_prompt_budget("gpt-4") == 7192
+    assert get_prompt_budget("gpt-4", response_tokens=0) == 8192
+
+def test_build_messages_enforces_budget():
+    messages = build_messages("System", "Prompt", "gpt-4")
+    assert messages == [
+        {"role": "system", "content": "System"},
+        {"role": "user", "content": "Prompt"}
+    ]
+    
+    with pytest.raises(PromptBudgetError):
+        build_messages("System", "word " * 10000, "gpt-4")
+    # The same prompt fits a model with a larger context window
+    assert len(build_messages("System", "word " * 10000, "gpt-4-turbo")) == 2
+
+def test_split_text_respects_budget():
+    lines = [f"Speaker {i % 2 + 1}: This is sentence number {i} of the conversation." for i in range(200)]
+    text = "\n".join(lines)
+    
+    chunks = split_text(text, 100)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 100 for chunk in chunks)
+    assert "\n".join(chunks) == text
+    
+    # Lines longer than the budget are split on words
+    long_line = " ".join(["word"] * 1000)
+    chunks = split_text(long_line, 50)
+    assert all(count_tokens(chunk) <= 50 for chunk in chunks)
+    assert " ".join(chunks) == long_line
+
+def test_split_text_counts_each_word_once(monkeypatch):
+    counted = []
+    
+    def count(text, model=None):
+        counted.append(len(text))
+        return count_tokens(text, model)
+    
+    monkeypatch.setattr(prompts, "count_tokens", count)
+    long_line = " ".join(["word"] * 10000)
+    
+    chunks = split_text(long_line, 500)
+    
+    assert " ".join(chunks) == long_line
+    # The line once, then each word on its own
+    assert len(counted) == 10001
+    assert sum(counted) < 3 * len(long_line)
@@ -0,0 +1,132 @@
+import os
+import time
+import pytest
+from fastapi.testclient import TestClient
+from src.app.main import app
+from src.lib.utils import fileHandling
+from src.lib.utils.fileHandling import get_file_path
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(fileHandling, "UPLOAD_DIR", tmp_path / "uploads")
+    return tmp_path / "uploads"
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+def test_resumable_upload(client, upload_dir):
+    content = bytes(range(256)) * 40
+    response = client.post("/upload/sessions", json={"filename": "episode.mp3", "size": len(content)})
+    assert response.status_code == 201
+    session_id = response.json()["session_id"]
+    
+    response = client.put(
+        f"/upload/sessions/{session_id}",
+        content=content[:4000],
+        headers={"Content-Range": f"bytes 0-3999/{len(content)}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["offset"] == 4000
+    
+    # Resending a range that was already received is rejected
+    response = client.put(f"/upload/sessions/{session_id}?offset=0", content=content[:100])
+    assert response.status_code == 409
+    
+    # Resume from the offset the server reports
+    offset = client.get(f"/upload/sessions/{session_id}").json()["offset"]
+    assert offset == 4000
+    response = client.put(f"/upload/sessions/{session_id}?offset={offset}", content=content[offset:])
+    assert response.json()["offset"] == len(content)
+    
+    response = client.post(f"/upload/sessions/{session_id}/finalize")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "uploaded"
+    assert data["size"] == len(content)
+    assert get_file_path(data["file_id"]).read_bytes() == content
+    
+    # The session is gone once finalized
+    assert client.get(f"/upload/sessions/{session_id}").status_code == 404
+    assert list((upload_dir / ".sessions").iterdir()) == []
+
+def test_finalize_incomplete_upload(client):
+    session_id = client.post("/upload/sessions", json={"filename": "episode.mp3", "size": 10}).json()["session_id"]
+    client.put(f"/upload/sessions/{session_id}?offset=0", content=b"12345")
+    
+    response = client.post(f"/upload/sessions/{session_id}/finalize")
+    assert response.status_code == 409
+    assert "received 5 of 10 bytes" in response.json()["detail"]
+
+def test_range_past_declared_size_is_discarded(client):
+    session_id = client.post("/upload/sessions", json={"filename": "episode.mp3", "size": 10}).json()["session_id"]
+    
+    response = client.put(f"/upload/sessions/{session_id}?offset=0", content=b"x" * 20)
+    assert response.status_code == 400
+    assert client.get(f"/upload/sessions/{session_id}").json()["offset"] == 0
+
+def test_range_length_mismatch_is_discarded(client):
+    session_id = client.post("/upload/sessions", json={"filename": "episode.mp3", "size": 10}).json()["session_id"]
+    
+    response = client.put(
+        f"/upload/sessions/{session_id}",
+        content=b"12345",
+        headers={"Content-Range": "bytes 0-7/10"}
+    )
+    assert response.status_code == 400
+    assert client.get(f"/upload/sessions/{session_id}").json()["offset"] == 0
+
+def test_create_session_validation(client, monkeypatch):
+    response = client.post("/upload/sessions", json={"filename": "notes.txt", "size": 10})
+    assert response.status_code == 400
+    
+    monkeypatch.setattr(fileHandling, "MAX_FILE_SIZE", 5)
+    response = client.post("/upload/sessions", json={"filename": "episode.mp3", "size": 10})
+    assert response.status_code == 400
+    assert "File too large" in response.json()["detail"]
+
+def test_delete_session(client):
+    session_id = client.post("/upload/sessions", json={"filename": "episode.mp3", "size": 10}).json()["session_id"]
+    assert client.delete(f"/upload/sessions/{session_id}").status_code == 200
+    assert client.get(f"/upload/sessions/{session_id}").status_code == 404
+
+def test_create_session_rejects_empty_size(client):
+    for size in (0, -1):
+        response = client.post("/upload/sessions", json={"filename": "episode.mp3", "size": size})
+        assert response.status_code == 400
+
+def test_range_total_mismatch_is_rejected(client):
+    session_id = client.post("/upload/sessions", json={"filename": "episode.mp3", "size": 10}).json()["session_id"]
+    
+    response = client.put(
+        f"/upload/sessions/{session_id}",
+        content=b"12345",
+        headers={"Content-Range": "bytes 0-4/20"}
+    )
+    assert response.status_code == 400
+    assert client.get(f"/upload/sessions/{session_id}").json()["offset"] == 0
+    
+    response = client.put(
+        f"/upload/sessions/{session_id}",
+        content=b"12345",
+        headers={"Content-Range": "bytes 0-4/*"}
+    )
+    assert response.status_code == 200
+
+def test_stale_sessions_expire(client, upload_dir):
+    stale_id = client.post("/upload/sessions", json={"filename": "episode.mp3", "size": 10}).json()["session_id"]
+    client.put(f"/upload/sessions/{stale_id}?offset=0", content=b"12345")
+    stale_part = upload_dir / ".sessions" / f"{stale_id}.part"
+    orphan_part = upload_dir / ".sessions" / "orphan.part"
+    orphan_part.write_bytes(b"12345")
+    old = time.time() - fileHandling.UPLOAD_SESSION_TTL - 60
+    os.utime(stale_part, (old, old))
+    os.utime(orphan_part, (old, old))
+    
+    # Creating a session discards the ones that were idle too long
+    active_id = client.post("/upload/sessions", json={"filename": "episode.mp3", "size": 10}).json()["session_id"]
+    
+    assert client.get(f"/upload/sessions/{stale_id}").status_code == 404
+    assert client.get(f"/upload/sessions/{active_id}").status_code == 200
+    assert not stale_part.exists()
+    assert not orphan_part.exists()
@@ -1,5 +1,11 @@
 import pytest
-from src.lib.utils.summarization import generate_summary, SummaryError
+from src.lib.utils import summarization
+from src.lib.utils.summarization import (
+    generate_summary,
+    parse_summary_result,
+    SummaryError
+)
+from src.lib.utils.prompts import count_tokens
 
 @pytest.mark.asyncio
 async def test_summary_quality():
@@ -78,4 +84,117 @@ async def test_summary_quality():
     summary = await generate_summary(text)
     assert "CPU" in summary
     assert "architecture" in summary.lower()
-    assert any(term in summary for term in ["ALU", "Control Unit", "Registers", "Cache"]) 
\ No newline at end of file
+    assert any(term in summary for term in ["ALU", "Control Unit", "Registers", "Cache"]) 
+
+@pytest.mark.asyncio
+async def test_long_transcript_is_summarized_in_chunks(stub_model_server, monkeypatch):
+    monkeypatch.setattr(summarization, "SUMMARY_CHUNK_TOKENS", 200)
+    monkeypatch.setattr(summarization, "SUMMARY_CONCURRENCY", 3)
+    stub_model_server.delay = 0.05
+    
+    def respond(request):
+        prompt = request["messages"][-1]["content"]
+        if "JSON" in prompt:
+            return '{"summary": "Summary of the episode.", "key_points": ["Energy"]}'
+        if "Combine them" in prompt:
+            return f"Combined summary of {prompt.count('Part ')} parts."
+        return "Speaker 1 and Speaker 2 discussed a part of the episode."
+    
+    stub_model_server.respond = respond
+    
+    speakers = [
+        {"speaker_id": f"Speaker {i % 2 + 1}", "text": f" This is sentence number {i} of a long episode.", "start": float(i), "end": float(i + 1)}
+        for i in range(200)
+    ]
+    transcription = "".join(speaker["text"] for speaker in speakers)
+    
+    result = await generate_summary(transcription, speakers)
+    
+    prompts = [request["messages"][-1]["content"] for request in stub_model_server.requests]
+    map_prompts = [prompt for prompt in prompts if "part of a longer conversation" in prompt]
+    
+    assert len(map_prompts) > 3
+    assert result == {"summary": "Summary of the episode.", "key_points": "1. Energy"}
+    assert "Part 1:" in prompts[-1]
+    # Every speaker line is sent exactly once, no prompt goes over the budget
+    assert sum(prompt.count("sentence number") for prompt in map_prompts) == 200
+    assert all(count_tokens(prompt) < 400 for prompt in prompts)
+    # Chunks run concurrently, but never more than the configured limit
+    assert 1 < stub_model_server.max_active <= 3
+
+SPEAKERS = [
+    {"speaker_id": "Speaker 1", "text": " We should invest in solar.", "start": 0.0, "end": 2.0},
+    {"speaker_id": "Speaker 2", "text": " Wind is cheaper.", "start": 2.0, "end": 4.0}
+]
+
+def test_parse_summary_result():
+    result = parse_summary_result(
+        '```json\n{"summary": "An energy debate.", "key_points": ["1. Solar", "- Wind"]}\n```'
+    )
+    assert result.summary == "An energy debate."
+    assert result.format_key_points() == "1. Solar\n2. Wind"
+    
+    # Key points returned as one block of text are split into lines
+    result = parse_summary_result('{"summary": "S", "key_points": "1. Solar\\n2. Wind"}')
+    assert result.key_points == ["1. Solar", "2. Wind"]
+    
+    for content in ["Not JSON", '{"summary": "S"}', '{"summary": "S", "key_points": 3}']:
+        with pytest.raises(ValueError):
+            parse_summary_result(content)
+
+@pytest.mark.asyncio
+async def test_generate_summary_in_one_call(stub_model_server):
+    stub_model_server.respond = lambda request: (
+        'Here you go: {"summary": "Speaker 1 favours solar, Speaker 2 wind.", '
+        '"key_points": ["Speaker 1 wants solar", "Speaker 2 says wind is cheaper"]}'
+    )
+    
+    result = await generate_summary("We should invest in solar. Wind is cheaper.", SPEAKERS)
+    
+    assert result == {
+        "summary": "Speaker 1 favours solar, Speaker 2 wind.",
+        "key_points": "1. Speaker 1 wants solar\n2. Speaker 2 says wind is cheaper"
+    }
+    assert len(stub_model_server.requests) == 1
+    prompt = stub_model_server.requests[0]["messages"][-1]["content"]
+    assert "Speaker 2: Wind is cheaper." in prompt
+    assert '"key_points"' in prompt
+    # The transcript text is only sent once
+    assert prompt.count("Wind is cheaper.") == 1
+
+@pytest.mark.asyncio
+async def test_generate_summary_falls_back_on_invalid_reply(stub_model_server):
+    def respond(request):
+        prompt = request["messages"][-1]["content"]
+        if "JSON" in prompt:
+            return '{"summary": "Truncated'
+        if "extract the key points" in prompt:
+            return "1. Solar versus wind"
+        return "An energy debate."
+    
+    stub_model_server.respond = respond
+    
+    result = await generate_summary("We should invest in solar. Wind is cheaper.", SPEAKERS)
+    
+    assert result == {"summary": "An energy debate.", "key_points": "1. Solar versus wind"}
+    assert len(stub_model_server.requests) == 3
+
+@pytest.mark.asyncio
+async def test_generate_summary_of_long_transcript(stub_model_server, monkeypatch):
+    monkeypatch.setattr(summarization, "SUMMARY_CHUNK_TOKENS", 200)
+    
+    def respond(request):
+        prompt = request["messages"][-1]["content"]
+        if "JSON" in prompt:
+            return '{"summary": "A long energy debate.", "key_points": ["Solar", "Wind"]}'
+        return "Part summary."
+    
+    stub_model_server.respond = respond
+    speakers = SPEAKERS * 50
+    
+    result = await generate_summary("", speakers)
+    
+    assert result == {"summary": "A long energy debate.", "key_points": "1. Solar\n2. Wind"}
+    final_prompt = stub_model_server.requests[-1]["messages"][-1]["content"]
+    assert "Part 1:\nPart summary." in final_prompt
+    assert "solar" not in final_prompt
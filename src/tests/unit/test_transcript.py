@@ -0,0 +1,160 @@
+import sys
+import pytest
+from src.lib.utils.transcript import (
+    Transcript,
+    Segment,
+    TranscriptFormatError,
+    align_turns,
+    open_transcript,
+    write_transcript
+)
+
+SEGMENTS = [
+    {"text": " Hello.", "start": 0.0, "end": 1.0},
+    {"text": " Grüß dich!", "start": 1.0, "end": 2.5},
+    {"text": " How are you?", "start": 2.5, "end": 4.0}
+]
+
+def test_from_segments_round_trip():
+    transcript = Transcript.from_segments(SEGMENTS)
+    
+    assert len(transcript) == 3
+    assert transcript.to_segments() == SEGMENTS
+    assert transcript[1].text == " Grüß dich!"
+    assert transcript[-1].start == 2.5
+    assert transcript[0].speaker is None
+    with pytest.raises(IndexError):
+        transcript[3]
+
+def test_speakers_are_aligned_and_interned():
+    speakers = [
+        {"speaker_id": "Speaker 1", "start": 0.0, "end": 1.0},
+        {"speaker_id": "Speaker 2", "start": 1.0, "end": 4.0}
+    ]
+    transcript = Transcript.from_segments(SEGMENTS, speakers)
+    
+    assert [segment.speaker for segment in transcript] == ["Speaker 1", "Speaker 2", "Speaker 2"]
+    assert transcript.speakers == ["Speaker 1", "Speaker 2"]
+    assert list(transcript.speaker_ids) == [0, 1, 1]
+    assert transcript.speaker_turns() == [
+        {"speaker_id": "Speaker 1", "text": " Hello.", "start": 0.0, "end": 1.0},
+        {"speaker_id": "Speaker 2", "text": " Grüß dich! How are you?", "start": 1.0, "end": 4.0}
+    ]
+
+def test_slice_copies_rows():
+    transcript = Transcript.from_segments([{**segment, "speaker_id": "A"} for segment in SEGMENTS])
+    
+    tail = transcript[1:]
+    assert isinstance(tail, Transcript)
+    assert tail.to_segments() == transcript.to_segments()[1:]
+
+def test_set_speakers_requires_one_label_per_segment():
+    transcript = Transcript.from_segments(SEGMENTS)
+    with pytest.raises(ValueError):
+        transcript.set_speakers(["Speaker 1"])
+
+def test_rows_are_slotted_views():
+    transcript = Transcript.from_segments(SEGMENTS)
+    segment = transcript[0]
+    
+    assert isinstance(segment, Segment)
+    assert not hasattr(segment, "__dict__")
+
+def test_smaller_than_dict_segments():
+    segments = [{"text": f" Segment {i}", "start": float(i), "end": float(i + 1)} for i in range(1000)]
+    transcript = Transcript.from_segments(segments)
+    
+    dict_size = sum(
+        sys.getsizeof(segment) + sum(sys.getsizeof(value) for value in segment.values())
+        for segment in segments
+    )
+    columns = (transcript.starts, transcript.ends, transcript.speaker_ids, transcript._text, transcript._offsets)
+    transcript_size = sum(sys.getsizeof(column) for column in columns)
+    
+    assert transcript_size * 4 < dict_size
+
+def test_align_turns():
+    turns = [
+        {"speaker_id": "Speaker 2", "start": 2.4, "end": 4.1},
+        {"speaker_id": "Speaker 1", "start": 0.0, "end": 2.4}
+    ]
+    assert align_turns([0.0, 1.0, 2.5, 10.0], [1.0, 2.5, 4.0, 11.0], turns) == [
+        "Speaker 1", "Speaker 1", "Speaker 2", None
+    ]
+
+def test_align_turns_zero_length_segment():
+    assert align_turns([1.0], [1.0], [{"speaker_id": "Speaker 1", "start": 1.0, "end": 1.0}]) == ["Speaker 1"]
+
+def test_align_turns_long_transcript():
+    starts = [i * 2.0 for i in range(10000)]
+    turns = [
+        {"speaker_id": f"Speaker {i % 2 + 1}", "start": i * 20.0, "end": i * 20.0 + 20.0}
+        for i in range(1000)
+    ]
+    
+    labels = align_turns(starts, [start + 2.0 for start in starts], turns)
+    assert labels[0] == "Speaker 1"
+    assert labels[10] == "Speaker 2"
+    assert labels[-1] == "Speaker 2"
+
+def make_transcript(count: int) -> Transcript:
+    transcript = Transcript()
+    for i in range(count):
+        transcript.append(i * 2.0, i * 2.0 + 2.0, f" Segment {i} ✓", f"Speaker {i % 3 + 1}" if i % 4 else None)
+    return transcript
+
+def test_find_range():
+    transcript = make_transcript(10)
+    
+    assert transcript.find_range(0.0, 20.0) == (0, 10)
+    assert transcript.find_range(3.0, 7.0) == (1, 4)
+    # Segments only touching the range are excluded
+    assert transcript.find_range(4.0, 6.0) == (2, 3)
+    assert transcript.find_range(50.0, 60.0) == (10, 10)
+    first, last = transcript.find_range(7.0, 3.0)
+    assert first == last
+
+def test_binary_round_trip(tmp_path):
+    transcript = make_transcript(1000)
+    path = tmp_path / "transcript.bin"
+    write_transcript(transcript, path)
+    
+    with open_transcript(path) as mapped:
+        assert len(mapped) == 1000
+        assert mapped.speakers == transcript.speakers
+        assert mapped.slice(0, len(mapped)).to_segments() == transcript.to_segments()
+
+def test_binary_slice_time(tmp_path):
+    transcript = make_transcript(1000)
+    path = tmp_path / "transcript.bin"
+    write_transcript(transcript, path)
+    
+    with open_transcript(path) as mapped:
+        first, last = mapped.find_range(301.0, 311.0)
+        assert (first, last) == (150, 156)
+        clip = mapped.slice_time(301.0, 311.0)
+        assert clip.to_segments() == transcript[150:156].to_segments()
+
+def test_binary_empty_transcript(tmp_path):
+    path = tmp_path / "transcript.bin"
+    write_transcript(Transcript(), path)
+    
+    with open_transcript(path) as mapped:
+        assert len(mapped) == 0
+        assert len(mapped.slice_time(0.0, 10.0)) == 0
+
+@pytest.mark.parametrize("content", [b"", b"TRSC", b"JUNK" + b"\0" * 100])
+def test_binary_rejects_invalid_files(tmp_path, content):
+    path = tmp_path / "transcript.bin"
+    path.write_bytes(content)
+    
+    with pytest.raises(TranscriptFormatError):
+        open_transcript(path)
+
+def test_binary_rejects_truncated_file(tmp_path):
+    path = tmp_path / "transcript.bin"
+    write_transcript(make_transcript(10), path)
+    path.write_bytes(path.read_bytes()[:-8])
+    
+    with pytest.raises(TranscriptFormatError):
+        open_transcript(path)
@@ -0,0 +1,91 @@
+import pytest
+from unittest.mock import patch
+from src.lib.utils import transcription, transcriptionBackends
+from src.lib.utils.transcriptionBackends import (
+    FakeBackend,
+    LocalWhisperBackend,
+    MeteredBackend,
+    TranscriptionBackendError,
+    TranscriptionMetrics,
+    create_backend,
+    set_transcription_backend
+)
+
+@pytest.fixture
+def audio_file(tmp_path):
+    path = tmp_path / "episode.mp3"
+    path.write_bytes(b"\0" * 16000 * 12)  # 12 seconds at the fake backend's bitrate
+    return path
+
+@pytest.fixture
+def fake_backend(tmp_path, monkeypatch):
+    """Transcribe with the fake backend and a temporary cache."""
+    monkeypatch.setattr(transcription, "CACHE_DIR", tmp_path / "cache")
+    backend = FakeBackend()
+    set_transcription_backend(backend)
+    yield backend
+    set_transcription_backend(None)
+
+@pytest.mark.asyncio
+async def test_fake_backend_is_deterministic(audio_file):
+    backend = FakeBackend()
+    
+    first = await backend.transcribe(audio_file)
+    second = await backend.transcribe(audio_file, "es")
+    
+    assert [(segment["start"], segment["end"]) for segment in first["segments"]] == [(0.0, 5.0), (5.0, 10.0), (10.0, 12.0)]
+    assert first["text"] == "Segment 1 of episode. Segment 2 of episode. Segment 3 of episode."
+    assert first["language"] == "en"
+    assert second["segments"] == first["segments"]
+    assert second["language"] == "es"
+
+@pytest.mark.asyncio
+async def test_backend_metrics(audio_file, tmp_path):
+    backend = FakeBackend()
+    await backend.transcribe(audio_file)
+    await backend.transcribe(audio_file)
+    with pytest.raises(FileNotFoundError):
+        await backend.transcribe(tmp_path / "missing.mp3")
+    
+    metrics = backend.get_metrics()
+    
+    assert metrics["backend"] == "fake"
+    assert metrics["model"] == "fake"
+    assert metrics["requests"] == 3
+    assert metrics["failures"] == 1
+    assert metrics["audio_seconds"] == 24.0
+    assert metrics["processing_seconds"] > 0
+    assert metrics["realtime_factor"] == 24.0 / metrics["processing_seconds"]
+
+def test_backends_must_implement_transcribe():
+    class Incomplete(MeteredBackend):
+        name = "incomplete"
+    
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_metrics_without_requests():
+    assert TranscriptionMetrics().snapshot()["realtime_factor"] == 0.0
+
+def test_create_backend():
+    assert isinstance(create_backend("fake"), FakeBackend)
+    assert create_backend("openai").model == "whisper-1"
+    with pytest.raises(TranscriptionBackendError):
+        create_backend("missing")
+
+def test_local_backend_requires_faster_whisper():
+    with patch.object(transcriptionBackends, "WhisperModel", None):
+        with pytest.raises(TranscriptionBackendError, match="faster-whisper"):
+            LocalWhisperBackend()
+
+@pytest.mark.asyncio
+async def test_transcribe_audio_with_configured_backend(fake_backend, audio_file):
+    with patch.object(transcription, "get_file_path", return_value=audio_file), \
+         patch.object(transcription, "chunk_audio") as chunk_audio:
+        result = await transcription.transcribe_audio("test_file_id")
+        await transcription.transcribe_audio("test_file_id")
+    
+    # No upload size limit, the file is transcribed whole
+    chunk_audio.assert_not_called()
+    assert len(result["segments"]) == 3
+    assert fake_backend.get_metrics()["requests"] == 1
@@ -0,0 +1,101 @@
+import os
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock, AsyncMock
+from src.lib.utils import transcription, transcriptionBackends, fileHandling
+from src.lib.utils.transcription import (
+    transcribe_audio,
+    get_cache_key,
+    load_cached_transcription,
+    save_cached_transcription,
+    evict_cache
+)
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Point the transcription cache at a temporary directory."""
+    monkeypatch.setattr(transcription, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(fileHandling, "UPLOAD_DIR", tmp_path / "uploads")
+    return tmp_path / "cache"
+
+@pytest.fixture
+def audio_file(tmp_path):
+    path = tmp_path / "episode.mp3"
+    path.write_bytes(b"mock audio content")
+    return path
+
+def mock_whisper_response():
+    response = MagicMock()
+    response.text = "This is a test transcription."
+    response.segments = [
+        {"text": "This is", "start": 0, "end": 1},
+        {"text": "a test transcription.", "start": 1, "end": 2}
+    ]
+    response.language = "en"
+    return response
+
+def test_cache_key_depends_on_model_and_language():
+    key = get_cache_key("abc", "whisper-1", "en")
+    assert key == get_cache_key("abc", "whisper-1", "en")
+    assert key != get_cache_key("abc", "whisper-1", "es")
+    assert key != get_cache_key("abc", "whisper-2", "en")
+    assert get_cache_key("abc", "whisper-1") == get_cache_key("abc", "whisper-1", None)
+
+def test_save_and_load_cached_transcription(cache_dir):
+    result = {"text": "Hello", "segments": [], "language": "en"}
+    save_cached_transcription("key", result)
+    assert load_cached_transcription("key") == result
+    assert load_cached_transcription("missing") is None
+
+def test_load_cached_transcription_corrupt_entry(cache_dir):
+    cache_dir.mkdir(parents=True)
+    (cache_dir / "bad.json").write_text("{not json")
+    assert load_cached_transcription("bad") is None
+    assert not (cache_dir / "bad.json").exists()
+
+def test_concurrent_saves_of_one_key(cache_dir):
+    results = [{"text": f"Result {i}", "segments": [], "language": "en"} for i in range(8)]
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda result: save_cached_transcription("key", result), results))
+    
+    assert load_cached_transcription("key") in results
+    assert [path.name for path in cache_dir.iterdir()] == ["key.json"]
+
+def test_load_survives_concurrent_eviction(cache_dir):
+    result = {"text": "Hello", "segments": [], "language": "en"}
+    save_cached_transcription("key", result)
+    
+    with patch.object(transcription.os, "utime", side_effect=FileNotFoundError):
+        assert load_cached_transcription("key") == result
+
+def test_evict_cache_removes_least_recently_used(cache_dir):
+    for i, key in enumerate(["old", "mid", "new"]):
+        save_cached_transcription(key, {"text": "x" * 100, "segments": [], "language": "en"})
+        os.utime(cache_dir / f"{key}.json", (1000 + i, 1000 + i))
+    
+    # Reading an entry refreshes it
+    load_cached_transcription("old")
+    entry_size = (cache_dir / "mid.json").stat().st_size
+    
+    removed = evict_cache(max_bytes=entry_size * 2)
+    assert removed == 1
+    assert not (cache_dir / "mid.json").exists()
+    assert (cache_dir / "old.json").exists()
+    assert (cache_dir / "new.json").exists()
+
+@pytest.mark.asyncio
+async def test_transcribe_audio_uses_cache(cache_dir, audio_file):
+    mock_client = MagicMock()
+    create = mock_client.audio.transcriptions.create = AsyncMock(return_value=mock_whisper_response())
+    
+    with patch.object(transcription, "get_file_path", return_value=audio_file), \
+         patch.object(transcriptionBackends, "get_client", return_value=mock_client):
+        first = await transcribe_audio("test_file_id", "en")
+        second = await transcribe_audio("other_file_id", "en")
+        assert first == second
+        assert create.await_count == 1
+        
+        # A different language is a different cache entry
+        await transcribe_audio("test_file_id", "es")
+        assert create.await_count == 2
@@ -1,45 +1,168 @@
+import re
+import json
 import pytest
-from src.lib.utils.transcription import correct_transcription, TranscriptionError
+from src.lib.utils import artifacts, transcription
+from src.lib.utils.artifacts import load_artifact, save_artifact
+from src.lib.utils.transcription import (
+    correct_segments,
+    get_corrected_transcript,
+    gate_segments,
+    is_suspect_segment,
+    load_lexicon,
+    batch_segment_texts,
+    parse_corrections
+)
+
+@pytest.fixture
+def correction_cache(tmp_path, monkeypatch):
+    """Point the correction cache at a temporary database."""
+    monkeypatch.setattr(transcription, "CORRECTION_CACHE_PATH", tmp_path / "corrections.db")
+    return tmp_path / "corrections.db"
+
+def fix_typos(request):
+    """Stub model correcting a few known typos in every segment of the prompt."""
+    prompt = request["messages"][-1]["content"]
+    segments = dict(re.findall(r"^\s*\[(\d+)\] (.*)$", prompt, re.MULTILINE))
+    fixes = {"Hllo": "Hello", "wrld": "world", "hw r u": "how are you"}
+    corrected = {}
+    for index, text in segments.items():
+        for typo, fix in fixes.items():
+            text = text.replace(typo, fix)
+        corrected[index] = text
+    return json.dumps(corrected)
+
+def test_batch_segment_texts():
+    texts = [(i, "word " * 10) for i in range(10)]
+    
+    assert [len(batch) for batch in batch_segment_texts(texts, 4, 1000)] == [4, 4, 2]
+    assert [len(batch) for batch in batch_segment_texts(texts, 100, 30)] == [2, 2, 2, 2, 2]
+    assert batch_segment_texts([], 4, 1000) == []
+
+def test_parse_corrections():
+    assert parse_corrections('```json\n{"0": "Hello.", "2": " World. "}\n```') == {0: "Hello.", 2: "World."}
+    assert parse_corrections('{"0": "Hello.", "x": "?", "1": ""}') == {0: "Hello."}
+    assert parse_corrections("Hello.") == {}
+    assert parse_corrections('{"0": "Hel') == {}
+
+@pytest.mark.asyncio
+async def test_correct_segments_in_concurrent_batches(stub_model_server, correction_cache, monkeypatch):
+    monkeypatch.setattr(transcription, "CORRECTION_BATCH_SEGMENTS", 2)
+    monkeypatch.setattr(transcription, "CORRECTION_CONCURRENCY", 2)
+    stub_model_server.delay = 0.05
+    stub_model_server.respond = fix_typos
+    segments = [
+        {"id": i, "text": f" Hllo wrld {i}.", "start": float(i), "end": float(i + 1)}
+        for i in range(8)
+    ]
+    
+    corrected = await correct_segments(segments)
+    
+    assert corrected == [{**segment, "text": f" Hello world {i}."} for i, segment in enumerate(segments)]
+    assert segments[0]["text"] == " Hllo wrld 0."
+    assert len(stub_model_server.requests) == 4
+    assert stub_model_server.max_active == 2
+
+@pytest.mark.asyncio
+async def test_corrections_are_cached_by_text(stub_model_server, correction_cache):
+    stub_model_server.respond = fix_typos
+    segments = [
+        {"text": " Hllo wrld.", "start": 0.0, "end": 1.0},
+        {"text": " hw r u?", "start": 1.0, "end": 2.0},
+        {"text": " Hllo wrld.", "start": 2.0, "end": 3.0}
+    ]
+    
+    first = await correct_segments(segments)
+    prompt = stub_model_server.requests[0]["messages"][-1]["content"]
+    # Identical segments are only sent once
+    assert prompt.count("Hllo wrld.") == 1
+    
+    second = await correct_segments(segments + [{"text": " Hllo.", "start": 3.0, "end": 4.0}])
+    
+    assert [segment["text"] for segment in second] == [" Hello world.", " how are you?", " Hello world.", " Hello."]
+    assert second[:3] == first
+    assert len(stub_model_server.requests) == 2
+    assert "Hllo wrld" not in stub_model_server.requests[1]["messages"][-1]["content"]
+
+@pytest.mark.asyncio
+async def test_segments_missing_from_reply_are_retried(stub_model_server, correction_cache):
+    stub_model_server.respond = lambda request: '{"0": "Hello world."}'
+    segments = [
+        {"text": " Hllo wrld.", "start": 0.0, "end": 1.0},
+        {"text": " hw r u?", "start": 1.0, "end": 2.0}
+    ]
+    
+    corrected = await correct_segments(segments)
+    assert [segment["text"] for segment in corrected] == [" Hello world.", " hw r u?"]
+    
+    stub_model_server.respond = fix_typos
+    corrected = await correct_segments(segments)
+    assert [segment["text"] for segment in corrected] == [" Hello world.", " how are you?"]
+    assert "[0]" not in stub_model_server.requests[1]["messages"][-1]["content"]
+
+def confident(text, **fields):
+    """Segment Whisper is confident about."""
+    return {"text": text, "start": 0.0, "end": 1.0, "avg_logprob": -0.1, "no_speech_prob": 0.01, "compression_ratio": 1.2, **fields}
+
+def test_is_suspect_segment():
+    lexicon = frozenset(["hello", "world", "it's", "fine"])
+    
+    assert not is_suspect_segment(confident(" Hello world."))
+    assert not is_suspect_segment(confident(" Hello world, it's fine 42."), lexicon)
+    assert is_suspect_segment(confident(" Hllo world."), lexicon)
+    assert is_suspect_segment(confident(" Hello world.", avg_logprob=-0.9))
+    assert is_suspect_segment(confident(" Hello world.", no_speech_prob=0.8))
+    assert is_suspect_segment(confident(" Hello world.", compression_ratio=3.0))
+    # No confidence values to go by
+    assert is_suspect_segment({"text": " Hello world.", "start": 0.0, "end": 1.0})
+
+def test_missing_lexicon_is_logged_and_not_cached(tmp_path, caplog):
+    lexicon_path = tmp_path / "words"
+    
+    with caplog.at_level("WARNING", logger=transcription.__name__):
+        assert load_lexicon(lexicon_path) is None
+    assert "gated on confidence only" in caplog.text
+    
+    # A word list installed later is used
+    lexicon_path.write_text("Hello\nworld\n")
+    assert load_lexicon(lexicon_path) == frozenset(["hello", "world"])
 
 @pytest.mark.asyncio
-async def test_transcription_correction():
-    # Test basic error correction
-    original = "Hllo wrld"
-    corrected = await correct_transcription(original)
-    assert corrected == "Hello world"
-    
-    # Test multiple errors
-    original = "Hllo wrld, hw r u?"
-    corrected = await correct_transcription(original)
-    assert corrected == "Hello world, how are you?"
-    
-    # Test technical terms
-    original = "The CPU procesor is runing at 2.4 GHz"
-    corrected = await correct_transcription(original)
-    assert corrected == "The CPU processor is running at 2.4 GHz"
-    
-    # Test proper nouns
-    original = "John smith works at microsoft"
-    corrected = await correct_transcription(original)
-    assert "John Smith" in corrected
-    assert "Microsoft" in corrected
-    
-    # Test punctuation
-    original = "hello world how are you"
-    corrected = await correct_transcription(original)
-    assert corrected == "Hello world, how are you?"
-    
-    # Test numbers and units
-    original = "The temperature is 25 degres celsius"
-    corrected = await correct_transcription(original)
-    assert corrected == "The temperature is 25 degrees Celsius"
-    
-    # Test empty input
-    with pytest.raises(TranscriptionError):
-        await correct_transcription("")
-    
-    # Test very long input
-    long_text = "This is a very long text that needs to be corrected. " * 100
-    corrected = await correct_transcription(long_text)
-    assert len(corrected) > 0
-    assert "." in corrected  # Verify punctuation is maintained 
\ No newline at end of file
+async def test_only_suspect_segments_are_corrected(stub_model_server, correction_cache, tmp_path, monkeypatch):
+    lexicon_path = tmp_path / "words"
+    lexicon_path.write_text("hello\nworld\nhow\nare\nyou\n")
+    monkeypatch.setattr(transcription, "CORRECTION_LEXICON_PATH", lexicon_path)
+    stub_model_server.respond = fix_typos
+    segments = [
+        confident(" Hello world."),
+        confident(" Hllo wrld."),
+        confident(" hw r u?", avg_logprob=-1.2),
+        confident(" How are you?")
+    ]
+    
+    suspect, stats = gate_segments(segments)
+    corrected = await correct_segments(segments, suspect)
+    
+    assert suspect == [False, True, True, False]
+    assert stats["segments"] == 4
+    assert stats["skipped_segments"] == 2
+    assert stats["skipped_tokens"] > 0
+    assert [segment["text"] for segment in corrected] == [" Hello world.", " Hello world.", " how are you?", " How are you?"]
+    prompt = stub_model_server.requests[0]["messages"][-1]["content"]
+    assert "Hello world." not in prompt
+    assert "How are you?" not in prompt
+
+@pytest.mark.asyncio
+async def test_legacy_corrected_text_is_recomputed(stub_model_server, correction_cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "ARTIFACT_DIR", tmp_path / "artifacts")
+    stub_model_server.respond = fix_typos
+    file_id = "0f8b6a2e-4c1d-4e7a-9b3f-2d5c8e1a7f60"
+    transcript = {"text": "Hllo wrld.", "segments": [{"text": " Hllo wrld.", "start": 0.0, "end": 1.0}]}
+    save_artifact(file_id, "transcript", transcript)
+    # Whole-text correction stored by an earlier version, without segments
+    save_artifact(file_id, "corrected", "Hello world, corrected as a whole.")
+    
+    corrected = await get_corrected_transcript(file_id)
+    
+    assert corrected["text"] == "Hello world."
+    assert [segment["text"] for segment in corrected["segments"]] == [" Hello world."]
+    assert load_artifact(file_id, "corrected") == corrected
@@ -0,0 +1,117 @@
+import os
+import time
+import wave
+import asyncio
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+from src.lib.utils import transcription, transcriptionBackends
+from src.lib.utils.transcription import TranscriptionPool, plan_clips, transcribe_audio
+from src.lib.utils.transcriptionBackends import LocalWhisperBackend, set_transcription_backend
+
+class SlowModel:
+    """Stand-in for a faster-whisper model that takes a while per chunk."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def transcribe(self, audio, language=None, beam_size=5):
+        time.sleep(self.delay)
+        # A file path, or the samples of a clip
+        name = Path(audio).stem if isinstance(audio, str) else f"{len(audio) / 16000:.1f}"
+        segment = SimpleNamespace(
+            start=0.0, end=10.0, text=f" {name} {os.getpid()}",
+            avg_logprob=-0.1, compression_ratio=1.0, no_speech_prob=0.0
+        )
+        return iter([segment]), SimpleNamespace(language=language or "en", duration=10.0)
+
+def write_silence(path, seconds):
+    """Write a 16kHz mono WAV file of silence."""
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(b"\0\0" * int(seconds * 16000))
+    return path
+
+def load_slow_model(delay, load_dir):
+    """Load a SlowModel, leaving a file per load in load_dir."""
+    (Path(load_dir) / str(os.getpid())).touch()
+    return SlowModel(delay)
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = TranscriptionPool(load_slow_model, (0.2, str(tmp_path)), workers=2, queued_per_worker=1)
+    yield pool
+    pool.shutdown()
+
+@pytest.mark.asyncio
+async def test_pool_preloads_one_model_per_worker(pool, tmp_path):
+    results = await asyncio.gather(*[pool.transcribe(tmp_path / f"{i:04d}.mp3") for i in range(8)])
+
+    pids = {result["segments"][0]["text"].split()[1] for result, _ in results}
+    loads = {path.name for path in tmp_path.iterdir() if not path.suffix}
+    # Work is spread over both workers, each loaded the model once
+    assert len(pids) == 2
+    assert loads == pids
+    assert [result["segments"][0]["text"].split()[0] for result, _ in results] == [f"{i:04d}" for i in range(8)]
+    assert all(audio_seconds == 10.0 for _, audio_seconds in results)
+
+@pytest.mark.asyncio
+async def test_pool_applies_backpressure(pool, tmp_path):
+    peak = 0
+    done = False
+
+    async def sample():
+        nonlocal peak
+        while not done:
+            peak = max(peak, pool.in_flight)
+            await asyncio.sleep(0.01)
+
+    sampler = asyncio.create_task(sample())
+    await asyncio.gather(*[pool.transcribe(tmp_path / f"{i}.mp3") for i in range(10)])
+    done = True
+    await sampler
+
+    assert pool.capacity == 4
+    assert peak == 4
+
+def test_plan_clips(tmp_path):
+    audio_file = write_silence(tmp_path / "episode.wav", 25.0)
+    
+    clips = plan_clips(audio_file, chunk_duration=10.0, overlap=2.0)
+    
+    assert [(clip["offset"], clip["duration"]) for clip in clips] == [(0.0, 10.0), (8.0, 10.0), (16.0, 9.0)]
+    assert all(clip["path"] == audio_file for clip in clips)
+    # Without a duration the file is one clip
+    unknown = tmp_path / "episode.mp3"
+    unknown.write_bytes(b"mock audio content")
+    assert plan_clips(unknown) == [{"path": unknown, "offset": 0.0}]
+
+@pytest.mark.asyncio
+async def test_transcribe_audio_with_local_backend_uses_pool(pool, tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(transcription, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(transcription, "CHUNK_DIR", tmp_path / "chunks")
+    monkeypatch.setattr(transcriptionBackends, "WhisperModel", object)
+    monkeypatch.setattr(transcription, "_transcription_pool", pool)
+    backend = LocalWhisperBackend()
+    backend.chunk_duration = 10.0
+    set_transcription_backend(backend)
+    audio_file = write_silence(tmp_path / "episode.wav", 40.0)
+    
+    try:
+        with patch.object(transcription, "get_file_path", return_value=audio_file), \
+             patch.object(transcription, "plan_clips", lambda path, duration: plan_clips(path, duration, overlap=0.0)):
+            result = await transcribe_audio("test_file_id")
+    finally:
+        set_transcription_backend(None)
+    
+    # Each worker decodes its own 10s clip of the file
+    assert [segment["start"] for segment in result["segments"]] == [0.0, 10.0, 20.0, 30.0]
+    assert [segment["text"].split()[0] for segment in result["segments"]] == ["10.0"] * 4
+    assert backend.get_metrics()["requests"] == 4
+    assert backend.get_metrics()["audio_seconds"] == 40.0
+    # No chunk files are cut up front
+    assert not (tmp_path / "chunks").exists()